@@ -0,0 +1,159 @@
+""" Замер скорости обработки атрибутов полей: цепочки if/elif, использовавшиеся ранее,
+против словарей обработчиков, скомпилированных из ram_repr.ram_attributes, а также
+формирования props с запоминанием результата по значению flags и без него.
+
+Чтение на CPython выполняется примерно с той же скоростью, что и прежде (различие в
+пределах разброса замеров); ускорение дает формирование props при записи. Если
+скомпилированный вариант медленнее, вместо ускорения выводится замедление.
+
+Запуск из корня репозитория: python -m _bench.bench_attributes
+"""
+
+import timeit
+
+from ram_repr.ram_attributes import FIELD
+from ram_repr.ram_attributes import _has_property
+from ram_repr.ram_attributes import _props_writer
+from ram_repr.ram_structure import Field
+from ram_repr.ram_to_xml import _FIELD_WRITER
+from xml_repr.xml_to_ram import UnsupportedAttributeError
+from xml_repr.xml_to_ram import UnsupportedPropertyError
+from xml_repr.xml_to_ram import _create_field
+
+FIELD_COUNT = 100000
+
+# Свойства полей, выгружаемые в props.
+_PROPERTIES = [prop for prop in FIELD.properties if prop.name is not None]
+
+
+def _legacy_create_field(attr_dict):
+    """ Прежняя реализация xml_to_ram._create_field. """
+    field = Field()
+    for attr in attr_dict:
+        if attr == 'name':
+            field.name = attr_dict[attr]
+        elif attr == 'rname':
+            field.rname = attr_dict[attr]
+        elif attr == 'domain':
+            field.domain = attr_dict[attr]
+        elif attr == 'type':
+            field.type = attr_dict[attr]
+        elif attr == 'description':
+            field.description = attr_dict[attr]
+        elif attr == 'props':
+            for prop in attr_dict[attr].split(', '):
+                if prop == 'input':
+                    field.input = True
+                elif prop == 'edit':
+                    field.edit = True
+                elif prop == 'show_in_grid':
+                    field.show_in_grid = True
+                elif prop == 'show_in_details':
+                    field.show_in_details = True
+                elif prop == 'is_mean':
+                    field.is_mean = True
+                elif prop == 'autocalculated':
+                    field.autocalculated = True
+                elif prop == 'required':
+                    field.required = True
+                else:
+                    raise UnsupportedPropertyError(prop)
+        else:
+            raise UnsupportedAttributeError(attr)
+    return field
+
+
+def _legacy_field_attributes(field):
+    """ Прежняя реализация получения атрибутов из ram_to_xml._create_field_dom. """
+    attributes = []
+    if field.name:
+        attributes.append(('name', field.name))
+    if field.rname:
+        attributes.append(('rname', field.rname))
+    if field.domain:
+        attributes.append(('domain', field.domain))
+    if field.type:
+        attributes.append(('type', field.type))
+    if field.description:
+        attributes.append(('description', field.description))
+
+    props = []
+    if field.input:
+        props.append('input')
+    if field.edit:
+        props.append('edit')
+    if field.show_in_grid:
+        props.append('show_in_grid')
+    if field.show_in_details:
+        props.append('show_in_details')
+    if field.is_mean:
+        props.append('is_mean')
+    if field.autocalculated:
+        props.append('autocalculated')
+    if field.required:
+        props.append('required')
+    if len(props) > 0:
+        attributes.append(('props', ', '.join(props)))
+    return attributes
+
+
+def _field_attributes(field):
+    """ Получение атрибутов по скомпилированному списку ram_to_xml. """
+    return _FIELD_WRITER.attributes(field)
+
+
+def _sample_attributes():
+    """ Сформировать атрибуты XML-элементов полей. """
+    props = ['input', 'edit', 'show_in_grid', 'show_in_details', 'is_mean', 'autocalculated', 'required']
+    samples = []
+    for number in range(FIELD_COUNT):
+        samples.append({
+            'name': 'FIELD_%d' % number,
+            'rname': 'Поле %d' % number,
+            'domain': 'Domain%d' % (number % 50),
+            'description': 'Описание поля %d' % number,
+            'props': ', '.join(props[:number % len(props) + 1]),
+        })
+    return samples
+
+
+def _plain_props(field):
+    """ Формирование props без запоминания результата. """
+    return ', '.join([prop.name for prop in _PROPERTIES if _has_property(field, prop)])
+
+
+def _ratio(legacy, compiled):
+    """ Описать отношение времени прежней и новой реализаций. """
+    if compiled <= legacy:
+        return 'ускорение %.2fx' % (legacy / compiled)
+    return 'замедление %.2fx' % (compiled / legacy)
+
+
+def _measure(function, items):
+    """ Получить лучшее время из нескольких прогонов функции по всем элементам. """
+    return min(timeit.repeat(lambda: [function(item) for item in items], number=1, repeat=9))
+
+
+def main():
+    samples = _sample_attributes()
+    legacy = _measure(_legacy_create_field, samples)
+    compiled = _measure(_create_field, samples)
+    print('Чтение %d полей: if/elif %.3f с, словарь %.3f с, %s'
+          % (FIELD_COUNT, legacy, compiled, _ratio(legacy, compiled)))
+
+    fields = [_create_field(sample) for sample in samples]
+    assert [_legacy_field_attributes(field) for field in fields] == [_field_attributes(field) for field in fields]
+    legacy = _measure(_legacy_field_attributes, fields)
+    compiled = _measure(_field_attributes, fields)
+    print('Запись %d полей: if/elif %.3f с, список %.3f с, %s'
+          % (FIELD_COUNT, legacy, compiled, _ratio(legacy, compiled)))
+
+    props = _props_writer(FIELD)
+    plain = _measure(_plain_props, fields)
+    memoized = _measure(props, fields)
+    print('Атрибут props %d полей: без запоминания %.3f с, с запоминанием %.3f с, %s'
+          % (FIELD_COUNT, plain, memoized, _ratio(plain, memoized)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+""" Замер памяти и скорости перебора полей: объекты Field против колоночного хранения
+(ColumnarFields), а также время выгрузки схемы в XML.
+
+Запуск из корня репозитория: python -m _bench.bench_columnar
+"""
+
+import time
+import tracemalloc
+from io import BytesIO
+
+from ram_repr import ram_to_xml
+from ram_repr.ram_columnar import ColumnarFields
+from ram_repr.ram_columnar import StringTable
+from ram_repr.ram_structure import Field
+from ram_repr.ram_structure import Schema
+from ram_repr.ram_structure import Table
+
+TABLE_COUNT = 2000
+TABLE_FIELD_COUNT = 500
+
+_NAMES = ['FIELD_%d' % number for number in range(TABLE_FIELD_COUNT)]
+_DOMAINS = ['Domain%d' % number for number in range(20)]
+
+
+def _fields():
+    """ Сформировать поля одной таблицы. """
+    for position, name in enumerate(_NAMES):
+        field = Field()
+        field.name = name
+        field.domain = _DOMAINS[position % 20]
+        field.flags = Field.INPUT | (Field.REQUIRED if position % 7 == 0 else 0)
+        yield field
+
+
+def _build_schema(packed: bool):
+    """ Сформировать схему с TABLE_COUNT * TABLE_FIELD_COUNT полями.
+
+    :param packed: хранить поля в колоночном виде.
+    :return: пара (схема, объем памяти схемы в байтах).
+    """
+    tracemalloc.start()
+    schema = Schema()
+    schema.name = 'BENCH'
+    strings = StringTable()
+    for number in range(TABLE_COUNT):
+        table = Table()
+        table.name = 'TABLE_%d' % number
+        if packed:
+            table.fields = ColumnarFields(strings, _fields())
+        else:
+            table.fields = {field.name: field for field in _fields()}
+        schema.tables[table.name] = table
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return schema, size
+
+
+def _iterate(schema):
+    """ Подсчитать обязательные поля схемы перебором. """
+    return sum(field.required for table in schema.tables.values() for field in table.fields.values())
+
+
+def _lookup(schema):
+    """ Обратиться к каждому полю схемы по имени. """
+    for table in schema.tables.values():
+        fields = table.fields
+        for name in _NAMES:
+            fields[name].domain
+
+
+def _write(schema):
+    """ Выгрузить схему в XML. """
+    ram_to_xml.write(schema, BytesIO())
+
+
+def _measure(function, argument):
+    """ Получить время выполнения функции в секундах. """
+    start = time.perf_counter()
+    function(argument)
+    return time.perf_counter() - start
+
+
+def main():
+    objects, object_memory = _build_schema(False)
+    packed, packed_memory = _build_schema(True)
+    print('Память схемы (%d полей): объекты %.1f МБ, колонки %.1f МБ'
+          % (TABLE_COUNT * TABLE_FIELD_COUNT, object_memory / 2 ** 20, packed_memory / 2 ** 20))
+    for title, function in (('Перебор полей', _iterate), ('Обращение по имени', _lookup),
+                            ('Выгрузка в XML', _write)):
+        print('%s: объекты %.3f с, колонки %.3f с' % (title, _measure(function, objects),
+                                                     _measure(function, packed)))
+
+
+if __name__ == '__main__':
+    main()
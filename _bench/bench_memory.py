@@ -0,0 +1,138 @@
+""" Замер памяти, занимаемой полями RAM-представления: объекты со словарем атрибутов,
+использовавшиеся ранее, против объектов с __slots__, а также схема, считанная из XML
+без интернирования строк и с ним.
+
+Запуск из корня репозитория: python -m _bench.bench_memory
+"""
+
+import sys
+import tracemalloc
+from io import BytesIO
+
+from _bench.bench_attributes import FIELD_COUNT
+from _bench.bench_attributes import _sample_attributes
+from ram_repr import ram_attributes
+from xml_repr import xml_to_ram
+from xml_repr.xml_to_ram import _create_field
+
+TABLE_COUNT = 2000
+TABLE_FIELD_COUNT = 50
+
+
+class _LegacyField:
+    """ Прежняя реализация ram_structure.Field. """
+    def __init__(self):
+        self.name = None
+        self.rname = None
+        self.domain = None
+        self.type = None
+        self.description = None
+
+        self.input = False
+        self.edit = False
+        self.show_in_grid = False
+        self.show_in_details = False
+        self.is_mean = False
+        self.autocalculated = False
+        self.required = False
+
+
+# Атрибуты прежней реализации ram_structure.Field.
+_LEGACY_NAMES = ('name', 'rname', 'domain', 'type', 'description', 'input', 'edit', 'show_in_grid',
+                 'show_in_details', 'is_mean', 'autocalculated', 'required')
+
+
+def _legacy_create_field(attr_dict):
+    """ Создать поле прежнего класса с теми же значениями, что и xml_to_ram._create_field. """
+    field = _LegacyField()
+    source = _create_field(attr_dict)
+    for name in _LEGACY_NAMES:
+        setattr(field, name, getattr(source, name))
+    return field
+
+
+def _bytes_per_field(create, samples):
+    """ Получить количество байт, выделенных на одно поле вместе с его значениями.
+
+    Значения атрибутов заранее созданы в samples и в замер не входят, поэтому учитываются
+    только сами объекты полей.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fields = [create(sample) for sample in samples]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del fields
+    return (after - before) / len(samples)
+
+
+def _schema_document():
+    """ Сформировать XML-представление схемы, в которой поля ссылаются на общие домены. """
+    lines = ['<?xml version="1.0" encoding="utf-8"?>', '<dbd_schema name="BENCH">', '<domains>']
+    for number in range(20):
+        lines.append('<domain name="Domain%d" type="STRING" width="20" char_length="100"/>' % number)
+    lines.append('</domains>')
+    lines.append('<tables>')
+    for table in range(TABLE_COUNT):
+        lines.append('<table name="TABLE_%d" props="add, edit">' % table)
+        lines.append('<field name="ID" domain="Domain0" props="input, required"/>')
+        for number in range(1, TABLE_FIELD_COUNT):
+            lines.append('<field name="FIELD_%d" domain="Domain%d" type="STRING" props="input, edit"/>'
+                         % (number, number % 20))
+        lines.append('<constraint kind="PRIMARY" items="ID"/>')
+        lines.append('<constraint kind="FOREIGN" items="FIELD_1" reference="TABLE_%d"/>' % (table // 2))
+        lines.append('<index field="FIELD_1"/>')
+        lines.append('</table>')
+    lines.append('</tables>')
+    lines.append('</dbd_schema>')
+    return '\n'.join(lines).encode('utf-8')
+
+
+def _without_interning(entity):
+    """ Получить копию описания сущности, в которой значения атрибутов не интернируются. """
+    attributes = tuple(ram_attributes.Attribute(attribute.xml, attribute.ram, attribute.dbd,
+                                                None if attribute.convert is ram_attributes.interned
+                                                else attribute.convert)
+                       for attribute in entity.attributes)
+    return ram_attributes.Entity(attributes, entity.properties, entity.detail)
+
+
+def _bytes_per_loaded_field(document):
+    """ Получить количество байт на поле схемы, считанной из XML, вместе со всеми ее объектами. """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    schema = xml_to_ram._read_unvalidated(BytesIO(document))[0]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del schema
+    return (after - before) / (TABLE_COUNT * TABLE_FIELD_COUNT)
+
+
+def main():
+    samples = _sample_attributes()
+    legacy = _bytes_per_field(_legacy_create_field, samples)
+    slotted = _bytes_per_field(_create_field, samples)
+    print('Python %s. Память на поле (%d полей): словарь атрибутов %.0f байт, __slots__ %.0f байт, экономия %.0f%%'
+          % (sys.version.split()[0], FIELD_COUNT, legacy, slotted, 100 * (1 - slotted / legacy)))
+
+    # Замер без интернирования выполняется первым: интернированные строки остаются
+    # в памяти процесса и исказили бы второй замер.
+    document = _schema_document()
+    readers = {}
+    for name in ('DOMAIN', 'TABLE', 'FIELD', 'CONSTRAINT', 'INDEX', 'CONSTRAINT_DETAIL', 'INDEX_DETAIL'):
+        reader_name = '_%s_READER' % name
+        readers[reader_name] = getattr(xml_to_ram, reader_name)
+        setattr(xml_to_ram, reader_name, ram_attributes.compile_xml_reader(
+            _without_interning(getattr(ram_attributes, name)), xml_to_ram.UnsupportedPropertyError))
+    try:
+        plain = _bytes_per_loaded_field(document)
+    finally:
+        for reader_name, reader in readers.items():
+            setattr(xml_to_ram, reader_name, reader)
+    shared = _bytes_per_loaded_field(document)
+    print('Память на поле считанной схемы (%d полей): без интернирования %.0f байт, с интернированием %.0f байт, '
+          'экономия %.0f%%' % (TABLE_COUNT * TABLE_FIELD_COUNT, plain, shared, 100 * (1 - shared / plain)))
+
+
+if __name__ == '__main__':
+    main()
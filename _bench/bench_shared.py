@@ -0,0 +1,48 @@
+""" Замер передачи схемы процессам-обработчикам: сериализация схемы в каждую задачу против
+общего каталога в разделяемой памяти. Каждая задача просматривает все поля схемы.
+
+Запуск из корня репозитория: python -m _bench.bench_shared
+"""
+
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing import get_context
+
+from _bench.bench_memory import _schema_document
+from ram_repr import ram_shared
+from xml_repr import xml_to_ram
+
+WORKERS = 4
+TASKS = 8
+
+
+def _count_required(schema):
+    """ Подсчитать обязательные поля схемы (выполняется в дочернем процессе). """
+    return sum(field.required for table in schema.tables.values() for field in table.fields.values())
+
+
+def _measure(schema):
+    """ Получить время выполнения задач в пуле процессов в секундах. """
+    with ProcessPoolExecutor(WORKERS, mp_context=get_context('spawn')) as executor:
+        # Запуск процессов не входит в замер.
+        list(executor.map(abs, range(WORKERS)))
+        start = time.perf_counter()
+        list(executor.map(_count_required, [schema] * TASKS))
+        return time.perf_counter() - start
+
+
+def main():
+    schema = xml_to_ram.read(BytesIO(_schema_document()))[0]
+    pickled = _measure(schema)
+    with ram_shared.SharedCatalog([schema]) as catalog:
+        shared = _measure(catalog[0])
+        print('Задачи (%d процесса, %d задач): сериализация схемы %.3f с (%d байт на задачу), '
+              'разделяемая память %.3f с (%d байт на задачу, блок %d байт)'
+              % (WORKERS, TASKS, pickled, len(pickle.dumps(schema, pickle.HIGHEST_PROTOCOL)), shared,
+                 len(pickle.dumps(catalog[0], pickle.HIGHEST_PROTOCOL)), catalog.memory.size))
+
+
+if __name__ == '__main__':
+    main()
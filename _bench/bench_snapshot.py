@@ -0,0 +1,55 @@
+""" Замер времени загрузки схемы: разбор XML-представления, pickle и двоичный снимок.
+
+Запуск из корня репозитория: python -m _bench.bench_snapshot
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+from _bench.bench_memory import _schema_document
+from ram_repr import ram_snapshot
+from xml_repr import xml_to_ram
+
+
+def _measure(function, argument):
+    """ Получить время выполнения функции в секундах. """
+    start = time.perf_counter()
+    function(argument)
+    return time.perf_counter() - start
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        document = _schema_document()
+        xml_path = os.path.join(directory, 'bench.xml')
+        with open(xml_path, 'wb') as file:
+            file.write(document)
+        schemas = xml_to_ram.read(xml_path)
+
+        pickle_path = os.path.join(directory, 'bench.pickle')
+        with open(pickle_path, 'wb') as file:
+            pickle.dump(schemas, file, pickle.HIGHEST_PROTOCOL)
+        snapshot_path = os.path.join(directory, 'bench' + ram_snapshot.SNAPSHOT_EXTENSION)
+        ram_snapshot.dump(schemas, snapshot_path)
+        del schemas
+
+        def load_pickle(path):
+            with open(path, 'rb') as file:
+                return pickle.load(file)
+
+        parsed = _measure(xml_to_ram.read, xml_path)
+        pickled = _measure(load_pickle, pickle_path)
+        loaded = _measure(ram_snapshot.load, snapshot_path)
+        print('Загрузка схемы: XML %.3f с (%d байт), pickle %.3f с (%d байт), снимок %.3f с (%d байт)'
+              % (parsed, len(document), pickled, os.path.getsize(pickle_path), loaded,
+                 os.path.getsize(snapshot_path)))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
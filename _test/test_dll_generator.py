@@ -2,6 +2,8 @@ import re
 import unittest
 
 from db_deploy.ddl_generator import DdlGenerator
+from ram_repr.ram_structure import Constraint
+from ram_repr.ram_structure import ConstraintDetail
 from ram_repr.ram_structure import Domain
 from ram_repr.ram_structure import Field
 from ram_repr.ram_structure import Schema
@@ -51,6 +53,141 @@ class TestDdlGenerator(unittest.TestCase):
                          self.white_space.sub("", result).replace('\n', ''))
 
 
+    def test_create_migration_ddl(self):
+        new_schema = Schema()
+        new_schema.name = 'dbo'
+        new_schema.add_domain(self.domain)
+        table = Table()
+        table.name = self.table.name
+        for field in self.table.fields.values():
+            table.fields[field.name] = field
+        new_schema.add_table(table)
+        field = Field()
+        field.name = 'Bonus'
+        field.domain = 'Salary'
+        new_schema.add_field(table, field)
+        new_schema.remove_field(table, 'Name')
+        self.schema.tables[self.table.name] = self.table
+
+        result = self.generator.create_migration_ddl([self.schema], [new_schema])
+        ddl = [
+            '''
+            ALTER TABLE dbo."EMPLOYEE_SALARY"
+            DROP COLUMN "Name";
+            ''',
+            '''
+            CREATE DOMAIN dbo."Salary"
+            AS varchar(100);
+
+            COMMENT ON DOMAIN dbo."Salary"
+            IS 'Зарплата работников';
+            ''',
+            '''
+            ALTER TABLE dbo."EMPLOYEE_SALARY"
+            ADD COLUMN "Bonus" dbo."Salary";
+            '''
+        ]
+        self.assertEqual([self.white_space.sub("", script).replace('\n', '') for script in ddl],
+                         [self.white_space.sub("", script).replace('\n', '') for script in result])
+
+    def test_create_schema_scripts(self):
+        # CHILD -> PARENT, EMPLOYEE <-> DEPARTMENT
+        for name, reference in (('CHILD', 'PARENT'), ('PARENT', None), ('EMPLOYEE', 'DEPARTMENT'),
+                                ('DEPARTMENT', 'EMPLOYEE')):
+            table = Table()
+            table.name = name
+            if reference is not None:
+                constraint = Constraint()
+                constraint.kind, constraint.reference = 'FOREIGN', reference
+                table.constraints.append(constraint)
+            self.schema.tables[name] = table
+
+        scripts, scripts_foreign = self.generator.create_schema_scripts(self.schema)
+        created = [script for script in scripts if 'CREATE TABLE' in script]
+        self.assertLess(created.index('\nCREATE TABLE dbo."PARENT" (\n\n);'),
+                        created.index('\nCREATE TABLE dbo."CHILD" (\n\n);'))
+        self.assertTrue(any('REFERENCES dbo."PARENT"' in script for script in scripts))
+        self.assertEqual(len(scripts_foreign), 1)
+        self.assertIn('FOREIGN KEY', scripts_foreign[0])
+
+    def test_object_names(self):
+        table = Table()
+        table.name = 'T' * 70
+        for reference in ('PARENT', 'OTHER'):
+            constraint = Constraint()
+            constraint.kind, constraint.reference = 'FOREIGN', reference
+            detail = ConstraintDetail()
+            detail.value = 'ID'
+            constraint.details.append(detail)
+            table.constraints.append(constraint)
+        names = [self.generator._get_constraint_name(constraint, table, self.schema) for constraint in table.constraints]
+        self.assertEqual(names, ['T' * 55 + '_ID_fkey', 'T' * 54 + '_ID_fkey1'])
+        self.assertTrue(all(len(name) <= 63 for name in names))
+
+        check = Constraint()
+        check.kind = 'CHECK'
+        new_table = Table()
+        new_table.name = self.table.name
+        new_table.fields = self.table.fields
+        self.table.constraints.append(check)
+        self.schema.tables[self.table.name] = self.table
+        new_schema = Schema()
+        new_schema.name = 'dbo'
+        new_schema.tables[new_table.name] = new_table
+        self.assertEqual(self.generator.create_migration_ddl([self.schema], [new_schema]), [])
+
+    def test_migration_in_place(self):
+        self.schema.tables[self.table.name] = self.table
+        new_schema = Schema()
+        new_schema.name = 'dbo'
+        table = Table()
+        table.name = self.table.name
+        for field in self.table.fields.values():
+            copy = Field()
+            copy.name, copy.type, copy.domain = field.name, field.type, field.domain
+            table.fields[copy.name] = copy
+        new_schema.tables[table.name] = table
+        self.assertEqual(self.generator.create_migration_ddl([self.schema], [new_schema]), [])
+
+        table.fields['Salary'].domain = 'Bonus'
+        result = self.generator.create_migration_ddl([self.schema], [new_schema])
+        self.assertEqual(len(result), 1)
+        self.assertIn('"Bonus"', result[0])
+
+    def test_migration_database_names(self):
+        def schema_with(references, name=None):
+            schema = Schema()
+            schema.name = 'dbo'
+            table = Table()
+            table.name = 'T'
+            for reference in references:
+                constraint = Constraint()
+                constraint.kind, constraint.reference, constraint.name = 'FOREIGN', reference, name
+                detail = ConstraintDetail()
+                detail.value = 'ID'
+                constraint.details.append(detail)
+                table.constraints.append(constraint)
+            schema.tables[table.name] = table
+            return schema
+
+        # Первый из одинаковых по полям ключей удален ранее: в базе остался T_ID_fkey1.
+        names = self.generator.database_names([('dbo', 'T', 'T_ID_fkey1', 'f', ['ID'], 'OTHER')], [])
+        result = self.generator.create_migration_ddl([schema_with(['OTHER'])], [schema_with([])], names)
+        self.assertEqual(len(result), 1)
+        self.assertIn('DROP CONSTRAINT "T_ID_fkey1"', result[0])
+
+        # Новый ключ не получает имя, занятое в базе.
+        result = self.generator.create_migration_ddl([schema_with(['OTHER'])], [schema_with(['OTHER', 'PARENT'])],
+                                                     names)
+        self.assertIn('ADD CONSTRAINT "T_ID_fkey"', result[0])
+
+        # База развернута без явных имен: удаляется ключ с именем, назначенным PostgreSQL.
+        names = self.generator.database_names([('dbo', 'T', 'T_ID_fkey', 'f', ['ID'], 'OTHER')], [])
+        result = self.generator.create_migration_ddl([schema_with(['OTHER'], 'FK_T')], [schema_with([])], names)
+        self.assertIn('DROP CONSTRAINT "T_ID_fkey"', result[0])
+        result = self.generator.create_migration_ddl([schema_with(['OTHER'], 'FK_T')], [schema_with([])])
+        self.assertIn('DROP CONSTRAINT "FK_T"', result[0])
+
     def test_create_table_ddl(self):
         result = self.generator.create_table_ddl(self.table, self.schema)
         print(result)
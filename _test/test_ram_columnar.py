@@ -0,0 +1,56 @@
+import unittest
+from io import BytesIO
+
+from _test.test_xml_readers import SOURCE
+from _test.test_xml_readers import describe
+from ram_repr import ram_to_xml
+from ram_repr.ram_columnar import ColumnarFields
+from ram_repr.ram_columnar import columnar
+from ram_repr.ram_diff import equal
+from ram_repr.ram_fingerprint import fingerprint
+from ram_repr.ram_structure import Field
+from xml_repr import xml_to_ram
+
+
+class TestRamColumnar(unittest.TestCase):
+    def setUp(self):
+        self.expected = xml_to_ram.read(BytesIO(SOURCE.encode('utf-8')))[0]
+        self.schema = xml_to_ram.read(BytesIO(SOURCE.encode('utf-8')))[0]
+        self.strings = columnar(self.schema)
+
+    def test_interface(self):
+        fields = self.schema.tables['TASKS'].fields
+        self.assertIsInstance(fields, ColumnarFields)
+        self.assertIs(self.schema.tables['PROJECTS'].fields.strings, self.strings)
+        self.assertEqual(describe(self.expected), describe(self.schema))
+        self.assertEqual(fingerprint(self.expected), fingerprint(self.schema))
+        self.assertEqual(list(fields), ['ID', 'PROJECT', 'NAME'])
+        self.assertIn('NAME', fields)
+        self.assertEqual(fields['NAME'], fields.values()[2])
+
+        output = BytesIO()
+        ram_to_xml.write(self.schema, output)
+        self.assertEqual(output.getvalue().decode('utf-8'), SOURCE)
+
+    def test_changes(self):
+        table = self.schema.tables['TASKS']
+        project = table.fields['PROJECT']
+        self.assertEqual(self.schema.references.fields_of_domain('Code')[2], (table, project))
+
+        field = Field()
+        field.name, field.domain, field.required = 'DEADLINE', 'Name', True
+        self.schema.add_field(table, field)
+        self.schema.remove_field(table, 'ID')
+        self.assertEqual(list(table.fields), ['PROJECT', 'NAME', 'DEADLINE'])
+        self.assertNotIn('ID', table.fields)
+        self.assertTrue(table.fields['DEADLINE'].required)
+        self.assertEqual(self.schema.references.fields_of_domain('Code'),
+                         [(self.schema.tables['PROJECTS'], self.schema.tables['PROJECTS'].fields['ID']),
+                          (table, project)])
+
+        table.fields['NAME'].description = 'Наименование'
+        self.schema.touch(table)
+        self.assertFalse(equal(self.expected, self.schema))
+        table.fields.compact()
+        self.assertEqual(len(table.fields.flags), 3)
+        self.assertEqual(table.fields['NAME'].description, 'Наименование')
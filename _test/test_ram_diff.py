@@ -0,0 +1,98 @@
+import unittest
+
+from ram_repr.ram_diff import diff
+from ram_repr.ram_diff import equal
+from ram_repr.ram_structure import Constraint
+from ram_repr.ram_structure import ConstraintDetail
+from ram_repr.ram_structure import Domain
+from ram_repr.ram_structure import Field
+from ram_repr.ram_structure import Schema
+from ram_repr.ram_structure import Table
+
+
+def _schema():
+    schema = Schema()
+    schema.name = 'TASKS'
+    domain = Domain()
+    domain.name, domain.type = 'Code', 'INTEGER'
+    schema.domains[domain.name] = domain
+    for name in ('TASKS', 'USERS'):
+        table = Table()
+        table.name = name
+        for field_name in ('ID', 'NAME'):
+            field = Field()
+            field.name, field.domain = field_name, 'Code'
+            table.fields[field_name] = field
+        key = Constraint()
+        key.kind = 'PRIMARY'
+        detail = ConstraintDetail()
+        detail.value = 'ID'
+        key.details.append(detail)
+        table.constraints.append(key)
+        schema.tables[name] = table
+    return schema
+
+
+class TestRamDiff(unittest.TestCase):
+    def test_equal(self):
+        self.assertFalse(diff(_schema(), _schema()))
+        self.assertTrue(equal(_schema(), _schema()))
+
+    def test_order(self):
+        old, new = _schema(), _schema()
+        new.tables = {name: new.tables[name] for name in reversed(list(new.tables))}
+        table = new.tables['TASKS']
+        table.fields = {name: table.fields[name] for name in reversed(list(table.fields))}
+        new.touch()
+        self.assertFalse(equal(old, new))
+        self.assertTrue(equal(old, new, ordered=False))
+
+        result = diff(old, new)
+        self.assertTrue(result.reordered)
+        self.assertEqual([(table_diff.new.name, table_diff.reordered) for table_diff in result.changed_tables],
+                         [('TASKS', True)])
+        self.assertEqual(str(result), '~ порядок доменов или таблиц\n~ таблица TASKS\n  ~ порядок элементов')
+
+    def test_changes(self):
+        old, new = _schema(), _schema()
+        table = new.tables['TASKS']
+        new.remove_field(table, 'NAME')
+        field = Field()
+        field.name, field.domain = 'TITLE', 'Code'
+        new.add_field(table, field)
+        new.tables['USERS'].fields['NAME'].required = True
+        new.touch(new.tables['USERS'])
+        new.remove_constraint(table, table.constraints[0])
+        new.remove_domain('Code')
+
+        result = diff(old, new)
+        self.assertTrue(result)
+        self.assertFalse(result.properties)
+        self.assertEqual([domain.name for domain in result.removed_domains], ['Code'])
+        self.assertEqual(result.added_tables + result.removed_tables, [])
+        tasks, users = result.changed_tables
+        self.assertEqual([field.name for field in tasks.added_fields], ['TITLE'])
+        self.assertEqual([field.name for field in tasks.removed_fields], ['NAME'])
+        self.assertEqual(tasks.removed_constraints, old.tables['TASKS'].constraints)
+        self.assertEqual([(old_field.name, new_field.name) for old_field, new_field in users.changed_fields],
+                         [('NAME', 'NAME')])
+        self.assertEqual(users.added_constraints + users.removed_constraints, [])
+        self.assertEqual(str(result), '- домен Code\n~ таблица TASKS\n  + поле TITLE\n  - поле NAME\n'
+                                      '  - ограничение  PRIMARY (ID)\n~ таблица USERS\n  ~ поле NAME')
+
+    def test_changes_in_place(self):
+        old, new = _schema(), _schema()
+        self.assertTrue(equal(old, new))
+        field = new.tables['USERS'].fields['NAME']
+        field.required = True
+        self.assertFalse(equal(old, new))
+        self.assertFalse(equal(old, new, ordered=False))
+        result = diff(old, new)
+        self.assertEqual(str(result), '~ таблица USERS\n  ~ поле NAME')
+
+        field.required = False
+        field.domain = 'Name'
+        self.assertEqual([(old_field.name, new_field.name) for old_field, new_field
+                          in diff(old, new).changed_tables[0].changed_fields], [('NAME', 'NAME')])
+        old.tables['TASKS'].fields['ID'].domain = 'Name'
+        self.assertEqual([table_diff.new.name for table_diff in diff(old, new).changed_tables], ['TASKS', 'USERS'])
@@ -0,0 +1,65 @@
+import unittest
+
+from ram_repr.ram_structure import Constraint
+from ram_repr.ram_structure import Schema
+from ram_repr.ram_structure import Table
+
+
+def _schema(references: dict):
+    """ Создать схему с таблицами и внешними ключами {имя таблицы: имена таблиц ссылок}. """
+    schema = Schema()
+    schema.name = 'dbo'
+    for name, referenced in references.items():
+        table = Table()
+        table.name = name
+        for reference in referenced:
+            constraint = Constraint()
+            constraint.kind, constraint.reference = 'FOREIGN', reference
+            table.constraints.append(constraint)
+        schema.tables[name] = table
+    return schema
+
+
+class TestForeignKeyGraph(unittest.TestCase):
+    def setUp(self):
+        # ORDER -> CLIENT, ORDER_LINE -> ORDER, GOODS; EMPLOYEE <-> DEPARTMENT; NODE -> NODE.
+        self.schema = _schema({'ORDER_LINE': ['ORDER', 'GOODS', 'MISSING'], 'ORDER': ['CLIENT'], 'CLIENT': [],
+                               'GOODS': [], 'EMPLOYEE': ['DEPARTMENT'], 'DEPARTMENT': ['EMPLOYEE'],
+                               'NODE': ['NODE']})
+
+    def test_order(self):
+        graph = self.schema.graph
+        order = graph.order()
+        self.assertEqual(sorted(order), sorted(self.schema.tables))
+        position = {name: number for number, name in enumerate(order)}
+        for name, referenced in graph.references.items():
+            for reference in referenced:
+                if not graph.in_cycle(name, reference):
+                    self.assertLess(position[reference], position[name])
+        self.assertEqual(graph.references['ORDER_LINE'], ['ORDER', 'GOODS'])
+        self.assertEqual(sorted(sorted(cycle) for cycle in graph.cycles()), [['DEPARTMENT', 'EMPLOYEE'], ['NODE']])
+        self.assertTrue(graph.in_cycle('EMPLOYEE', 'DEPARTMENT'))
+        self.assertFalse(graph.in_cycle('ORDER', 'CLIENT'))
+        self.assertEqual(sorted(sorted(component) for component in graph.components()),
+                         [['CLIENT', 'GOODS', 'ORDER', 'ORDER_LINE'], ['DEPARTMENT', 'EMPLOYEE'], ['NODE']])
+
+    def test_cache(self):
+        schema = self.schema
+        graph = schema.graph
+        self.assertIs(schema.graph, graph)
+        constraint = Constraint()
+        constraint.kind, constraint.reference = 'FOREIGN', 'ORDER_LINE'
+        schema.add_constraint(schema.tables['CLIENT'], constraint)
+        self.assertIsNot(schema.graph, graph)
+        self.assertEqual(sorted(sorted(cycle) for cycle in schema.graph.cycles()),
+                         [['CLIENT', 'ORDER', 'ORDER_LINE'], ['DEPARTMENT', 'EMPLOYEE'], ['NODE']])
+        schema.remove_table('NODE')
+        self.assertNotIn('NODE', schema.graph.order())
+
+    def test_long_chain(self):
+        count = 20000
+        schema = _schema({'T%d' % number: ['T%d' % (number + 1)] if number + 1 < count else []
+                          for number in range(count)})
+        self.assertEqual(schema.graph.order(), ['T%d' % number for number in reversed(range(count))])
+        self.assertEqual(schema.graph.cycles(), [])
+        self.assertEqual(len(schema.graph.components()), 1)
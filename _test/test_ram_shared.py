@@ -0,0 +1,76 @@
+import os
+import pickle
+import subprocess
+import sys
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing import get_context
+
+from _test.test_xml_readers import SOURCE
+from _test.test_xml_readers import describe
+from ram_repr import ram_shared
+from ram_repr import ram_to_xml
+from ram_repr.ram_diff import equal
+from xml_repr import xml_to_ram
+
+
+@unittest.skipUnless(ram_shared.available(), 'разделяемая память не поддерживается')
+class TestRamShared(unittest.TestCase):
+    def setUp(self):
+        self.schema = xml_to_ram.read(BytesIO(SOURCE.encode('utf-8')))[0]
+        self.catalog = ram_shared.SharedCatalog([self.schema])
+
+    def tearDown(self):
+        self.catalog.close()
+        self.catalog.unlink()
+
+    def test_views(self):
+        view = self.catalog[0]
+        self.assertEqual(len(self.catalog), 1)
+        self.assertEqual(describe(self.schema), describe(view))
+        self.assertEqual(list(view.tables), ['PROJECTS', 'TASKS'])
+        self.assertIn('TASKS', view.tables)
+        self.assertEqual(view.tables['TASKS'].constraints[-1].reference, 'PROJECTS')
+        with self.assertRaises(AttributeError):
+            view.tables['TASKS'].fields['NAME'].required = True
+
+        output = BytesIO()
+        ram_to_xml.write(view, output)
+        self.assertEqual(output.getvalue().decode('utf-8'), SOURCE)
+        self.assertTrue(equal(self.schema, self.catalog.load()[0]))
+
+    def test_workers(self):
+        view = self.catalog[0]
+        data = pickle.dumps(view)
+        self.assertNotIn(b'PROJECTS', data)
+        self.assertEqual(describe(self.schema), describe(pickle.loads(data)))
+
+        with ProcessPoolExecutor(2, mp_context=get_context('spawn')) as executor:
+            results = list(executor.map(describe, [view] * 4))
+        self.assertEqual([describe(self.schema)] * 4, results)
+
+    def test_independent_process(self):
+        # Независимый процесс подключается по имени и завершается; его процесс учета
+        # ресурсов (если он был запущен) не должен удалить блок владельца.
+        script = ('import sys\n'
+                  'from multiprocessing import resource_tracker\n'
+                  'from ram_repr import ram_shared\n'
+                  'catalog = ram_shared.attach(sys.argv[1])\n'
+                  'print(catalog[0].name, getattr(resource_tracker._resource_tracker, "_pid", None) or 0)\n')
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output([sys.executable, '-c', script, self.catalog.name], cwd=root)
+        name, tracker = output.decode().split()
+        self.assertEqual(name, self.schema.name)
+        for _ in range(100 if int(tracker) else 0):
+            try:
+                os.kill(int(tracker), 0)
+            except OSError:
+                break
+            time.sleep(0.05)
+
+        with ram_shared.SharedCatalog(name=self.catalog.name) as catalog:
+            self.assertEqual(describe(self.schema), describe(catalog[0]))
+        self.catalog.unlink()
+        self.catalog.unlink()
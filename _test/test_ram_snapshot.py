@@ -0,0 +1,52 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from io import BytesIO
+
+from _test.test_xml_readers import SOURCE
+from _test.test_xml_readers import describe
+from ram_repr import ram_snapshot
+from ram_repr.ram_diff import equal
+from xml_repr import xml_to_ram
+
+
+class TestRamSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.schema = xml_to_ram.read(BytesIO(SOURCE.encode('utf-8')))[0]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        path = os.path.join(self.directory, 'tasks' + ram_snapshot.SNAPSHOT_EXTENSION)
+        ram_snapshot.dump([self.schema], path)
+        schema = ram_snapshot.load(path)[0]
+        self.assertEqual(describe(self.schema), describe(schema))
+        self.assertTrue(equal(self.schema, schema))
+        self.assertIs(schema.tables['TASKS'].fields['ID'].domain, schema.tables['PROJECTS'].fields['ID'].domain)
+
+    def test_values(self):
+        domain = self.schema.domains['Code']
+        domain.width = 5
+        self.schema.tables['TASKS'].indexes[0].local = 1
+        output = BytesIO()
+        ram_snapshot.dump([self.schema, self.schema], output)
+        schemas = ram_snapshot.load(output.getvalue())
+        self.assertEqual(len(schemas), 2)
+        self.assertEqual(schemas[1].domains['Code'].width, 5)
+        self.assertEqual(schemas[1].domains['Name'].width, '20')
+        self.assertIs(schemas[1].tables['TASKS'].indexes[0].local, 1)
+        self.assertIs(schemas[1].tables['PROJECTS'].indexes[0].local, False)
+
+    def test_version(self):
+        output = BytesIO()
+        ram_snapshot.dump([self.schema], output)
+        data = bytearray(output.getvalue())
+        struct.pack_into('<H', data, 4, ram_snapshot.SNAPSHOT_VERSION + 1)
+        with self.assertRaises(ram_snapshot.SnapshotVersionError):
+            ram_snapshot.load(bytes(data))
+        with self.assertRaises(ram_snapshot.SnapshotFormatError):
+            ram_snapshot.load(b'<?xml version="1.0"?>')
@@ -0,0 +1,98 @@
+import unittest
+
+from ram_repr.ram_fingerprint import changed
+from ram_repr.ram_fingerprint import fingerprint
+from ram_repr.ram_structure import Constraint
+from ram_repr.ram_structure import Field
+from ram_repr.ram_structure import Index
+from ram_repr.ram_structure import IndexDetail
+from ram_repr.ram_structure import Schema
+from ram_repr.ram_structure import Table
+
+
+class TestRamStructure(unittest.TestCase):
+    def test_flags(self):
+        field = Field()
+        self.assertFalse(field.required)
+        field.input = True
+        field.required = 1
+        self.assertEqual(field.flags, Field.INPUT | Field.REQUIRED)
+        self.assertIs(field.required, True)
+        field.input = False
+        self.assertEqual(field.flags, Field.REQUIRED)
+
+    def test_cascading_delete(self):
+        constraint = Constraint()
+        self.assertIsNone(constraint.cascading_delete)
+        constraint.has_value_edit = True
+        for value in (False, True, None):
+            constraint.cascading_delete = value
+            self.assertIs(constraint.cascading_delete, value)
+            self.assertTrue(constraint.has_value_edit)
+
+    def test_references(self):
+        schema = Schema()
+        parent, child = Table(), Table()
+        parent.name, child.name = 'PARENT', 'CHILD'
+        for table in (parent, child):
+            field = Field()
+            field.name, field.domain = 'ID', 'Code'
+            table.fields[field.name] = field
+            key = Constraint()
+            key.kind = 'PRIMARY'
+            table.constraints.append(key)
+            schema.tables[table.name] = table
+        references = schema.references
+        self.assertEqual(len(references.fields_of_domain('Code')), 2)
+        self.assertEqual(references.primary_keys_of('CHILD'), child.constraints)
+
+        foreign = Constraint()
+        foreign.kind, foreign.reference = 'FOREIGN', 'PARENT'
+        schema.add_constraint(child, foreign)
+        self.assertEqual(references.referencing('PARENT'), [(child, foreign)])
+        self.assertIs(references.referenced_table(foreign), parent)
+
+        index = Index()
+        detail = IndexDetail()
+        detail.value = 'ID'
+        index.details.append(detail)
+        schema.add_index(child, index)
+        self.assertEqual(references.indexes_of_field('CHILD', 'ID'), [index])
+
+        schema.remove_table('CHILD')
+        self.assertEqual(references.referencing('PARENT'), [])
+        self.assertEqual(references.indexes_of_field('CHILD', 'ID'), [])
+        self.assertEqual(references.fields_of_domain('Code'), [(parent, parent.fields['ID'])])
+
+    def test_fingerprint(self):
+        schemas = []
+        for _ in range(2):
+            schema = Schema()
+            schema.name = 'TASKS'
+            for name in ('FIRST', 'SECOND'):
+                table = Table()
+                table.name = name
+                field = Field()
+                field.name = 'ID'
+                table.fields[field.name] = field
+                schema.tables[name] = table
+            schemas.append(schema)
+        old, new = schemas
+        self.assertEqual(fingerprint(old), fingerprint(new))
+        self.assertEqual(changed(old, new), ([], []))
+
+        field = new.tables['SECOND'].fields['ID']
+        field.required = True
+        self.assertEqual(fingerprint(old), fingerprint(new))
+        new.touch(new.tables['SECOND'])
+        self.assertNotEqual(fingerprint(old), fingerprint(new))
+        self.assertEqual(changed(old, new), ([], ['SECOND']))
+
+        table = Table()
+        table.name = 'THIRD'
+        new.add_table(table)
+        self.assertEqual(changed(old, new), ([], ['SECOND', 'THIRD']))
+        new.remove_table('THIRD')
+        field.required = False
+        new.touch(new.tables['SECOND'])
+        self.assertEqual(fingerprint(old), fingerprint(new))
@@ -0,0 +1,130 @@
+import unittest
+from io import BytesIO
+
+from _test.test_xml_readers import SOURCE
+from ram_repr import ram_validation
+from ram_repr.ram_structure import Constraint
+from ram_repr.ram_structure import ConstraintDetail
+from xml_repr import xml_to_ram
+
+
+class TestRamValidation(unittest.TestCase):
+    def setUp(self):
+        self.schema = xml_to_ram.read(BytesIO(SOURCE.encode('utf-8')))[0]
+
+    def test_valid(self):
+        self.assertEqual(ram_validation.validate(self.schema), [])
+        ram_validation.validate_schema(self.schema)
+
+    def test_violations(self):
+        self.schema.domains['Name'].type = 'TEXT'
+        tasks = self.schema.tables['TASKS']
+        tasks.fields['PROJECT'].domain = 'Project'
+        tasks.fields['NAME'].domain = None
+        primary = Constraint()
+        primary.kind = 'PRIMARY'
+        detail = ConstraintDetail()
+        detail.value = 'CODE'
+        primary.details.append(detail)
+        tasks.constraints.append(primary)
+        tasks.constraints[1].reference = 'PROJECT'
+
+        violations = ram_validation.validate(self.schema)
+        self.assertEqual([(violation.path[1:], type(violation.error)) for violation in violations], [
+            (('Домен Name',), ram_validation.UnsupportedDataTypeError),
+            (('Таблица TASKS', 'Поле PROJECT'), ram_validation.ElementReferenceError),
+            (('Таблица TASKS', 'Поле NAME'), ram_validation.EmptyRequiredPropertyError),
+            (('Таблица TASKS', 'Ограничение №2'), ram_validation.ElementReferenceError),
+            (('Таблица TASKS', 'Ограничение №3'), ram_validation.UniqueViolationError),
+            (('Таблица TASKS', 'Ограничение №3', 'Деталь CODE'), ram_validation.ElementReferenceError),
+        ])
+        self.assertEqual(str(violations[1]), 'Схема TASKS. Таблица TASKS. Поле PROJECT. '
+                                             'Задана ссылка на неопределенный элемент "Project"')
+
+        with self.assertRaises(ram_validation.SchemaValidationError) as context:
+            ram_validation.validate_schema(self.schema)
+        self.assertEqual(len(context.exception.violations), 6)
+
+    def test_parallel(self):
+        tasks = self.schema.tables['TASKS']
+        tasks.fields['PROJECT'].domain = 'Project'
+        tasks.constraints[1].reference = 'PROJECT'
+        expected = [str(violation) for violation in ram_validation.validate(self.schema)]
+
+        threshold = ram_validation.PARALLEL_THRESHOLD
+        ram_validation.PARALLEL_THRESHOLD = 1
+        try:
+            violations = ram_validation.validate(self.schema, 2)
+        finally:
+            ram_validation.PARALLEL_THRESHOLD = threshold
+        self.assertEqual(expected, [str(violation) for violation in violations])
+
+    def test_incremental(self):
+        validator = ram_validation.IncrementalValidator(self.schema)
+        self.assertEqual(validator.validate(), [])
+        self.assertEqual(validator.checked, ['PROJECTS', 'TASKS'])
+        self.assertEqual(validator.validate(), [])
+        self.assertEqual(validator.checked, [])
+
+        tasks = self.schema.tables['TASKS']
+        tasks.fields['NAME'].domain = None
+        validator.mark(tasks)
+        violations = validator.validate()
+        self.assertEqual(validator.checked, ['TASKS'])
+        self.assertEqual([violation.path[1:] for violation in violations], [('Таблица TASKS', 'Поле NAME')])
+
+        # Удаление таблицы требует повторной проверки ссылающихся на нее таблиц.
+        tasks.fields['NAME'].domain = 'Name'
+        validator.mark(tasks)
+        self.schema.remove_table('PROJECTS')
+        violations = validator.validate()
+        self.assertEqual(validator.checked, ['TASKS'])
+        self.assertEqual([str(violation) for violation in violations],
+                         [str(violation) for violation in ram_validation.validate(self.schema)])
+        self.assertEqual(len(violations), 1)
+
+        self.schema.remove_domain('Name')
+        self.assertEqual(len(validator.validate()), 2)
+        self.assertEqual(validator.checked, ['TASKS'])
+
+    def test_rules(self):
+        registry = ram_validation.RULES.copy()
+
+        def indexed_fields(schema):
+            return {(table.name, index.details[0].value) for table in schema.tables.values()
+                    for index in table.indexes if index.details}
+
+        registry.add_index('indexed_fields', indexed_fields)
+
+        @registry.rule(ram_validation.TABLE)
+        def upper_case_name(table, context):
+            if table.name != table.name.upper():
+                yield ram_validation.ValidationError('Имя таблицы должно быть в верхнем регистре')
+
+        @registry.rule(ram_validation.CONSTRAINT, needs=('indexed_fields',), warning=True)
+        def indexed_foreign_key(constraint, context):
+            if constraint.kind == 'FOREIGN' \
+                    and (context.table.name, constraint.details[0].value) not in context.index('indexed_fields'):
+                yield ram_validation.ValidationError('Внешний ключ по неиндексированному полю')
+
+        self.assertEqual(ram_validation.validate(self.schema, registry=registry), [])
+        self.schema.tables['TASKS'].indexes = []
+        violations = ram_validation.validate(self.schema, registry=registry)
+        self.assertEqual([(violation.rule, violation.warning) for violation in violations],
+                         [('indexed_foreign_key', True)])
+        ram_validation.validate_schema(self.schema, registry=registry)
+        self.assertEqual(ram_validation.validate(self.schema), [])
+
+        self.schema.tables['TASKS'].name = 'Tasks'
+        with self.assertRaises(ram_validation.SchemaValidationError) as context:
+            ram_validation.validate_schema(self.schema, registry=registry)
+        self.assertEqual([violation.rule for violation in context.exception.violations], ['upper_case_name'])
+
+        ram_validation.validate(self.schema, registry=registry, profile=True)
+        report = {name: calls for name, calls, _ in registry.report()}
+        self.assertEqual(report['upper_case_name'], 2)
+        self.assertEqual(report['indexed_foreign_key'], 3)
+        registry.remove('upper_case_name')
+        with self.assertRaises(ValueError):
+            registry.add(ram_validation.Rule('missing_index', ram_validation.FIELD, indexed_fields, ('missing',)))
+            registry.compile()
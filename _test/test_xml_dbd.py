@@ -1,33 +1,32 @@
 """ Тестовый модуль, реализующий последовательный запуск создания представления базы в RAM, создания DBD-представления,
-а так же обратный процесс выгрузки DBD-RAM-XML. При этом производится сверка результата выгрузки с исходным файлом.
+а так же обратный процесс выгрузки DBD-RAM-XML. При этом производится структурная сверка полученных схем с исходными.
 """
 
-from codecs import open as _open
-
 from dbd_repr.dbd_to_ram import load
+from ram_repr.ram_diff import diff
 from ram_repr.ram_to_dbd import upload
 from ram_repr.ram_to_xml import write
 from xml_repr.xml_to_ram import read
 
 
-def compare(source, result):
-    """ Построчно сравнить файлы, игнорируя незначащие отступы.
+def compare(source: list, result: list, ordered: bool=True):
+    """ Структурно сравнить схемы, выводя различия.
 
-    :param source: путь к исходному файлу.
-    :param result: путь к результирующему файлу.
-    :return: признак равенства файлов.
+    :param source: исходные схемы.
+    :param result: схемы, полученные в результате преобразований.
+    :param ordered: учитывать порядок элементов схем.
+    :return: признак равенства схем.
     """
-    with _open(result, 'r', 'utf8') as source_file, \
-            _open(source, 'r', 'utf8') as result_file:
-        equal = True
-        for source_line in source_file:
-            result_line = result_file.readline()
-            if source_line.split() != result_line.split():
-                print('Расхождение:')
-                print(source_line)
-                print(result_line)
-                equal = False
-        return equal
+    equal = len(source) == len(result)
+    if not equal:
+        print('Расхождение: количество схем %d и %d.' % (len(source), len(result)))
+    for source_schema, result_schema in zip(source, result):
+        difference = diff(source_schema, result_schema, ordered)
+        if difference:
+            print('Расхождение:')
+            print(difference)
+            equal = False
+    return equal
 
 
 def execute(input, output):
@@ -43,7 +42,7 @@ def execute(input, output):
 
     for schema in new_schemas:
         write(schema, output)
-    if compare(input, output):
+    if compare(schemas, list(new_schemas), ordered=False):
         print('Файлы успешно прошли проверку на идентичность.')
     else:
         print('Файлы не прошли проверку на идентичность.')
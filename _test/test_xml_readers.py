@@ -0,0 +1,220 @@
+import os
+import shutil
+import tempfile
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from ram_repr import ram_to_xml
+from ram_repr.ram_structure import Schema
+from xml_repr import xml_to_ram
+from xml_repr.xml_cache import ParseCache
+
+
+SOURCE = '''<?xml version="1.0" encoding="utf-8"?>
+<dbd_schema fulltext_engine="ORACLE TEXT" version="1.1" name="TASKS" description="Задачи">
+  <custom/>
+  <domains>
+    <domain name="Code" type="CODE" width="5" props="show_null, summable" char_length="10"/>
+    <domain name="Name" description="Наименование" type="STRING" width="20" char_length="100"/>
+  </domains>
+  <tables>
+    <table name="PROJECTS" description="Проекты" props="add, edit, delete">
+      <field name="ID" rname="Ид" domain="Code" props="input, show_in_grid, required"/>
+      <field name="NAME" domain="Name" props="input, edit"/>
+      <constraint kind="PRIMARY" items="ID"/>
+      <index field="NAME" props="uniqueness"/>
+    </table>
+    <table name="TASKS" props="add">
+      <field name="ID" domain="Code"/>
+      <field name="PROJECT" domain="Code"/>
+      <field name="NAME" domain="Name"/>
+      <constraint kind="PRIMARY" items="ID"/>
+      <constraint kind="FOREIGN" items="PROJECT" reference="PROJECTS" props="full_cascading_delete"/>
+      <index name="ix" props="local">
+        <item value="PROJECT"/>
+        <item value="NAME" descend="desc"/>
+      </index>
+    </table>
+  </tables>
+</dbd_schema>
+'''
+
+
+def describe(schema):
+    """ Получить сравнимое представление схемы. """
+    result = [(schema.name, schema.version, schema.fulltext_engine, schema.description)]
+    for domain in schema.domains.values():
+        result.append((domain.name, domain.description, domain.type, domain.width, domain.char_length,
+                       domain.show_null, domain.summable, domain.case_sensitive))
+    for table in schema.tables.values():
+        result.append((table.name, table.description, table.add, table.edit, table.delete))
+        for field in table.fields.values():
+            result.append((field.name, field.rname, field.domain, field.type, field.description,
+                           field.input, field.edit, field.show_in_grid, field.required))
+        for constraint in table.constraints:
+            result.append((constraint.name, constraint.kind, constraint.reference, constraint.cascading_delete,
+                           [detail.value for detail in constraint.details]))
+        for index in table.indexes:
+            result.append((index.name, index.kind, index.local,
+                           [(detail.value, detail.descend) for detail in index.details]))
+    return result
+
+
+class TestXmlReaders(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'tasks.xml')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(SOURCE)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_iter(self):
+        expected = xml_to_ram.read(self.path)[0]
+
+        items = list(xml_to_ram.read_iter(self.path))
+        self.assertIsInstance(items[0], Schema)
+        self.assertEqual(len(items), 3)
+        schema = items[0]
+        self.assertEqual(schema.tables, {})
+        for table in items[1:]:
+            schema.tables[table.name] = table
+        self.assertEqual(describe(expected), describe(schema))
+
+    def test_read_iter_unique_violation(self):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(SOURCE.replace('name="TASKS" props', 'name="PROJECTS" props'))
+        with self.assertRaises(xml_to_ram.ParseError):
+            list(xml_to_ram.read_iter(self.path))
+
+    def test_read_lazy(self):
+        expected = xml_to_ram.read(self.path)[0]
+        index_path = self.path + '.idx'
+
+        schema = xml_to_ram.read_lazy(self.path)[0]
+        with schema.tables:
+            self.assertTrue(os.path.exists(index_path))
+            self.assertEqual(list(schema.tables), ['PROJECTS', 'TASKS'])
+            self.assertEqual(describe(expected), describe(schema))
+
+        # Повторное открытие использует сохраненный индекс.
+        with open(index_path, encoding='utf-8') as file:
+            saved = file.read()
+        with xml_to_ram.read_lazy(self.path)[0].tables as tables:
+            self.assertEqual(tables['TASKS'].fields['PROJECT'].domain, 'Code')
+        with open(index_path, encoding='utf-8') as file:
+            self.assertEqual(saved, file.read())
+
+        # Файл незакрытого словаря закрывается при его удалении.
+        tables = xml_to_ram.read_lazy(self.path)[0].tables
+        file = tables._file
+        del tables
+        self.assertTrue(file.closed)
+
+    def test_read_parallel(self):
+        expected = xml_to_ram.read(self.path)[0]
+        for workers in (1, 2):
+            schema = xml_to_ram.read_parallel(self.path, workers)[0]
+            self.assertEqual(describe(expected), describe(schema))
+
+        # В одном процессе пул процессов не запускается.
+        with mock.patch.object(xml_to_ram, 'ProcessPoolExecutor', side_effect=AssertionError):
+            schema = xml_to_ram.read_parallel(self.path, 1)[0]
+        self.assertEqual(describe(expected), describe(schema))
+
+    def test_read_cached(self):
+        cache = ParseCache(os.path.join(self.directory, 'cache'))
+        expected = xml_to_ram.read(self.path, cache)[0]
+        self.assertIsNotNone(cache.get(self.path))
+
+        schema = xml_to_ram.read(self.path, cache)[0]
+        self.assertIsNot(expected, schema)
+        self.assertEqual(describe(expected), describe(schema))
+
+        cache.invalidate(self.path)
+        self.assertIsNone(cache.get(self.path))
+
+    def test_compressed(self):
+        expected = xml_to_ram.read(self.path)[0]
+        for extension in ('.gz', '.bz2', '.xz'):
+            path = self.path + extension
+            ram_to_xml.write(expected, path)
+            self.assertEqual(describe(expected), describe(xml_to_ram.read(path)[0]))
+            items = list(xml_to_ram.read_iter(path))
+            self.assertEqual([table.name for table in items[1:]], ['PROJECTS', 'TASKS'])
+            with open(path, 'rb') as file:
+                self.assertEqual(describe(expected), describe(xml_to_ram.read(file)[0]))
+
+        output = BytesIO()
+        ram_to_xml.write(expected, output)
+        self.assertEqual(output.getvalue().decode('utf-8'), SOURCE)
+
+    def test_write_escaping(self):
+        schema = xml_to_ram.read(self.path)[0]
+        schema.description = 'Задачи & "проекты" <архив>'
+        schema.tables['TASKS'].fields['NAME'].description = 'a < b'
+
+        output = BytesIO()
+        ram_to_xml.write(schema, output)
+        self.assertFalse(output.closed)
+        self.assertIn('description="Задачи &amp; &quot;проекты&quot; &lt;архив&gt;"'.encode('utf-8'), output.getvalue())
+        output.seek(0)
+        self.assertEqual(describe(schema), describe(xml_to_ram.read(output)[0]))
+
+    def test_write_several_schemas(self):
+        first = xml_to_ram.read(self.path)[0]
+        second = xml_to_ram.read(self.path)[0]
+        second.name = 'ARCHIVE'
+        expected = [describe(first), describe(second)]
+
+        path = os.path.join(self.directory, 'combined.xml')
+        for workers in (1, 2):
+            ram_to_xml.write_combined([first, second], path, workers)
+            self.assertEqual(expected, [describe(schema) for schema in xml_to_ram.read(path)])
+            self.assertEqual(expected, [describe(schema) for schema in xml_to_ram.read_parallel(path)])
+
+        # Результат dbd_to_ram.load - представление значений словаря, а не список.
+        single = os.path.join(self.directory, 'single.xml')
+        ram_to_xml.write_schemas({first.name: first}.values(), single)
+        output = BytesIO()
+        ram_to_xml.write(first, output)
+        with open(single, 'rb') as file:
+            self.assertEqual(output.getvalue(), file.read())
+        ram_to_xml.write_schemas({first.name: first, second.name: second}.values(), path, 1)
+        self.assertEqual(expected, [describe(schema) for schema in xml_to_ram.read(path)])
+
+        paths = ram_to_xml.write_separate([first, second], os.path.join(self.directory, 'schemas'), 2)
+        self.assertEqual([os.path.basename(path) for path in paths], ['TASKS.xml', 'ARCHIVE.xml'])
+        self.assertEqual(expected, [describe(xml_to_ram.read(path)[0]) for path in paths])
+
+    def test_split_layout(self):
+        expected = xml_to_ram.read(self.path)[0]
+        directory = os.path.join(self.directory, 'split')
+        ram_to_xml.write_split(expected, directory)
+        self.assertEqual(sorted(os.listdir(os.path.join(directory, 'tables'))), ['PROJECTS.xml', 'TASKS.xml'])
+
+        for workers in (1, 2):
+            schema = xml_to_ram.read_split(directory, workers=workers)[0]
+            self.assertEqual(describe(expected), describe(schema))
+
+        expected.tables['TASKS'].description = 'Задачи проектов'
+        ram_to_xml.write_split(expected, directory, ['TASKS'])
+        schema = xml_to_ram.read_split(directory, ['TASKS'])[0]
+        self.assertEqual(list(schema.tables), ['TASKS'])
+        self.assertEqual(schema.tables['TASKS'].description, 'Задачи проектов')
+        self.assertRaises(xml_to_ram.ParseError, xml_to_ram.read_split, directory, ['ARCHIVE'])
+
+    def test_write_incremental(self):
+        schema = xml_to_ram.read(self.path)[0]
+        path = os.path.join(self.directory, 'incremental.xml')
+        self.assertEqual(ram_to_xml.write_incremental(schema, path), 2)
+        self.assertEqual(ram_to_xml.write_incremental(schema, path), 0)
+
+        schema.tables['TASKS'].fields['NAME'].required = True
+        self.assertEqual(ram_to_xml.write_incremental(schema, path), 1)
+        output = BytesIO()
+        ram_to_xml.write(schema, output)
+        with open(path, 'rb') as file:
+            self.assertEqual(output.getvalue(), file.read())
@@ -10,9 +10,9 @@ dbd = sys.argv[0]
 xml = sys.argv[1]
 
 print('Создания RAM представления...')
-schemas = dbd2ram.load('dbd_queries_sqlite.cfg', dbd)
+schemas = list(dbd2ram.load('dbd_queries_sqlite.cfg', dbd))
 
 print('Создание XML представления...')
-ram2xml.write(schemas, xml)
+ram2xml.write_schemas(schemas, xml)
 
 print('Выполнение завершено.')
@@ -9,9 +9,9 @@ if len(sys.argv) != 2:
 xml = sys.argv[0]
 
 print('Создание выгрузка метаданных и БД...')
-schemas = dbd2ram.load(queries='dbd_queries_sqlite.cfg', db_config='database.cfg')
+schemas = list(dbd2ram.load(queries='dbd_queries_sqlite.cfg', db_config='database.cfg'))
 
 print('Создание XML представления метаданных...')
-ram2xml.write(schemas, xml)
+ram2xml.write_schemas(schemas, xml)
 
 print('Выполнение завершено.')
@@ -7,6 +7,7 @@ import postgresql
 
 from db_deploy.ddl_generator import DdlGenerator
 from dbd_repr import dbd_to_ram
+from ram_repr import ram_snapshot
 from ram_repr.ram_structure import Constraint
 from ram_repr.ram_structure import Domain
 from ram_repr.ram_structure import Index
@@ -51,6 +52,14 @@ class DbCreationConnection:
         """
         self.conn.execute('DROP DATABASE IF EXISTS ' + db_name)
         self.conn.execute('CREATE DATABASE ' + db_name)
+        self.connect_database(db_name)
+
+    def connect_database(self, db_name: str):
+        """ Сделать активной существующую БД.
+
+        :param db_name: название БД
+        :return: None
+        """
         self.conn.close()
         self.conn = postgresql.open(self.config.get('SERVER', 'postgres_server') + '/' + db_name.lower())
 
@@ -109,21 +118,16 @@ class DbCreationConnection:
     def deploy(self, db_name: str, repr_file: str=None, schemas: list=None):
         """ Создать пустую базу данных PostgreSQL из реляционного, либо текстового представления метеданных.
 
+        Таблицы создаются в порядке зависимостей по внешним ключам; в конце сценария
+        создаются только внешние ключи, замыкающие циклы ссылок между таблицами.
+
         :param db_name: название создаваемой базы данных.
-        :param repr_file: файл текстового, либо реляционного представления метеданных.
+        :param repr_file: файл текстового, либо реляционного представления метеданных, либо снимок схем.
         :param server_config: файл с конфигурацией сервера PostgreSQL
         :return: None
         """
         if not schemas:
-            if repr_file.endswith('.xml'):
-                schemas = xml_to_ram.read(repr_file)
-            elif repr_file.endswith('.db'):
-                schemas = dbd_to_ram.load(queries=self.queries, db_file=repr_file)
-            else:
-                raise UnsupportedFileException()
-
-            if schemas is None or len(schemas) == 0:
-                raise UnsuccessfulTryException()
+            schemas = self._read_schemas(repr_file)
 
         self.create_and_connect_database(db_name)
 
@@ -133,21 +137,9 @@ class DbCreationConnection:
         for schema in schemas:
             if len(schema.tables) == 0:
                 continue
-            scripts.append(self.gen.create_schema_dll(schema))
-            for domain in schema.domains.values():
-                scripts.append(self.gen.create_domain_dll(domain, schema))
-
-            for table in schema.tables.values():
-                scripts.append(self.gen.create_table_ddl(table, schema))
-
-                for index in table.indexes:
-                    scripts.append(self.gen.create_index_ddl(index, table, schema))
-
-                for constraint in table.constraints:
-                    if constraint.kind.upper() == 'FOREIGN':
-                        scripts_foreign.append(self.gen.create_constraint_ddl(constraint, table, schema))
-                    else:
-                        scripts.append(self.gen.create_constraint_ddl(constraint, table, schema))
+            created, created_foreign = self.gen.create_schema_scripts(schema)
+            scripts.extend(created)
+            scripts_foreign.extend(created_foreign)
 
         deploy = 'BEGIN TRANSACTION;'
         deploy += '\n'.join(scripts)
@@ -155,6 +147,66 @@ class DbCreationConnection:
         deploy += 'COMMIT;'
         self.conn.execute(deploy)
 
+    def migrate(self, db_name: str, old_schemas: list, repr_file: str=None, schemas: list=None):
+        """ Привести существующую базу данных PostgreSQL к новому представлению метаданных.
+
+        В отличие от deploy, база не пересоздается: выполняются только инструкции изменения
+        элементов, различающихся в схемах, из которых база развернута, и в новых схемах.
+        Имена удаляемых ограничений и индексов берутся из каталога базы (по содержимому
+        элементов), поэтому поддерживаются и базы, развернутые прежними версиями.
+        Сценарий выполняется в одной транзакции; при ошибке транзакция откатывается.
+
+        :param db_name: название базы данных.
+        :param old_schemas: схемы, из которых развернута база.
+        :param repr_file: файл текстового, либо реляционного представления новых метаданных, либо снимок схем.
+        :param schemas: новые схемы (вместо repr_file).
+        :return: список выполненных DDL-инструкций.
+        """
+        if not schemas:
+            schemas = self._read_schemas(repr_file)
+
+        self.connect_database(db_name)
+        scripts = self.gen.create_migration_ddl(old_schemas, schemas, self._database_names())
+        if not scripts:
+            return scripts
+
+        self.begin_transaction()
+        try:
+            self.conn.execute('\n'.join(scripts))
+        except Exception:
+            self.conn.execute('ROLLBACK;')
+            raise
+        self.commit()
+        return scripts
+
+    def _database_names(self):
+        """ Получить имена первичных и внешних ключей и индексов, существующих в активной БД.
+
+        :return: dict {(схема, таблица): список пар (содержимое элемента, имя)}.
+        """
+        constraints = self.conn.prepare(self.gen.templates.get('existing_constraints'))()
+        indexes = self.conn.prepare(self.gen.templates.get('existing_indexes'))()
+        return self.gen.database_names(constraints, indexes)
+
+    def _read_schemas(self, repr_file: str):
+        """ Считать схемы из файла текстового, либо реляционного представления метаданных.
+
+        :param repr_file: файл представления метаданных.
+        :return: список схем.
+        """
+        if repr_file.endswith('.xml'):
+            schemas = xml_to_ram.read(repr_file)
+        elif repr_file.endswith('.db'):
+            schemas = dbd_to_ram.load(queries=self.queries, db_file=repr_file)
+        elif repr_file.endswith(ram_snapshot.SNAPSHOT_EXTENSION):
+            schemas = ram_snapshot.load(repr_file)
+        else:
+            raise UnsupportedFileException()
+
+        if schemas is None or len(schemas) == 0:
+            raise UnsuccessfulTryException()
+        return schemas
+
 
 class UnsupportedFileException(Exception):
     """ Подкласс исключений, порождаемых в следствие невозможности открытия файла
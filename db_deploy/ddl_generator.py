@@ -1,9 +1,16 @@
 """ Модуль, содержащий методы генерации DDL-инструкций для PostgreSQL
 из RAM-представления схемы БД, основываясь на шаблонах из файла.
+
+Помимо инструкций создания элементов формируются инструкции их изменения и удаления,
+из которых составляется сценарий миграции базы от одной версии схемы к другой.
+Ограничения и индексы создаются с явными именами (по умолчанию - такими же, какие
+назначил бы PostgreSQL), поэтому сценарий миграции может на них ссылаться.
 """
 import configparser
 import string
 
+from ram_repr.ram_diff import SchemaDiff
+from ram_repr.ram_diff import diff
 from ram_repr.ram_structure import Constraint
 from ram_repr.ram_structure import Domain
 from ram_repr.ram_structure import Field
@@ -21,6 +28,8 @@ class DdlGenerator:
         self.config_file = open('../ddl_templates.cfg', encoding='utf-8')
         self.config.read_file(self.config_file)
         self.templates = self.config['TEMPLATES']
+        # Имена элементов, существующих в базе, на время создания сценария миграции.
+        self._database_names = None
 
     def __exit__(self):
         self.config_file.close()
@@ -119,6 +128,7 @@ class DdlGenerator:
             .substitute(
                 schema_name=schema.name,
                 table_name=table.name,
+                constraint_name=self._get_constraint_name(constraint, table, schema),
                 constraint_definition=definition
                 )
 
@@ -146,12 +156,434 @@ class DdlGenerator:
 
         return string.Template(self.templates.get('index'))\
             .substitute(
-                        index_name='"' + index.name + table.name + '"' if index.name else '',
+                        index_name='"' + self._get_index_name(index, table, schema) + '"',
                         table_name=table.name,
                         schema_name=schema.name,
                         fields=', '.join(details)
                         )
 
+    def create_schema_scripts(self, schema: Schema):
+        """ Создать DDL-инструкции создания схемы со всеми ее элементами.
+
+        Таблицы создаются в топологическом порядке графа внешних ключей (Schema.graph),
+        поэтому внешний ключ создается сразу после таблицы, если таблица, на которую он
+        ссылается, уже создана. Отдельно возвращаются только инструкции создания внешних
+        ключей, замыкающих циклы ссылок, и ключей, ссылающихся на таблицы вне схемы: они
+        должны выполняться после создания всех таблиц.
+
+        :param schema: объект схемы.
+        :return: кортеж (список инструкций, список инструкций создания внешних ключей).
+        """
+        scripts = [self.create_schema_dll(schema)]
+        scripts_foreign = []
+        for domain in schema.domains.values():
+            scripts.append(self.create_domain_dll(domain, schema))
+        created = set()
+        for name in schema.graph.order():
+            self._create_table_scripts(schema.tables[name], schema, scripts, scripts_foreign, created)
+            created.add(name)
+        return scripts, scripts_foreign
+
+    def create_migration_ddl(self, old_schemas: list, new_schemas: list, database_names: dict=None):
+        """ Создать сценарий миграции базы, развернутой из одних схем, к другим схемам.
+
+        Схемы сопоставляются по именам. Сценарий содержит только инструкции, необходимые
+        для изменившихся элементов, и упорядочен так, чтобы его можно было выполнить
+        в одной транзакции: сначала удаляются внешние ключи, ограничения, индексы, поля
+        и таблицы, затем создаются и изменяются домены, таблицы и поля, затем создаются
+        ограничения и индексы, последними - внешние ключи; удаленные домены удаляются
+        в конце сценария.
+
+        Имена ограничений и индексов без явного имени зависят от порядка элементов таблицы,
+        а базы, развернутые прежними версиями, не содержат явных имен. Поэтому для
+        удаления элементов следует передать имена элементов, существующих в базе
+        (database_names): элементы сопоставляются с ними по содержимому. Без них сценарий
+        корректен только для базы, развернутой этой версией из old_schemas.
+
+        :param old_schemas: схемы, из которых развернута база.
+        :param new_schemas: новые схемы.
+        :param database_names: имена элементов, существующих в базе (см. database_names).
+        :return: список DDL-инструкций.
+        """
+        self._database_names = database_names
+        try:
+            return self._migration_ddl(old_schemas, new_schemas)
+        finally:
+            self._database_names = None
+
+    @staticmethod
+    def database_names(constraints, indexes):
+        """ Получить имена элементов, существующих в базе, по результатам запросов
+        existing_constraints и existing_indexes файла шаблонов.
+
+        :param constraints: строки (схема, таблица, имя, вид - 'p' или 'f', список полей,
+                            таблица ссылки) первичных и внешних ключей.
+        :param indexes: строки (схема, таблица, имя, список полей) индексов, не созданных
+                        ограничениями.
+        :return: dict {(схема, таблица): список пар (содержимое элемента, имя)}.
+        """
+        names = {}
+        for schema_name, table_name, name, kind, columns, reference in constraints:
+            signature = ('PRIMARY', tuple(columns or ()), None) if kind == 'p' \
+                else ('FOREIGN', tuple(columns or ()), reference)
+            names.setdefault((schema_name, table_name), []).append((signature, name))
+        for schema_name, table_name, name, columns in indexes:
+            names.setdefault((schema_name, table_name), []).append((('INDEX', tuple(columns or ()), None), name))
+        return names
+
+    def _migration_ddl(self, old_schemas: list, new_schemas: list):
+        """ Создать сценарий миграции базы (см. create_migration_ddl).
+
+        :param old_schemas: схемы, из которых развернута база.
+        :param new_schemas: новые схемы.
+        :return: список DDL-инструкций.
+        """
+        old_by_name = {schema.name: schema for schema in old_schemas}
+        new_names = set(schema.name for schema in new_schemas)
+        scripts = [self.drop_schema_ddl(schema) for schema in old_schemas if schema.name not in new_names]
+        scripts_foreign = []
+        scripts_final = []
+        for schema in new_schemas:
+            old = old_by_name.get(schema.name)
+            if old is None:
+                if len(schema.tables) == 0:
+                    continue
+                created, created_foreign = self.create_schema_scripts(schema)
+                scripts.extend(created)
+                scripts_foreign.extend(created_foreign)
+            else:
+                self._migration_scripts(diff(old, schema, ordered=False), scripts, scripts_foreign, scripts_final)
+        # Инструкции пропущенных элементов (например, ограничений неподдерживаемых видов) пусты.
+        return [script for script in scripts + scripts_foreign + scripts_final if script]
+
+    def drop_schema_ddl(self, schema: Schema):
+        """ Создать DDL-инструкцию удаления схемы вместе со всеми ее элементами.
+
+        :param schema: объект схемы.
+        :return: str
+        """
+        return string.Template(self.templates.get('drop_schema'))\
+            .substitute(
+                        schema_name=schema.name
+                        )
+
+    def drop_domain_ddl(self, domain: Domain, schema: Schema):
+        """ Создать DDL-инструкцию удаления домена.
+
+        :param domain: объект домена.
+        :param schema: объект схемы.
+        :return: str
+        """
+        return string.Template(self.templates.get('drop_domain'))\
+            .substitute(
+                        schema_name=schema.name,
+                        domain_name=domain.name
+                        )
+
+    def comment_domain_ddl(self, domain: Domain, schema: Schema):
+        """ Создать DDL-инструкцию изменения описания домена.
+
+        :param domain: объект домена.
+        :param schema: объект схемы.
+        :return: str
+        """
+        return string.Template(self.templates.get('domain_comment'))\
+            .substitute(
+                        schema_name=schema.name,
+                        domain_name=domain.name,
+                        description=domain.description
+                        )
+
+    def drop_table_ddl(self, table: Table, schema: Schema):
+        """ Создать DDL-инструкцию удаления таблицы.
+
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :return: str
+        """
+        return string.Template(self.templates.get('drop_table'))\
+            .substitute(
+                        schema_name=schema.name,
+                        table_name=table.name
+                        )
+
+    def add_field_ddl(self, field: Field, table: Table, schema: Schema):
+        """ Создать DDL-инструкцию добавления поля в существующую таблицу.
+
+        :param field: объект поля.
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :return: str
+        """
+        return string.Template(self.templates.get('add_field'))\
+            .substitute(
+                        schema_name=schema.name,
+                        table_name=table.name,
+                        field=self.create_field_ddl(field, schema)
+                        )
+
+    def drop_field_ddl(self, field: Field, table: Table, schema: Schema):
+        """ Создать DDL-инструкцию удаления поля из таблицы.
+
+        :param field: объект поля.
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :return: str
+        """
+        return string.Template(self.templates.get('drop_field'))\
+            .substitute(
+                        schema_name=schema.name,
+                        table_name=table.name,
+                        field_name=field.name
+                        )
+
+    def alter_field_type_ddl(self, field: Field, table: Table, schema: Schema, data_type: str=None):
+        """ Создать DDL-инструкцию изменения типа поля.
+
+        :param field: объект поля.
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :param data_type: тип PostgreSQL (по умолчанию - домен поля).
+        :return: str
+        """
+        return string.Template(self.templates.get('alter_field_type'))\
+            .substitute(
+                        schema_name=schema.name,
+                        table_name=table.name,
+                        field_name=field.name,
+                        field_type=data_type if data_type else schema.name + '."' + str(field.domain) + '"'
+                        )
+
+    def drop_constraint_ddl(self, constraint: Constraint, table: Table, schema: Schema):
+        """ Создать DDL-инструкцию удаления ограничения.
+
+        :param constraint: объект ограничения.
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :return: str
+        """
+        if constraint.kind.upper() not in ('PRIMARY', 'FOREIGN'):
+            return ''
+        return string.Template(self.templates.get('drop_constraint'))\
+            .substitute(
+                        schema_name=schema.name,
+                        table_name=table.name,
+                        constraint_name=self._get_constraint_name(constraint, table, schema)
+                        )
+
+    def drop_index_ddl(self, index: Index, table: Table, schema: Schema):
+        """ Создать DDL-инструкцию удаления индекса.
+
+        :param index: объект индекса.
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :return: str
+        """
+        if len(index.details) == 0:
+            return ''
+        return string.Template(self.templates.get('drop_index'))\
+            .substitute(
+                        schema_name=schema.name,
+                        index_name=self._get_index_name(index, table, schema)
+                        )
+
+    def _create_table_scripts(self, table: Table, schema: Schema, scripts: list, scripts_foreign: list,
+                              created: set=frozenset()):
+        """ Добавить в сценарий DDL-инструкции создания таблицы с ее индексами и ограничениями.
+
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :param scripts: список инструкций.
+        :param scripts_foreign: список инструкций создания внешних ключей.
+        :param created: имена таблиц, созданных ранее в сценарии; внешние ключи, ссылающиеся
+                        на них, создаются вместе с таблицей.
+        :return: None
+        """
+        scripts.append(self.create_table_ddl(table, schema))
+        for index in table.indexes:
+            scripts.append(self.create_index_ddl(index, table, schema))
+        for constraint in table.constraints:
+            if constraint.kind.upper() == 'FOREIGN' and constraint.reference not in created:
+                scripts_foreign.append(self.create_constraint_ddl(constraint, table, schema))
+            else:
+                scripts.append(self.create_constraint_ddl(constraint, table, schema))
+
+    def _migration_scripts(self, schema_diff: SchemaDiff, scripts: list, scripts_foreign: list,
+                           scripts_final: list):
+        """ Добавить в сценарий DDL-инструкции миграции схемы по различиям ее версий.
+
+        :param schema_diff: различия исходной и новой версий схемы.
+        :param scripts: список инструкций.
+        :param scripts_foreign: список инструкций создания внешних ключей.
+        :param scripts_final: список инструкций, выполняемых в конце сценария.
+        :return: None
+        """
+        old, new = schema_diff.old, schema_diff.new
+        removed_tables = set(table.name for table in schema_diff.removed_tables)
+        removed = set()
+        added = set()
+        for table_diff in schema_diff.changed_tables:
+            for element in table_diff.removed_fields + table_diff.removed_constraints + table_diff.removed_indexes:
+                removed.add(id(element))
+            for element in table_diff.added_constraints:
+                added.add(id(element))
+        for table in schema_diff.added_tables:
+            for element in table.constraints:
+                added.add(id(element))
+
+        # Удаляются внешние ключи удаляемых таблиц, удаленные внешние ключи, а также внешние
+        # ключи, ссылающиеся на таблицы, первичный ключ которых пересоздается: они зависят
+        # от индекса первичного ключа и создаются заново в конце сценария.
+        for table in schema_diff.removed_tables:
+            for constraint in table.constraints:
+                if constraint.kind.upper() == 'FOREIGN':
+                    scripts.append(self.drop_constraint_ddl(constraint, table, old))
+        for table_diff in schema_diff.changed_tables:
+            for constraint in table_diff.removed_constraints:
+                if constraint.kind.upper() == 'FOREIGN':
+                    scripts.append(self.drop_constraint_ddl(constraint, table_diff.old, old))
+            if not any(constraint.kind.upper() == 'PRIMARY' for constraint in table_diff.removed_constraints):
+                continue
+            for table, constraint in old.references.referencing(table_diff.old.name):
+                if id(constraint) not in removed and table.name not in removed_tables:
+                    scripts.append(self.drop_constraint_ddl(constraint, table, old))
+            for table, constraint in new.references.referencing(table_diff.new.name):
+                if id(constraint) not in added:
+                    scripts_foreign.append(self.create_constraint_ddl(constraint, table, new))
+
+        # Удаляются прочие ограничения, индексы, поля и таблицы.
+        for table_diff in schema_diff.changed_tables:
+            for constraint in table_diff.removed_constraints:
+                if constraint.kind.upper() != 'FOREIGN':
+                    scripts.append(self.drop_constraint_ddl(constraint, table_diff.old, old))
+            for index in table_diff.removed_indexes:
+                scripts.append(self.drop_index_ddl(index, table_diff.old, old))
+            for field in table_diff.removed_fields:
+                scripts.append(self.drop_field_ddl(field, table_diff.old, old))
+        for table in schema_diff.removed_tables:
+            scripts.append(self.drop_table_ddl(table, old))
+
+        # Создаются и изменяются домены. Тип домена в PostgreSQL изменить нельзя, поэтому
+        # поля домена на время его пересоздания переводятся на базовый тип.
+        for domain in schema_diff.added_domains:
+            scripts.append(self.create_domain_dll(domain, new))
+        for old_domain, domain in schema_diff.changed_domains:
+            data_type = self._get_postgres_type(domain)
+            if data_type == self._get_postgres_type(old_domain):
+                if old_domain.description != domain.description:
+                    scripts.append(self.comment_domain_ddl(domain, new))
+                continue
+            fields = [(table, field) for table, field in old.references.fields_of_domain(domain.name)
+                      if table.name not in removed_tables and id(field) not in removed]
+            for table, field in fields:
+                scripts.append(self.alter_field_type_ddl(field, table, new, data_type))
+            scripts.append(self.drop_domain_ddl(old_domain, old))
+            scripts.append(self.create_domain_dll(domain, new))
+            for table, field in fields:
+                new_field = new.tables[table.name].fields.get(field.name)
+                if new_field is not None and new_field.domain == domain.name:
+                    scripts.append(self.alter_field_type_ddl(new_field, table, new))
+
+        # Создаются таблицы, поля, ограничения и индексы.
+        for table in schema_diff.added_tables:
+            self._create_table_scripts(table, new, scripts, scripts_foreign)
+        for table_diff in schema_diff.changed_tables:
+            table = table_diff.new
+            for field in table_diff.added_fields:
+                scripts.append(self.add_field_ddl(field, table, new))
+            for old_field, field in table_diff.changed_fields:
+                if (old_field.domain, old_field.type) != (field.domain, field.type):
+                    scripts.append(self.alter_field_type_ddl(field, table, new))
+            for constraint in table_diff.added_constraints:
+                if constraint.kind.upper() == 'FOREIGN':
+                    scripts_foreign.append(self.create_constraint_ddl(constraint, table, new))
+                else:
+                    scripts.append(self.create_constraint_ddl(constraint, table, new))
+            for index in table_diff.added_indexes:
+                scripts.append(self.create_index_ddl(index, table, new))
+
+        for domain in schema_diff.removed_domains:
+            scripts_final.append(self.drop_domain_ddl(domain, old))
+
+    def _get_constraint_name(self, constraint: Constraint, table: Table, schema: Schema):
+        """ Получить имя ограничения в БД.
+
+        :param constraint: объект ограничения.
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :return: str
+        """
+        return self._get_object_names(table, schema)[id(constraint)]
+
+    def _get_index_name(self, index: Index, table: Table, schema: Schema):
+        """ Получить имя индекса в БД.
+
+        :param index: объект индекса.
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :return: str
+        """
+        return self._get_object_names(table, schema)[id(index)]
+
+    def _get_object_names(self, table: Table, schema: Schema):
+        """ Получить имена первичных и внешних ключей и индексов таблицы в БД.
+
+        Если известны имена элементов, существующих в базе (см. create_migration_ddl),
+        элементу назначается имя существующего элемента с тем же содержимым: базы могли
+        быть развернуты с другими правилами именования. Иначе сохраняется явное имя
+        элемента, а элементам без имени назначаются имена по правилам PostgreSQL:
+        <таблица>_pkey, <таблица>_<поля>_fkey, <таблица>_<поля>_idx. Имена, совпадающие
+        с уже назначенными в таблице или существующими в базе, дополняются номером
+        (…_fkey1, …_fkey2), как это делает PostgreSQL. Все имена ограничены длиной
+        идентификатора PostgreSQL.
+
+        :param table: объект таблицы.
+        :param schema: объект схемы.
+        :return: dict {id(элемент): имя}.
+        """
+        existing = []
+        if self._database_names is not None:
+            existing = list(self._database_names.get((schema.name.lower(), table.name), ()))
+        used = set(name for _, name in existing)
+        names = {}
+        unnamed = []
+        for constraint in table.constraints:
+            kind = constraint.kind.upper()
+            if kind not in ('PRIMARY', 'FOREIGN'):
+                continue
+            columns = [detail.value for detail in constraint.details]
+            reference = constraint.reference if kind == 'FOREIGN' else None
+            name = _take_name(existing, (kind, tuple(columns), reference))
+            if name is None and constraint.name:
+                name = _clip_name(constraint.name)
+            if name is not None:
+                names[id(constraint)] = name
+            elif kind == 'PRIMARY':
+                unnamed.append((constraint, None, 'pkey'))
+            else:
+                unnamed.append((constraint, '_'.join(columns), 'fkey'))
+        for index in table.indexes:
+            if not index.details:
+                continue
+            columns = [detail.value for detail in index.details]
+            name = _take_name(existing, ('INDEX', tuple(columns), None))
+            if name is None and index.name:
+                name = _clip_name(index.name + table.name)
+            if name is not None:
+                names[id(index)] = name
+            else:
+                unnamed.append((index, '_'.join(columns), 'idx'))
+        used.update(names.values())
+        for element, columns, label in unnamed:
+            name = _object_name(table.name, columns, label)
+            number = 0
+            while name in used:
+                number += 1
+                name = _object_name(table.name, columns, label + str(number))
+            used.add(name)
+            names[id(element)] = name
+        return names
+
     def _get_postgres_type(self, domain):
         """ Получить строку, представляющую тип домена представления метаданны в ОП.
 
@@ -187,3 +619,59 @@ class DdlGenerator:
             return 'timestamp'
         print(domain.type.upper())
         return ''
+
+
+def _take_name(existing: list, signature: tuple):
+    """ Извлечь из списка существующих элементов имя первого элемента с заданным содержимым.
+
+    :param existing: список пар (содержимое элемента, имя); найденная пара удаляется.
+    :param signature: содержимое элемента (вид, поля, таблица ссылки).
+    :return: имя или None.
+    """
+    for position, (other, name) in enumerate(existing):
+        if other == signature:
+            del existing[position]
+            return name
+    return None
+
+
+# Наибольшая длина идентификатора PostgreSQL в байтах (NAMEDATALEN - 1).
+_NAME_LENGTH = 63
+
+
+def _clip_name(name: str, length: int=_NAME_LENGTH):
+    """ Сократить имя до заданной длины в байтах UTF-8, не разрывая символов, как это
+    делает PostgreSQL с длинными идентификаторами.
+
+    :param name: имя.
+    :param length: наибольшая длина в байтах.
+    :return: str
+    """
+    data = name.encode('utf-8')
+    if len(data) <= length:
+        return name
+    return data[:length].decode('utf-8', 'ignore')
+
+
+def _object_name(table_name: str, columns: str, label: str):
+    """ Сформировать имя элемента таблицы по правилам PostgreSQL (makeObjectName): если имя
+    длиннее допустимого, сокращается более длинная из частей - имя таблицы или имена полей.
+
+    :param table_name: имя таблицы.
+    :param columns: имена полей через '_' или None.
+    :param label: окончание имени (pkey, fkey, idx, возможно с номером).
+    :return: str
+    """
+    available = _NAME_LENGTH - len(label) - 1 - (1 if columns else 0)
+    table_length = len(table_name.encode('utf-8'))
+    columns_length = len(columns.encode('utf-8')) if columns else 0
+    while table_length + columns_length > available:
+        if table_length > columns_length:
+            table_length -= 1
+        else:
+            columns_length -= 1
+    parts = [_clip_name(table_name, table_length)]
+    if columns:
+        parts.append(_clip_name(columns, columns_length))
+    parts.append(label)
+    return '_'.join(parts)
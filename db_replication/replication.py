@@ -33,9 +33,12 @@ class Replicator:
 
     def transfer_data(self):
         self.out_conn.execute('BEGIN TRANSACTION;')
+        # Таблицы заполняются после таблиц, на которые они ссылаются; отложенная проверка
+        # ограничений нужна только для циклов ссылок.
         self.out_conn.execute('SET CONSTRAINTS ALL DEFERRED;')
         for schema in self.schemas:
-            for table in schema.tables.values():
+            for name in schema.graph.order():
+                table = schema.tables[name]
                 self.cursor.execute(self.create_select_query(schema, table))
                 batch = self.cursor.fetchmany(500)
                 while len(batch) > 0:
@@ -2,6 +2,15 @@ import configparser
 import pyodbc
 import sqlite3
 
+from ram_repr.ram_attributes import CONSTRAINT
+from ram_repr.ram_attributes import CONSTRAINT_DETAIL
+from ram_repr.ram_attributes import DOMAIN
+from ram_repr.ram_attributes import FIELD
+from ram_repr.ram_attributes import INDEX
+from ram_repr.ram_attributes import INDEX_DETAIL
+from ram_repr.ram_attributes import SCHEMA
+from ram_repr.ram_attributes import TABLE
+from ram_repr.ram_attributes import compile_dbd_reader
 from ram_repr.ram_structure import Constraint
 from ram_repr.ram_structure import ConstraintDetail
 from ram_repr.ram_structure import Domain
@@ -190,21 +199,8 @@ def _create_schema(attr_dict):
     """
     schema = Schema()
 
-    schema_id = None
-
-    for attr in attr_dict:
-        if attr == 'name':
-            schema.name = attr_dict[attr]
-        elif attr == 'fulltext_engine':
-            schema.fulltext_engine = attr_dict[attr]
-        elif attr == 'version':
-            schema.version = attr_dict[attr]
-        elif attr == 'description':
-            schema.description = attr_dict[attr]
-        elif attr == 'id':
-            schema_id = attr_dict[attr]
-        else:
-            raise UnsupportedAttributeError(attr)
+    _SCHEMA_READER.read(schema, attr_dict, UnsupportedAttributeError)
+    schema_id = attr_dict.get('id')
     return schema, schema_id
 
 
@@ -216,41 +212,8 @@ def _create_domain(attr_dict):
     """
     domain = Domain()
 
-    domain_id = None
-
-    for attr in attr_dict:
-        if attr == 'name':
-            domain.name = attr_dict[attr]
-        elif attr == 'data_type_name':
-            domain.type = attr_dict[attr]
-        elif attr == 'align':
-            domain.align = attr_dict[attr]
-        elif attr == 'width':
-            domain.width = attr_dict[attr]
-        elif attr == 'char_length':
-            domain.char_length = attr_dict[attr]
-        elif attr == 'description':
-            domain.description = attr_dict[attr]
-        elif attr == 'length':
-            domain.length = attr_dict[attr]
-        elif attr == 'scale':
-            domain.scale = attr_dict[attr]
-        elif attr == 'precision':
-            domain.precision = attr_dict[attr]
-        elif attr == 'case_sensitive':
-            domain.case_sensitive = attr_dict[attr]
-        elif attr == 'show_null':
-            domain.show_null = attr_dict[attr]
-        elif attr == 'show_lead_nulls':
-            domain.show_lead_nulls = attr_dict[attr]
-        elif attr == 'thousands_separator':
-            domain.thousands_separator = attr_dict[attr]
-        elif attr == 'summable':
-            domain.summable = attr_dict[attr]
-        elif attr == 'id':
-            domain_id = attr_dict[attr]
-        else:
-            raise UnsupportedAttributeError(attr)
+    _DOMAIN_READER.read(domain, attr_dict, UnsupportedAttributeError)
+    domain_id = attr_dict.get('id')
     return domain, domain_id
 
 
@@ -262,32 +225,9 @@ def _create_table(attr_dict):
     """
     table = Table()
 
-    table_id = None
-    schema_id = None
-
-    for attr in attr_dict:
-        if attr == 'name':
-            table.name = attr_dict[attr]
-        elif attr == 'description':
-            table.description = attr_dict[attr]
-        elif attr == 'temporal_mode':
-            table.ht_table_flags = attr_dict[attr]
-        elif attr == 'access_level':
-            table.access_level = attr_dict[attr]
-        elif attr == 'can_add':
-            table.add = attr_dict[attr]
-        elif attr == 'can_edit':
-            table.edit = attr_dict[attr]
-        elif attr == 'can_delete':
-            table.delete = attr_dict[attr]
-        elif attr == 'means':
-            table.means = attr_dict[attr]
-        elif attr == 'schema_id':
-            schema_id = attr_dict[attr]
-        elif attr == 'id':
-            table_id = attr_dict[attr]
-        else:
-            raise UnsupportedAttributeError(attr)
+    _TABLE_READER.read(table, attr_dict, UnsupportedAttributeError)
+    table_id = attr_dict.get('id')
+    schema_id = attr_dict.get('schema_id')
     return table, table_id, schema_id
 
 
@@ -299,40 +239,9 @@ def _create_field(attr_dict):
     """
     field = Field()
 
-    field_id = None
-    table_id = None
-
-    for attr in attr_dict:
-        if attr == 'name':
-            field.name = attr_dict[attr]
-        elif attr == 'russian_short_name':
-            field.rname = attr_dict[attr]
-        elif attr == 'domain_name':
-            field.domain = attr_dict[attr]
-        elif attr == 'type':
-            field.type = attr_dict[attr]
-        elif attr == 'description':
-            field.description = attr_dict[attr]
-        elif attr == 'can_input':
-            field.input = attr_dict[attr]
-        elif attr == 'can_edit':
-            field.edit = attr_dict[attr]
-        elif attr == 'show_in_grid':
-            field.show_in_grid = attr_dict[attr]
-        elif attr == 'show_in_details':
-            field.show_in_details = attr_dict[attr]
-        elif attr == 'is_mean':
-            field.is_mean = attr_dict[attr]
-        elif attr == 'autocalculated':
-            field.autocalculated = attr_dict[attr]
-        elif attr == 'required':
-            field.required = attr_dict[attr]
-        elif attr == 'id':
-            field_id = attr_dict[attr]
-        elif attr == 'table_id':
-            table_id = attr_dict[attr]
-        else:
-            raise UnsupportedAttributeError(attr)
+    _FIELD_READER.read(field, attr_dict, UnsupportedAttributeError)
+    field_id = attr_dict.get('id')
+    table_id = attr_dict.get('table_id')
     return field, field_id, table_id
 
 
@@ -347,34 +256,9 @@ def _create_constraint(attr_dict):
     if attr_dict is None:
         return constraint
 
-    constraint_id = None
-    table_id = None
-
-    for attr in attr_dict:
-        if attr == 'name':
-            constraint.name = attr_dict[attr]
-        elif attr == 'constraint_type':
-            constraint.kind = attr_dict[attr]
-        elif attr == 'items':
-            detail = ConstraintDetail()
-            detail.value = attr_dict[attr]
-            constraint.details.append(detail)
-        elif attr == 'reference':
-            constraint.reference = attr_dict[attr]
-        elif attr == 'unique_key_id':
-            constraint.constraint = attr_dict[attr]
-        elif attr == 'expression':
-            constraint.expression = attr_dict[attr]
-        elif attr == 'has_value_edit':
-            constraint.has_value_edit = attr_dict[attr]
-        elif attr == 'cascading_delete':
-            constraint.cascading_delete = attr_dict[attr]
-        elif attr == 'id':
-            constraint_id = attr_dict[attr]
-        elif attr == 'table_id':
-            table_id = attr_dict[attr]
-        else:
-            raise UnsupportedAttributeError(attr)
+    _CONSTRAINT_READER.read(constraint, attr_dict, UnsupportedAttributeError)
+    constraint_id = attr_dict.get('id')
+    table_id = attr_dict.get('table_id')
     return constraint, constraint_id, table_id
 
 
@@ -389,30 +273,9 @@ def _create_index(attr_dict):
     if attr_dict is None:
         return index
 
-    index_id = None
-    table_id = None
-
-    for attr in attr_dict:
-        if attr == 'name':
-            index.name = attr_dict[attr]
-        elif attr == 'field':
-            detail = IndexDetail()
-            detail.value = attr_dict[attr]
-            index.details.append(detail)
-        elif attr == 'kind':
-            index.kind = attr_dict[attr]
-        elif attr == 'local':
-            index.local = attr_dict[attr]
-        elif attr == 'uniqueness':
-            index.uniqueness = attr_dict[attr]
-        elif attr == 'fulltext':
-            index.fulltext = attr_dict[attr]
-        elif attr == 'id':
-            index_id = attr_dict[attr]
-        elif attr == 'table_id':
-            table_id = attr_dict[attr]
-        else:
-            raise UnsupportedAttributeError(attr)
+    _INDEX_READER.read(index, attr_dict, UnsupportedAttributeError)
+    index_id = attr_dict.get('id')
+    table_id = attr_dict.get('table_id')
     return index, index_id, table_id
 
 
@@ -424,18 +287,9 @@ def _create_constraint_detail(attr_dict):
     """
     detail = ConstraintDetail()
 
-    detail_id = None
-    constraint_id = None
-
-    for attr in attr_dict:
-        if attr == 'field_name':
-            detail.value = attr_dict[attr]
-        elif attr == 'id':
-            detail_id = attr_dict[attr]
-        elif attr == 'constraint_id':
-            constraint_id = attr_dict[attr]
-        else:
-            raise UnsupportedAttributeError(attr)
+    _CONSTRAINT_DETAIL_READER.read(detail, attr_dict, UnsupportedAttributeError)
+    detail_id = attr_dict.get('id')
+    constraint_id = attr_dict.get('constraint_id')
     return detail, detail_id, constraint_id
 
 
@@ -447,22 +301,9 @@ def _create_index_detail(attr_dict):
     """
     detail = IndexDetail()
 
-    detail_id = None
-    index_id = None
-
-    for attr in attr_dict:
-        if attr == 'field_name':
-            detail.value = attr_dict[attr]
-        elif attr == 'expression':
-            detail.expression = attr_dict[attr]
-        elif attr == 'descend':
-            detail.descend = attr_dict[attr]
-        elif attr == 'id':
-            detail_id = attr_dict[attr]
-        elif attr == 'index_id':
-            index_id = attr_dict[attr]
-        else:
-            raise UnsupportedAttributeError(attr)
+    _INDEX_DETAIL_READER.read(detail, attr_dict, UnsupportedAttributeError)
+    detail_id = attr_dict.get('id')
+    index_id = attr_dict.get('index_id')
     return detail, detail_id, index_id
 
 
@@ -482,3 +323,14 @@ class UnsupportedAttributeError(ParseError):
 
     def __str__(self):
         return 'Неподдерживаемый атрибут \"' + self.attribute + '\"'
+
+
+# Обработчики столбцов, скомпилированные из описаний сущностей.
+_SCHEMA_READER = compile_dbd_reader(SCHEMA, ('id',))
+_DOMAIN_READER = compile_dbd_reader(DOMAIN, ('id',))
+_TABLE_READER = compile_dbd_reader(TABLE, ('id', 'schema_id'))
+_FIELD_READER = compile_dbd_reader(FIELD, ('id', 'table_id'))
+_CONSTRAINT_READER = compile_dbd_reader(CONSTRAINT, ('id', 'table_id'))
+_INDEX_READER = compile_dbd_reader(INDEX, ('id', 'table_id'))
+_CONSTRAINT_DETAIL_READER = compile_dbd_reader(CONSTRAINT_DETAIL, ('id', 'constraint_id'))
+_INDEX_DETAIL_READER = compile_dbd_reader(INDEX_DETAIL, ('id', 'index_id'))
@@ -0,0 +1,473 @@
+""" Модуль, содержащий декларативное описание атрибутов элементов RAM-представления базы
+и их соответствия атрибутам XML-представления и столбцам DBD-представления.
+
+Описания компилируются в словари обработчиков, поэтому чтение и запись атрибута
+выполняются поиском по словарю, а добавление нового атрибута сводится к одной строке
+в описании сущности.
+"""
+
+from operator import attrgetter
+from sys import intern
+
+from ram_repr.ram_structure import Constraint
+from ram_repr.ram_structure import ConstraintDetail
+from ram_repr.ram_structure import Domain
+from ram_repr.ram_structure import Field
+from ram_repr.ram_structure import IndexDetail
+from ram_repr.ram_structure import Table
+
+
+def interned(value):
+    """ Получить единственный экземпляр строкового значения.
+
+    Имена доменов, типов, таблиц и полей многократно повторяются в ссылках между элементами;
+    интернирование заменяет каждую новую строку, созданную при разборе, общим экземпляром.
+
+    :param value: значение атрибута.
+    :return: интернированная строка, либо исходное значение, если оно не является строкой.
+    """
+    return intern(value) if type(value) is str else value
+
+
+# Признак атрибута props, перечисляющего свойства элемента через запятую.
+PROPS = object()
+# Признак атрибута, задающего единственную деталь элемента (items, field).
+DETAIL = object()
+
+
+class Attribute:
+    """ Описание атрибута элемента.
+    """
+    def __init__(self, xml, ram, dbd=None, convert=None):
+        # Имя атрибута в XML-представлении (None - атрибут отсутствует в XML).
+        self.xml = xml
+        # Имя поля объекта RAM-представления, либо PROPS, либо DETAIL.
+        self.ram = ram
+        # Имя столбца DBD-представления (None - столбец отсутствует в DBD).
+        self.dbd = dbd
+        # Функция преобразования считанного значения.
+        self.convert = convert
+
+
+class Property:
+    """ Описание свойства элемента, перечисляемого в атрибуте props.
+    """
+    def __init__(self, name, ram, dbd=None, value=True, mask=None):
+        # Имя свойства в атрибуте props (None - свойство отсутствует в XML).
+        self.name = name
+        # Имя поля объекта RAM-представления.
+        self.ram = ram
+        # Имя столбца DBD-представления (None - столбец отсутствует в DBD).
+        self.dbd = dbd
+        # Значение поля, которое означает наличие свойства.
+        self.value = value
+        # Битовая маска свойства в поле flags (None - свойство хранится отдельным полем).
+        self.mask = mask
+
+
+class Entity:
+    """ Описание сущности RAM-представления: атрибуты в порядке их записи в XML и свойства
+    в порядке их перечисления в props.
+    """
+    def __init__(self, attributes, properties=(), detail=None):
+        self.attributes = attributes
+        self.properties = properties
+        self.detail = detail
+
+
+SCHEMA = Entity(
+    attributes=(
+        Attribute('fulltext_engine', 'fulltext_engine', 'fulltext_engine'),
+        Attribute('version', 'version', 'version'),
+        Attribute('name', 'name', 'name'),
+        Attribute('description', 'description', 'description'),
+    )
+)
+
+DOMAIN = Entity(
+    attributes=(
+        Attribute('name', 'name', 'name', convert=interned),
+        Attribute('description', 'description', 'description'),
+        Attribute('type', 'type', 'data_type_name', convert=interned),
+        Attribute('align', 'align', 'align', convert=interned),
+        Attribute('width', 'width', 'width', convert=interned),
+        Attribute('length', 'length', 'length', convert=interned),
+        Attribute('precision', 'precision', 'precision', convert=interned),
+        Attribute('props', PROPS),
+        Attribute('scale', 'scale', 'scale', convert=interned),
+        Attribute('char_length', 'char_length', 'char_length', convert=interned),
+    ),
+    properties=(
+        Property('case_sensitive', 'case_sensitive', 'case_sensitive', mask=Domain.CASE_SENSITIVE),
+        Property('show_null', 'show_null', 'show_null', mask=Domain.SHOW_NULL),
+        Property('show_lead_nulls', 'show_lead_nulls', 'show_lead_nulls', mask=Domain.SHOW_LEAD_NULLS),
+        Property('thousands_separator', 'thousands_separator', 'thousands_separator',
+                 mask=Domain.THOUSANDS_SEPARATOR),
+        Property('summable', 'summable', 'summable', mask=Domain.SUMMABLE),
+    )
+)
+
+TABLE = Entity(
+    attributes=(
+        Attribute('name', 'name', 'name', convert=interned),
+        Attribute('description', 'description', 'description'),
+        Attribute('props', PROPS),
+        Attribute(None, 'ht_table_flags', 'temporal_mode'),
+        Attribute(None, 'access_level', 'access_level'),
+        Attribute(None, 'means', 'means'),
+    ),
+    properties=(
+        Property('add', 'add', 'can_add', mask=Table.ADD),
+        Property('edit', 'edit', 'can_edit', mask=Table.EDIT),
+        Property('delete', 'delete', 'can_delete', mask=Table.DELETE),
+    )
+)
+
+FIELD = Entity(
+    attributes=(
+        Attribute('name', 'name', 'name', convert=interned),
+        Attribute('rname', 'rname', 'russian_short_name'),
+        Attribute('domain', 'domain', 'domain_name', convert=interned),
+        Attribute('type', 'type', 'type', convert=interned),
+        Attribute('description', 'description', 'description'),
+        Attribute('props', PROPS),
+    ),
+    properties=(
+        Property('input', 'input', 'can_input', mask=Field.INPUT),
+        Property('edit', 'edit', 'can_edit', mask=Field.EDIT),
+        Property('show_in_grid', 'show_in_grid', 'show_in_grid', mask=Field.SHOW_IN_GRID),
+        Property('show_in_details', 'show_in_details', 'show_in_details', mask=Field.SHOW_IN_DETAILS),
+        Property('is_mean', 'is_mean', 'is_mean', mask=Field.IS_MEAN),
+        Property('autocalculated', 'autocalculated', 'autocalculated', mask=Field.AUTOCALCULATED),
+        Property('required', 'required', 'required', mask=Field.REQUIRED),
+    )
+)
+
+CONSTRAINT = Entity(
+    attributes=(
+        Attribute('name', 'name', 'name'),
+        Attribute('kind', 'kind', 'constraint_type', convert=interned),
+        Attribute('items', DETAIL, 'items', convert=interned),
+        Attribute('reference', 'reference', 'reference', convert=interned),
+        Attribute('constraint', 'constraint', 'unique_key_id', convert=interned),
+        Attribute('expression', 'expression', 'expression'),
+        Attribute('props', PROPS),
+        Attribute(None, 'cascading_delete', 'cascading_delete'),
+    ),
+    properties=(
+        Property('has_value_edit', 'has_value_edit', 'has_value_edit', mask=Constraint.HAS_VALUE_EDIT),
+        Property('cascading_delete', 'cascading_delete', value=False),
+        Property('full_cascading_delete', 'cascading_delete', value=True),
+    ),
+    detail=ConstraintDetail
+)
+
+INDEX = Entity(
+    attributes=(
+        Attribute('name', 'name', 'name'),
+        Attribute('field', DETAIL, 'field', convert=interned),
+        Attribute('props', PROPS),
+        Attribute(None, 'kind', 'kind'),
+        Attribute(None, 'uniqueness', 'uniqueness'),
+        Attribute(None, 'fulltext', 'fulltext'),
+    ),
+    properties=(
+        Property('local', 'local', 'local'),
+        Property('uniqueness', 'kind', value='uniqueness'),
+        Property('fulltext', 'kind', value='fulltext'),
+    ),
+    detail=IndexDetail
+)
+
+CONSTRAINT_DETAIL = Entity(
+    attributes=(
+        Attribute('value', 'value', 'field_name', convert=interned),
+    )
+)
+
+INDEX_DETAIL = Entity(
+    attributes=(
+        Attribute('value', 'value', 'field_name', convert=interned),
+        Attribute('expression', 'expression', 'expression'),
+        Attribute('descend', 'descend', 'descend', convert=interned),
+    )
+)
+
+
+class Reader:
+    """ Скомпилированный обработчик атрибутов элемента.
+
+    Простые атрибуты присваиваются полям объекта по имени, найденному в словаре; значения
+    атрибутов, описанных с преобразованием interned, интернируются без вызова обработчика;
+    для остальных атрибутов, требующих преобразования (props, детали, конвертируемые значения),
+    вызывается отдельный обработчик.
+    """
+    def __init__(self, names, handlers, interned_names=None):
+        self.names = names
+        self.handlers = handlers
+        self.interned_names = interned_names or {}
+
+    def read(self, obj, attr_dict, unsupported_error):
+        """ Присвоить полям объекта значения атрибутов.
+
+        :param obj: объект RAM-представления.
+        :param attr_dict: словарь значений атрибутов.
+        :param unsupported_error: класс исключения для неподдерживаемого атрибута.
+        :return: None
+        """
+        names = self.names
+        interned_names = self.interned_names
+        for attr, value in attr_dict.items():
+            name = names.get(attr)
+            if name is not None:
+                setattr(obj, name, value)
+                continue
+            name = interned_names.get(attr)
+            if name is not None:
+                setattr(obj, name, intern(value) if type(value) is str else value)
+                continue
+            handler = self.handlers.get(attr)
+            if handler is None:
+                raise unsupported_error(attr)
+            handler(obj, value)
+
+
+class Writer:
+    """ Скомпилированный список функций получения значений атрибутов элемента в порядке их записи.
+    """
+    def __init__(self, getters):
+        self.getters = getters
+
+    def attributes(self, obj):
+        """ Получить непустые значения атрибутов объекта.
+
+        :param obj: объект RAM-представления.
+        :return: список пар (имя атрибута, значение).
+        """
+        result = []
+        for name, get in self.getters:
+            value = get(obj)
+            if value:
+                result.append((name, value))
+        return result
+
+
+def compile_xml_reader(entity: Entity, property_error):
+    """ Скомпилировать обработчик атрибутов XML-элемента.
+
+    :param entity: описание сущности.
+    :param property_error: класс исключения для неподдерживаемого свойства.
+    :return: Reader
+    """
+    names = {}
+    handlers = {}
+    interned_names = {}
+    for attribute in entity.attributes:
+        if attribute.xml is None:
+            continue
+        if attribute.ram is PROPS:
+            handlers[attribute.xml] = _props_reader(entity, property_error)
+        elif attribute.convert is interned and attribute.ram is not DETAIL:
+            interned_names[attribute.xml] = attribute.ram
+        elif attribute.ram is DETAIL or attribute.convert is not None:
+            handlers[attribute.xml] = _reader(entity, attribute)
+        else:
+            names[attribute.xml] = attribute.ram
+    return Reader(names, handlers, interned_names)
+
+
+def compile_dbd_reader(entity: Entity, keys=()):
+    """ Скомпилировать обработчик столбцов записи DBD-представления.
+
+    :param entity: описание сущности.
+    :param keys: столбцы-идентификаторы, которые обрабатываются вызывающей стороной.
+    :return: Reader
+    """
+    names = {}
+    handlers = {key: _skip for key in keys}
+    interned_names = {}
+    for attribute in entity.attributes:
+        if attribute.dbd is None:
+            continue
+        if attribute.convert is interned and attribute.ram is not DETAIL:
+            interned_names[attribute.dbd] = attribute.ram
+        elif attribute.ram is DETAIL or attribute.convert is not None:
+            handlers[attribute.dbd] = _reader(entity, attribute)
+        else:
+            names[attribute.dbd] = attribute.ram
+    for prop in entity.properties:
+        if prop.dbd is not None:
+            names[prop.dbd] = prop.ram
+    return Reader(names, handlers, interned_names)
+
+
+def compile_xml_writer(entity: Entity):
+    """ Скомпилировать список функций получения значений атрибутов XML-элемента.
+
+    :param entity: описание сущности.
+    :return: Writer
+    """
+    getters = []
+    for attribute in entity.attributes:
+        if attribute.xml is None:
+            continue
+        if attribute.ram is PROPS:
+            getters.append((attribute.xml, _props_writer(entity)))
+        elif attribute.ram is DETAIL:
+            getters.append((attribute.xml, _detail_writer))
+        else:
+            getters.append((attribute.xml, attrgetter(attribute.ram)))
+    return Writer(getters)
+
+
+def compile_state_getter(entity: Entity):
+    """ Скомпилировать функцию получения значений всех полей объекта, выгружаемых в XML.
+
+    В отличие от Writer, значения не преобразуются (props не формируется, свойства-флаги
+    передаются полем flags целиком), поэтому функция пригодна для дешевого сравнения
+    состояния объектов. Детали в состояние не входят.
+
+    :param entity: описание сущности.
+    :return: функция (объект), возвращающая значение поля или кортеж значений полей.
+    """
+    names = []
+    for attribute in entity.attributes:
+        if attribute.xml is not None and attribute.ram is not PROPS and attribute.ram is not DETAIL:
+            names.append(attribute.ram)
+    for prop in entity.properties:
+        name = 'flags' if prop.mask is not None else prop.ram
+        if prop.name is not None and name not in names:
+            names.append(name)
+    return attrgetter(*names)
+
+
+def compile_dbd_flags(entity: Entity):
+    """ Скомпилировать функцию получения значений столбцов DBD-представления для свойств-флагов.
+
+    :param entity: описание сущности.
+    :return: функция (объект), возвращающая список пар (столбец, значение).
+    """
+    columns = [(prop.dbd, prop.mask) for prop in entity.properties if prop.dbd is not None and prop.mask is not None]
+
+    def dbd_flags(obj):
+        flags = obj.flags
+        return [(column, bool(flags & mask)) for column, mask in columns]
+    return dbd_flags
+
+
+def _reader(entity: Entity, attribute: Attribute):
+    """ Создать обработчик, присваивающий преобразованное значение полю объекта или детали.
+
+    :param entity: описание сущности.
+    :param attribute: описание атрибута.
+    :return: функция (объект, значение).
+    """
+    convert = attribute.convert
+    if attribute.ram is DETAIL:
+        detail_class = entity.detail
+
+        def read_detail(obj, value):
+            detail = detail_class()
+            detail.value = convert(value) if convert else value
+            obj.details.append(detail)
+        return read_detail
+
+    name = attribute.ram
+
+    def read(obj, value):
+        setattr(obj, name, convert(value))
+    return read
+
+
+def _skip(obj, value):
+    """ Обработчик столбца, значение которого не присваивается объекту. """
+    pass
+
+
+def _props_reader(entity: Entity, property_error):
+    """ Создать обработчик атрибута props.
+
+    Значения props у элементов одной сущности повторяются, поэтому результат разбора
+    каждого встреченного значения запоминается: объединенная битовая маска свойств-флагов
+    и присваивания остальных свойств.
+
+    :param entity: описание сущности.
+    :param property_error: класс исключения для неподдерживаемого свойства.
+    :return: функция (объект, значение).
+    """
+    properties = {prop.name: prop for prop in entity.properties if prop.name is not None}
+    parsed = {}
+
+    def read_props(obj, value):
+        result = parsed.get(value)
+        if result is None:
+            mask = 0
+            assignments = {}
+            for name in value.split(', '):
+                try:
+                    prop = properties[name]
+                except KeyError:
+                    raise property_error(name)
+                if prop.mask is not None:
+                    mask |= prop.mask
+                else:
+                    assignments[prop.ram] = prop.value
+            result = parsed[value] = (mask, tuple(assignments.items()))
+        mask, assignments = result
+        if mask:
+            obj.flags |= mask
+        for ram, flag in assignments:
+            setattr(obj, ram, flag)
+    return read_props
+
+
+def _props_writer(entity: Entity):
+    """ Создать функцию получения значения атрибута props.
+
+    Значение props однозначно определяется полем flags и значениями полей остальных
+    свойств, поэтому для каждого встреченного набора результат запоминается.
+
+    :param entity: описание сущности.
+    :return: функция (объект).
+    """
+    properties = [prop for prop in entity.properties if prop.name is not None]
+    names = []
+    if any(prop.mask is not None for prop in properties):
+        names.append('flags')
+    for prop in properties:
+        if prop.mask is None and prop.ram not in names:
+            names.append(prop.ram)
+    values = attrgetter(*names) if len(names) > 1 else (lambda obj: (getattr(obj, names[0]),))
+    written = {}
+
+    def write_props(obj):
+        key = values(obj)
+        result = written.get(key)
+        if result is None:
+            result = written[key] = ', '.join([prop.name for prop in properties if _has_property(obj, prop)])
+        return result
+    return write_props
+
+
+def _has_property(obj, prop: Property):
+    """ Проверить, задано ли для объекта свойство.
+
+    :param obj: объект RAM-представления.
+    :param prop: описание свойства.
+    :return: bool
+    """
+    if prop.mask is not None:
+        return bool(obj.flags & prop.mask)
+    current = getattr(obj, prop.ram)
+    return current if prop.value is True else current == prop.value
+
+
+def _detail_writer(obj):
+    """ Получить значение атрибута, задающего единственную деталь элемента.
+
+    :param obj: объект ограничения или индекса.
+    :return: значение детали, если она единственная.
+    """
+    if len(obj.details) == 1:
+        return obj.details[0].value
+    return None
@@ -0,0 +1,249 @@
+""" Модуль, реализующий колоночное хранение полей таблиц для схем с очень большим числом полей.
+
+Вместо объекта Field на каждое поле ColumnarFields хранит поля таблицы параллельными
+массивами (array): номера имени, русского имени, домена, типа и описания в общей таблице
+строк (StringTable) и биты свойств (flags). Таблица строк разделяется всеми таблицами
+схемы, поэтому каждое различное значение хранится однократно.
+
+ColumnarFields поддерживает интерфейс словаря полей Table.fields: обращение по имени,
+проверку наличия, перебор имен, values() и items(), добавление и удаление. Элементы
+словаря - представления строк (ColumnarField) с атрибутами и свойствами класса Field;
+изменение атрибутов представления изменяет массивы. Удаленное поле лишь помечается, поэтому
+представления остальных полей (и индекс ссылок схемы, содержащий их) остаются
+действительными; освобождает строки удаленных полей метод compact. Словарь номеров строк
+по именам строится при первом обращении по имени.
+
+Перевод схемы на колоночное хранение выполняет функция columnar.
+"""
+
+from array import array
+from collections.abc import MutableMapping
+
+from ram_repr.ram_structure import Field
+from ram_repr.ram_structure import Schema
+
+# Атрибуты поля, хранимые номерами в таблице строк, в порядке следования массивов.
+_COLUMNS = ('name', 'rname', 'domain', 'type', 'description')
+
+
+def columnar(schema: Schema, strings=None):
+    """ Перевести поля всех таблиц схемы на колоночное хранение.
+
+    :param schema: схема.
+    :param strings: общая таблица строк (по умолчанию создается новая).
+    :return: таблица строк схемы.
+    """
+    if strings is None:
+        strings = StringTable()
+    for table in schema.tables.values():
+        if not isinstance(table.fields, ColumnarFields):
+            table.fields = ColumnarFields(strings, table.fields.values())
+    # Представления полей заменяют объекты Field в индексе ссылок схемы.
+    schema.touch()
+    return strings
+
+
+class StringTable:
+    """ Класс, реализующий таблицу строк: различные значения и их номера. Номер 0 - None.
+    """
+    __slots__ = ('values', 'numbers')
+
+    def __init__(self):
+        self.values = [None]
+        self.numbers = {None: 0}
+
+    def number(self, value):
+        """ Получить номер значения, при необходимости добавив его в таблицу.
+
+        :param value: строка или None.
+        :return: int
+        """
+        number = self.numbers.get(value)
+        if number is None:
+            number = self.numbers[value] = len(self.values)
+            self.values.append(value)
+        return number
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ColumnarFields(MutableMapping):
+    """ Класс, реализующий словарь полей таблицы в виде параллельных массивов.
+    """
+    __slots__ = ('strings', 'columns', 'flags', 'removed', '_rows')
+
+    def __init__(self, strings: StringTable=None, fields=()):
+        """ Конструктор.
+
+        :param strings: общая таблица строк (по умолчанию создается новая).
+        :param fields: начальные поля (объекты Field или представления) с различными именами.
+        """
+        self.strings = strings if strings is not None else StringTable()
+        # Массивы номеров значений атрибутов _COLUMNS в таблице строк.
+        self.columns = tuple(array('I') for _ in _COLUMNS)
+        self.flags = array('B')
+        # Номера строк удаленных полей.
+        self.removed = set()
+        # Номера строк по именам полей; строится при первом обращении по имени.
+        self._rows = None
+        for field in fields:
+            self._append(field)
+
+    def _append(self, field):
+        """ Добавить в массивы строку поля.
+
+        :param field: объект поля.
+        :return: None
+        """
+        number = self.strings.number
+        for column, name in zip(self.columns, _COLUMNS):
+            column.append(number(getattr(field, name)))
+        self.flags.append(field.flags)
+
+    def _index(self):
+        """ Получить номера строк по именам полей.
+
+        :return: dict {имя: номер строки}.
+        """
+        if self._rows is None:
+            values = self.strings.values
+            removed = self.removed
+            self._rows = {values[number]: row for row, number in enumerate(self.columns[0]) if row not in removed}
+        return self._rows
+
+    def __getitem__(self, name):
+        return ColumnarField(self, self._index()[name])
+
+    def __setitem__(self, name, field):
+        if name != field.name:
+            raise ValueError('Имя поля не совпадает с ключом: ' + str(name))
+        rows = self._index()
+        row = rows.get(name)
+        if row is None:
+            rows[name] = len(self.flags)
+            self._append(field)
+            return
+        number = self.strings.number
+        for column, attribute in zip(self.columns, _COLUMNS):
+            column[row] = number(getattr(field, attribute))
+        self.flags[row] = field.flags
+
+    def __delitem__(self, name):
+        self.removed.add(self._index().pop(name))
+
+    def __contains__(self, name):
+        return name in self._index()
+
+    def __iter__(self):
+        values = self.strings.values
+        if not self.removed:
+            return (values[number] for number in self.columns[0])
+        removed = self.removed
+        return (values[number] for row, number in enumerate(self.columns[0]) if row not in removed)
+
+    def __len__(self):
+        return len(self.flags) - len(self.removed)
+
+    def values(self):
+        removed = self.removed
+        return [ColumnarField(self, row) for row in range(len(self.flags)) if row not in removed]
+
+    def items(self):
+        return [(field.name, field) for field in self.values()]
+
+    def compact(self):
+        """ Освободить строки удаленных полей. Полученные ранее представления полей становятся
+        недействительными, поэтому после сжатия полей таблицы схемы необходимо вызвать
+        Schema.touch.
+
+        :return: None
+        """
+        if not self.removed:
+            return
+        kept = [row for row in range(len(self.flags)) if row not in self.removed]
+        self.columns = tuple(array('I', [column[row] for row in kept]) for column in self.columns)
+        self.flags = array('B', [self.flags[row] for row in kept])
+        self.removed = set()
+        self._rows = None
+
+
+def _column(position: int, doc: str=None):
+    """ Создать свойство представления поля, хранимое номером в таблице строк.
+
+    :param position: номер массива атрибута.
+    :param doc: описание свойства.
+    :return: property
+    """
+    def get(self):
+        fields = self._fields
+        return fields.strings.values[fields.columns[position][self._row]]
+
+    def set(self, value):
+        fields = self._fields
+        column = fields.columns[position]
+        if position == 0 and fields._rows is not None:
+            del fields._rows[fields.strings.values[column[self._row]]]
+            fields._rows[value] = self._row
+        column[self._row] = fields.strings.number(value)
+    return property(get, set, doc=doc)
+
+
+class ColumnarField:
+    """ Класс, реализующий представление строки колоночного хранения полей с интерфейсом Field.
+    """
+    __slots__ = ('_fields', '_row')
+
+    name = _column(0)
+    rname = _column(1)
+    domain = _column(2)
+    type = _column(3)
+    description = _column(4)
+
+    input = Field.input
+    edit = Field.edit
+    show_in_grid = Field.show_in_grid
+    show_in_details = Field.show_in_details
+    is_mean = Field.is_mean
+    autocalculated = Field.autocalculated
+    required = Field.required
+
+    def __init__(self, fields: ColumnarFields, row: int):
+        self._fields = fields
+        self._row = row
+
+    @property
+    def flags(self):
+        return self._fields.flags[self._row]
+
+    @flags.setter
+    def flags(self, value):
+        self._fields.flags[self._row] = value
+
+    @property
+    def _fingerprint(self):
+        # Отпечатки полей не хранятся: они дешевы, а отпечаток таблицы сохраняется.
+        return None
+
+    @_fingerprint.setter
+    def _fingerprint(self, value):
+        pass
+
+    def copy(self):
+        """ Создать объект Field с теми же значениями атрибутов.
+
+        :return: Field
+        """
+        field = Field()
+        for name in _COLUMNS:
+            setattr(field, name, getattr(self, name))
+        field.flags = self.flags
+        return field
+
+    def __eq__(self, other):
+        if not isinstance(other, ColumnarField):
+            return NotImplemented
+        return self._fields is other._fields and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._fields), self._row))
@@ -0,0 +1,274 @@
+""" Модуль, содержащий методы сравнения двух RAM-представлений схемы.
+
+Результат сравнения - объект SchemaDiff, перечисляющий добавленные, удаленные и измененные
+домены и таблицы схемы, а для измененных таблиц (TableDiff) - добавленные, удаленные и
+измененные поля, ограничения и индексы. Домены, таблицы и поля сопоставляются по именам;
+ограничения и индексы, которые могут не иметь имени, - по содержимому. Сравнение
+использует отпечатки элементов (см. ram_fingerprint): совпадающие поддеревья не
+просматриваются. Перед сравнением отпечатки обеих схем вычисляются заново
+(ram_fingerprint.refresh), поэтому учитываются и непосредственные изменения элементов,
+о которых схеме не сообщалось. По умолчанию различием считается и изменение порядка элементов;
+сравнение без учета порядка выполняется с параметром ordered=False.
+"""
+
+from ram_repr.ram_fingerprint import fingerprint
+from ram_repr.ram_fingerprint import refresh
+from ram_repr.ram_fingerprint import state
+from ram_repr.ram_structure import Schema
+from ram_repr.ram_structure import Table
+
+
+def equal(old: Schema, new: Schema, ordered: bool=True):
+    """ Проверить структурное равенство двух схем.
+
+    С учетом порядка элементов сравниваются только отпечатки схем.
+
+    :param old: исходная схема.
+    :param new: сравниваемая схема.
+    :param ordered: учитывать порядок доменов, таблиц и элементов таблиц.
+    :return: bool
+    """
+    if ordered:
+        return refresh(old) == refresh(new)
+    return not diff(old, new, ordered=False)
+
+
+def diff(old: Schema, new: Schema, ordered: bool=True):
+    """ Сравнить две схемы.
+
+    :param old: исходная схема.
+    :param new: новая схема.
+    :param ordered: учитывать порядок доменов, таблиц и элементов таблиц.
+    :return: объект SchemaDiff.
+    """
+    result = SchemaDiff(old, new)
+    if refresh(old) == refresh(new):
+        return result
+    result.properties = state(old) != state(new)
+    result.added_domains, result.removed_domains, result.changed_domains = _dict_changes(old.domains, new.domains)
+    result.added_tables = [table for name, table in new.tables.items() if name not in old.tables]
+    result.removed_tables = [table for name, table in old.tables.items() if name not in new.tables]
+    for old_table, new_table in _common_pairs(old.tables, new.tables):
+        table_diff = _diff_tables(old_table, new_table, ordered)
+        if table_diff:
+            result.changed_tables.append(table_diff)
+    if ordered:
+        result.reordered = (_common_names(old.domains, new.domains) != _common_names(new.domains, old.domains)
+                            or _common_names(old.tables, new.tables) != _common_names(new.tables, old.tables))
+    return result
+
+
+def diff_tables(old: Table, new: Table, ordered: bool=True):
+    """ Сравнить две таблицы.
+
+    :param old: исходная таблица.
+    :param new: новая таблица.
+    :param ordered: учитывать порядок полей, ограничений и индексов.
+    :return: объект TableDiff.
+    """
+    refresh(old)
+    refresh(new)
+    return _diff_tables(old, new, ordered)
+
+
+def _diff_tables(old: Table, new: Table, ordered: bool):
+    """ Сравнить две таблицы с актуальными отпечатками.
+
+    :param old: исходная таблица.
+    :param new: новая таблица.
+    :param ordered: учитывать порядок полей, ограничений и индексов.
+    :return: объект TableDiff.
+    """
+    result = TableDiff(old, new)
+    if fingerprint(old) == fingerprint(new):
+        return result
+    result.properties = state(old) != state(new)
+    result.added_fields, result.removed_fields, result.changed_fields = _dict_changes(old.fields, new.fields)
+    result.added_constraints, result.removed_constraints = _list_changes(old.constraints, new.constraints)
+    result.added_indexes, result.removed_indexes = _list_changes(old.indexes, new.indexes)
+    if ordered:
+        result.reordered = (_common_names(old.fields, new.fields) != _common_names(new.fields, old.fields)
+                            or _kept(old.constraints, result.removed_constraints)
+                            != _kept(new.constraints, result.added_constraints)
+                            or _kept(old.indexes, result.removed_indexes) != _kept(new.indexes, result.added_indexes))
+    return result
+
+
+def _common_pairs(old: dict, new: dict):
+    """ Получить пары одноименных элементов двух словарей в порядке исходного словаря.
+
+    :param old: исходный словарь {имя: элемент}.
+    :param new: новый словарь {имя: элемент}.
+    :return: генератор пар (исходный, новый).
+    """
+    for name, element in old.items():
+        other = new.get(name)
+        if other is not None:
+            yield element, other
+
+
+def _common_names(elements: dict, others: dict):
+    """ Получить имена элементов словаря, присутствующих в другом словаре, в порядке следования.
+
+    :param elements: словарь {имя: элемент}.
+    :param others: другой словарь {имя: элемент}.
+    :return: список имен.
+    """
+    return [name for name in elements if name in others]
+
+
+def _kept(elements: list, excluded: list):
+    """ Получить отпечатки элементов списка, сопоставленных при сравнении, в порядке следования.
+
+    :param elements: список элементов.
+    :param excluded: добавленные или удаленные элементы списка.
+    :return: список отпечатков.
+    """
+    excluded = set(id(element) for element in excluded)
+    return [fingerprint(element) for element in elements if id(element) not in excluded]
+
+
+def _dict_changes(old: dict, new: dict):
+    """ Сравнить словари элементов, сопоставляя элементы по именам.
+
+    :param old: исходный словарь {имя: элемент}.
+    :param new: новый словарь {имя: элемент}.
+    :return: кортеж (добавленные элементы, удаленные элементы, пары (исходный, новый)
+             измененных элементов).
+    """
+    added = [element for name, element in new.items() if name not in old]
+    removed = []
+    changed = []
+    for name, element in old.items():
+        other = new.get(name)
+        if other is None:
+            removed.append(element)
+        elif fingerprint(element) != fingerprint(other):
+            changed.append((element, other))
+    return added, removed, changed
+
+
+def _list_changes(old: list, new: list):
+    """ Сравнить списки элементов, сопоставляя элементы по содержимому.
+
+    Измененный элемент считается удаленным и добавленным; одинаковые элементы
+    сопоставляются с учетом их количества.
+
+    :param old: исходный список элементов.
+    :param new: новый список элементов.
+    :return: кортеж (добавленные элементы, удаленные элементы).
+    """
+    unmatched = {}
+    for element in old:
+        unmatched.setdefault(fingerprint(element), []).append(element)
+    added = []
+    for element in new:
+        same = unmatched.get(fingerprint(element))
+        if same:
+            same.pop()
+        else:
+            added.append(element)
+    remaining = set(id(element) for elements in unmatched.values() for element in elements)
+    return added, [element for element in old if id(element) in remaining]
+
+
+class SchemaDiff:
+    """ Класс, моделирующий различия двух схем.
+
+    Объект истинен, если схемы различаются.
+    """
+    __slots__ = ('old', 'new', 'properties', 'reordered', 'added_domains', 'removed_domains', 'changed_domains',
+                 'added_tables', 'removed_tables', 'changed_tables')
+
+    def __init__(self, old: Schema, new: Schema):
+        self.old = old
+        self.new = new
+        # Признак изменения атрибутов самой схемы.
+        self.properties = False
+        # Признак изменения порядка доменов или таблиц (только при сравнении с учетом порядка).
+        self.reordered = False
+
+        # Домены новой схемы, отсутствующие в исходной.
+        self.added_domains = []
+        # Домены исходной схемы, отсутствующие в новой.
+        self.removed_domains = []
+        # Пары (исходный, новый) измененных доменов.
+        self.changed_domains = []
+
+        self.added_tables = []
+        self.removed_tables = []
+        # Объекты TableDiff измененных таблиц.
+        self.changed_tables = []
+
+    def __bool__(self):
+        return bool(self.properties or self.reordered or self.added_domains or self.removed_domains
+                    or self.changed_domains or self.added_tables or self.removed_tables or self.changed_tables)
+
+    def __str__(self):
+        lines = []
+        if self.properties:
+            lines.append('~ схема ' + str(self.new.name))
+        if self.reordered:
+            lines.append('~ порядок доменов или таблиц')
+        lines.extend('+ домен ' + str(domain.name) for domain in self.added_domains)
+        lines.extend('- домен ' + str(domain.name) for domain in self.removed_domains)
+        lines.extend('~ домен ' + str(domain.name) for domain, _ in self.changed_domains)
+        lines.extend('+ таблица ' + str(table.name) for table in self.added_tables)
+        lines.extend('- таблица ' + str(table.name) for table in self.removed_tables)
+        lines.extend(str(table_diff) for table_diff in self.changed_tables)
+        return '\n'.join(lines)
+
+
+class TableDiff:
+    """ Класс, моделирующий различия двух таблиц с одинаковым именем.
+
+    Объект истинен, если таблицы различаются.
+    """
+    __slots__ = ('old', 'new', 'properties', 'reordered', 'added_fields', 'removed_fields', 'changed_fields',
+                 'added_constraints', 'removed_constraints', 'added_indexes', 'removed_indexes')
+
+    def __init__(self, old: Table, new: Table):
+        self.old = old
+        self.new = new
+        # Признак изменения атрибутов самой таблицы.
+        self.properties = False
+        # Признак изменения порядка элементов таблицы (только при сравнении с учетом порядка).
+        self.reordered = False
+
+        self.added_fields = []
+        self.removed_fields = []
+        # Пары (исходное, новое) измененных полей.
+        self.changed_fields = []
+
+        self.added_constraints = []
+        self.removed_constraints = []
+        self.added_indexes = []
+        self.removed_indexes = []
+
+    def __bool__(self):
+        return bool(self.properties or self.reordered or self.added_fields or self.removed_fields
+                    or self.changed_fields or self.added_constraints or self.removed_constraints
+                    or self.added_indexes or self.removed_indexes)
+
+    def __str__(self):
+        lines = ['~ таблица ' + str(self.new.name)]
+        if self.reordered:
+            lines.append('  ~ порядок элементов')
+        lines.extend('  + поле ' + str(field.name) for field in self.added_fields)
+        lines.extend('  - поле ' + str(field.name) for field in self.removed_fields)
+        lines.extend('  ~ поле ' + str(field.name) for field, _ in self.changed_fields)
+        lines.extend('  + ограничение ' + _describe(constraint) for constraint in self.added_constraints)
+        lines.extend('  - ограничение ' + _describe(constraint) for constraint in self.removed_constraints)
+        lines.extend('  + индекс ' + _describe(index) for index in self.added_indexes)
+        lines.extend('  - индекс ' + _describe(index) for index in self.removed_indexes)
+        return '\n'.join(lines)
+
+
+def _describe(element):
+    """ Получить краткое описание ограничения или индекса: имя, вид и поля.
+
+    :param element: объект ограничения или индекса.
+    :return: str
+    """
+    return '%s %s (%s)' % (element.name or '', element.kind or '',
+                           ', '.join(str(detail.value) for detail in element.details))
@@ -0,0 +1,243 @@
+""" Модуль, содержащий методы вычисления отпечатков (хешей содержимого) элементов схемы.
+
+Отпечатки вычисляются снизу вверх: отпечатки доменов, полей, ограничений и индексов -
+по значениям их атрибутов (вместе с деталями), отпечаток таблицы - по ее атрибутам и
+отпечаткам ее элементов, отпечаток схемы - по ее атрибутам и отпечаткам доменов и таблиц.
+Поэтому совпадение отпечатков схем означает совпадение всего их содержимого, а поиск
+различий спускается только в поддеревья с различающимися отпечатками.
+
+Отпечатки не зависят от процесса и источника схемы (XML, DBD): значения атрибутов
+приводятся к строкам, поэтому число 5 или логическое True, загруженные из DBD, не отличаются
+от строк '5' и '1' XML-представления. Отпечатки сохраняются в элементах схемы до их
+изменения (см. Schema.touch).
+"""
+
+from hashlib import sha1
+
+from ram_repr.ram_attributes import CONSTRAINT
+from ram_repr.ram_attributes import CONSTRAINT_DETAIL
+from ram_repr.ram_attributes import DOMAIN
+from ram_repr.ram_attributes import FIELD
+from ram_repr.ram_attributes import INDEX
+from ram_repr.ram_attributes import INDEX_DETAIL
+from ram_repr.ram_attributes import SCHEMA
+from ram_repr.ram_attributes import TABLE
+from ram_repr.ram_attributes import compile_state_getter
+from ram_repr.ram_columnar import ColumnarField
+from ram_repr.ram_structure import Constraint
+from ram_repr.ram_structure import Domain
+from ram_repr.ram_structure import Field
+from ram_repr.ram_structure import Index
+from ram_repr.ram_structure import Schema
+from ram_repr.ram_structure import Table
+
+
+def fingerprint(element):
+    """ Получить отпечаток элемента схемы, вычислив его при необходимости.
+
+    :param element: схема, домен, таблица, поле, ограничение или индекс.
+    :return: bytes (20 байт).
+    """
+    digest = element._fingerprint
+    if digest is None:
+        digest = element._fingerprint = _FINGERPRINTS[type(element)](element)
+    return digest
+
+
+def recompute(element):
+    """ Вычислить отпечаток элемента схемы заново, не используя сохраненные отпечатки элемента
+    и его вложенных элементов и не сохраняя результат.
+
+    Отпечаток совпадает с результатом fingerprint для неизмененного элемента и учитывает
+    непосредственные изменения, о которых схеме не сообщалось (см. Schema.touch).
+
+    :param element: схема, домен, таблица, поле, ограничение или индекс.
+    :return: bytes (20 байт).
+    """
+    function = _FINGERPRINTS[type(element)]
+    if isinstance(element, (Schema, Table)):
+        return function(element, recompute)
+    return function(element)
+
+
+def refresh(element):
+    """ Вычислить отпечаток элемента схемы заново, не используя сохраненные отпечатки, и
+    сохранить вычисленные отпечатки элемента и всех его вложенных элементов.
+
+    В отличие от fingerprint, учитывает непосредственные изменения, о которых схеме не
+    сообщалось (см. Schema.touch); последующие вызовы fingerprint используют обновленные
+    отпечатки.
+
+    :param element: схема, домен, таблица, поле, ограничение или индекс.
+    :return: bytes (20 байт).
+    """
+    function = _FINGERPRINTS[type(element)]
+    if isinstance(element, (Schema, Table)):
+        digest = function(element, refresh)
+    else:
+        digest = function(element)
+    element._fingerprint = digest
+    return digest
+
+
+def state(element):
+    """ Получить значения собственных атрибутов элемента схемы (без вложенных элементов).
+
+    :param element: схема, домен, таблица, поле, ограничение или индекс.
+    :return: кортеж значений атрибутов, приведенных к строкам (см. _normalized).
+    """
+    return _normalized(_STATES[type(element)](element))
+
+
+def changed(old: Schema, new: Schema):
+    """ Найти домены и таблицы, различающиеся в двух схемах.
+
+    Если отпечатки схем совпадают, домены и таблицы не просматриваются.
+
+    :param old: исходная схема.
+    :param new: сравниваемая схема.
+    :return: пара списков имен (домены, таблицы), добавленных, удаленных или измененных.
+    """
+    if fingerprint(old) == fingerprint(new):
+        return [], []
+    return _changed_names(old.domains, new.domains), _changed_names(old.tables, new.tables)
+
+
+def _changed_names(old: dict, new: dict):
+    """ Найти имена различающихся элементов двух словарей элементов схемы.
+
+    :param old: исходный словарь {имя: элемент}.
+    :param new: сравниваемый словарь {имя: элемент}.
+    :return: список имен в порядке следования (сначала исходного словаря).
+    """
+    names = []
+    for name, element in old.items():
+        other = new.get(name)
+        if other is None or fingerprint(element) != fingerprint(other):
+            names.append(name)
+    names.extend(name for name in new if name not in old)
+    return names
+
+
+def _normalized(values):
+    """ Привести значения атрибутов элемента к виду, не зависящему от источника схемы.
+
+    :param values: значение или кортеж значений атрибутов.
+    :return: кортеж строк и None.
+    """
+    if not isinstance(values, tuple):
+        values = (values,)
+    return tuple([value if value is None or value.__class__ is str
+                  else str(int(value)) if value.__class__ is bool else str(value)
+                  for value in values])
+
+
+def _state_digest(values):
+    """ Вычислить хеш значений атрибутов элемента.
+
+    :param values: кортеж или список нормализованных значений атрибутов (см. _normalized).
+    :return: bytes
+    """
+    return sha1(repr(values).encode('utf-8')).digest()
+
+
+def _schema_fingerprint(schema: Schema, children=fingerprint):
+    """ Вычислить отпечаток схемы.
+
+    :param schema: Объект RAM-представления Схемы.
+    :param children: функция получения отпечатков доменов и таблиц.
+    :return: bytes
+    """
+    digest = sha1(repr((_normalized(_SCHEMA_STATE(schema)), len(schema.domains),
+                        len(schema.tables))).encode('utf-8'))
+    for domain in schema.domains.values():
+        digest.update(children(domain))
+    for table in schema.tables.values():
+        digest.update(children(table))
+    return digest.digest()
+
+
+def _domain_fingerprint(domain: Domain):
+    """ Вычислить отпечаток домена.
+
+    :param domain: Объект RAM-представления Домена.
+    :return: bytes
+    """
+    return _state_digest(_normalized(_DOMAIN_STATE(domain)))
+
+
+def _table_fingerprint(table: Table, children=fingerprint):
+    """ Вычислить отпечаток таблицы.
+
+    :param table: Объект RAM-представления Таблицы.
+    :param children: функция получения отпечатков полей, ограничений и индексов.
+    :return: bytes
+    """
+    digest = sha1(repr((_normalized(_TABLE_STATE(table)), len(table.fields), len(table.constraints),
+                        len(table.indexes))).encode('utf-8'))
+    for field in table.fields.values():
+        digest.update(children(field))
+    for constraint in table.constraints:
+        digest.update(children(constraint))
+    for index in table.indexes:
+        digest.update(children(index))
+    return digest.digest()
+
+
+def _field_fingerprint(field: Field):
+    """ Вычислить отпечаток поля.
+
+    :param field: Объект RAM-представления Поля.
+    :return: bytes
+    """
+    return _state_digest(_normalized(_FIELD_STATE(field)))
+
+
+def _constraint_fingerprint(constraint: Constraint):
+    """ Вычислить отпечаток ограничения вместе с его деталями.
+
+    :param constraint: Объект RAM-представления Ограничения.
+    :return: bytes
+    """
+    return _state_digest([_normalized(_CONSTRAINT_STATE(constraint))]
+                         + [_normalized(_CONSTRAINT_DETAIL_STATE(detail)) for detail in constraint.details])
+
+
+def _index_fingerprint(index: Index):
+    """ Вычислить отпечаток индекса вместе с его деталями.
+
+    :param index: Объект RAM-представления Индекса.
+    :return: bytes
+    """
+    return _state_digest([_normalized(_INDEX_STATE(index))]
+                         + [_normalized(_INDEX_DETAIL_STATE(detail)) for detail in index.details])
+
+
+_SCHEMA_STATE = compile_state_getter(SCHEMA)
+_DOMAIN_STATE = compile_state_getter(DOMAIN)
+_TABLE_STATE = compile_state_getter(TABLE)
+_FIELD_STATE = compile_state_getter(FIELD)
+_CONSTRAINT_STATE = compile_state_getter(CONSTRAINT)
+_INDEX_STATE = compile_state_getter(INDEX)
+_CONSTRAINT_DETAIL_STATE = compile_state_getter(CONSTRAINT_DETAIL)
+_INDEX_DETAIL_STATE = compile_state_getter(INDEX_DETAIL)
+
+_FINGERPRINTS = {
+    Schema: _schema_fingerprint,
+    Domain: _domain_fingerprint,
+    Table: _table_fingerprint,
+    Field: _field_fingerprint,
+    ColumnarField: _field_fingerprint,
+    Constraint: _constraint_fingerprint,
+    Index: _index_fingerprint,
+}
+
+_STATES = {
+    Schema: _SCHEMA_STATE,
+    Domain: _DOMAIN_STATE,
+    Table: _TABLE_STATE,
+    Field: _FIELD_STATE,
+    ColumnarField: _FIELD_STATE,
+    Constraint: _CONSTRAINT_STATE,
+    Index: _INDEX_STATE,
+}
@@ -0,0 +1,156 @@
+""" Модуль, реализующий граф ссылок между таблицами схемы по внешним ключам.
+
+Вершины графа - таблицы схемы, дуги - ссылки ограничений (Constraint.reference) на
+другие таблицы той же схемы; ссылки на отсутствующие в схеме таблицы не учитываются.
+Граф строится за один проход по ограничениям, сильно связные компоненты находятся
+алгоритмом Тарьяна, компоненты связности - обходом в ширину; все вычисления выполняются
+за время, линейное от количества таблиц и ссылок.
+
+Порядок таблиц (order) - топологический: таблица следует после таблиц, на которые она
+ссылается. Таблицы, ссылающиеся друг на друга по циклу, образуют одну сильно связную
+компоненту (cycles) и следуют подряд; внешние ключи внутри такой компоненты не могут быть
+созданы (и данные в них загружены) без отложенной проверки.
+
+Граф схемы кэшируется в схеме (Schema.graph) и сбрасывается при изменении ее таблиц и
+ограничений.
+"""
+
+from collections import deque
+
+
+class ForeignKeyGraph:
+    """ Класс, реализующий граф ссылок между таблицами схемы.
+    """
+    __slots__ = ('tables', 'references', 'strong_components', 'component', '_components')
+
+    def __init__(self, schema):
+        """ Конструктор.
+
+        :param schema: схема (объект Schema или представление схемы).
+        """
+        tables = schema.tables
+        # Имена таблиц в порядке следования в схеме.
+        self.tables = list(tables)
+        # {имя таблицы: имена таблиц, на которые она ссылается (без повторений)}
+        self.references = {}
+        for name, table in tables.items():
+            referenced = {}
+            for constraint in table.constraints:
+                reference = constraint.reference
+                if reference is not None and reference in tables:
+                    referenced[reference] = None
+            self.references[name] = list(referenced)
+        # Сильно связные компоненты в топологическом порядке: компонента следует после
+        # компонент, на таблицы которых ссылаются ее таблицы.
+        self.strong_components = self._strong_components()
+        # {имя таблицы: номер ее сильно связной компоненты}
+        self.component = {name: number for number, component in enumerate(self.strong_components)
+                          for name in component}
+        self._components = None
+
+    def _strong_components(self):
+        """ Найти сильно связные компоненты графа (алгоритм Тарьяна без рекурсии).
+
+        Алгоритм завершает компоненту после всех компонент, достижимых из нее, поэтому
+        компоненты получаются в топологическом порядке ссылок.
+
+        :return: список списков имен таблиц.
+        """
+        references = self.references
+        numbers = {}
+        lowlinks = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in self.tables:
+            if root in numbers:
+                continue
+            numbers[root] = lowlinks[root] = len(numbers)
+            stack.append(root)
+            on_stack.add(root)
+            path = [(root, iter(references[root]))]
+            while path:
+                name, children = path[-1]
+                for child in children:
+                    if child not in numbers:
+                        numbers[child] = lowlinks[child] = len(numbers)
+                        stack.append(child)
+                        on_stack.add(child)
+                        path.append((child, iter(references[child])))
+                        break
+                    if child in on_stack and numbers[child] < lowlinks[name]:
+                        lowlinks[name] = numbers[child]
+                else:
+                    path.pop()
+                    if path:
+                        parent = path[-1][0]
+                        if lowlinks[name] < lowlinks[parent]:
+                            lowlinks[parent] = lowlinks[name]
+                    if lowlinks[name] == numbers[name]:
+                        position = len(stack) - 1
+                        while stack[position] != name:
+                            position -= 1
+                        component = stack[position:]
+                        del stack[position:]
+                        on_stack.difference_update(component)
+                        components.append(component)
+        return components
+
+    def order(self):
+        """ Получить имена таблиц в топологическом порядке: каждая таблица следует после
+        таблиц, на которые она ссылается (кроме ссылок внутри циклов).
+
+        :return: список имен таблиц.
+        """
+        return [name for component in self.strong_components for name in component]
+
+    def cycles(self):
+        """ Получить циклы ссылок: сильно связные компоненты из нескольких таблиц и таблицы,
+        ссылающиеся на себя.
+
+        :return: список списков имен таблиц.
+        """
+        references = self.references
+        return [component for component in self.strong_components
+                if len(component) > 1 or component[0] in references[component[0]]]
+
+    def in_cycle(self, name: str, reference: str):
+        """ Проверить, входит ли ссылка таблицы на другую таблицу в цикл ссылок.
+
+        :param name: имя ссылающейся таблицы.
+        :param reference: имя таблицы, на которую указывает ссылка.
+        :return: bool
+        """
+        component = self.component.get(reference)
+        return component is not None and component == self.component.get(name)
+
+    def components(self):
+        """ Получить компоненты связности графа без учета направления ссылок: таблицы разных
+        компонент не связаны внешними ключами ни прямо, ни косвенно.
+
+        Компоненты вычисляются при первом обращении.
+
+        :return: список списков имен таблиц.
+        """
+        if self._components is None:
+            neighbours = {name: list(referenced) for name, referenced in self.references.items()}
+            for name, referenced in self.references.items():
+                for reference in referenced:
+                    if reference != name:
+                        neighbours[reference].append(name)
+            seen = set()
+            self._components = []
+            for root in self.tables:
+                if root in seen:
+                    continue
+                seen.add(root)
+                component = [root]
+                queue = deque(component)
+                while queue:
+                    for neighbour in neighbours[queue.popleft()]:
+                        if neighbour not in seen:
+                            seen.add(neighbour)
+                            component.append(neighbour)
+                            queue.append(neighbour)
+                self._components.append(component)
+        return self._components
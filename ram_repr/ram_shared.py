@@ -0,0 +1,464 @@
+""" Модуль, реализующий каталог схем в разделяемой памяти для нескольких процессов.
+
+Каталог (SharedCatalog) размещает загруженные схемы в блоке разделяемой памяти в формате
+двоичного снимка (см. ram_snapshot). Процессы-обработчики подключаются к блоку по имени и
+читают схемы через легковесные представления (SchemaView, TableView, ...), которые
+извлекают записи из общего блока по запросу, не создавая копию схемы в каждом процессе.
+В процессе декодируется только таблица значений, однократно при подключении.
+
+Представления доступны только для чтения и поддерживают атрибуты и свойства классов
+RAM-представления, используемые при выгрузке схемы (ram_to_xml) и генерации DDL. Словари
+и списки вложенных элементов создают представления при каждом обращении, поэтому
+представления одного элемента не совпадают как объекты. Полную копию схем в памяти
+процесса создает метод SharedCatalog.load.
+
+При сериализации (например, при передаче в пул процессов) каталог и представления
+передаются только именем блока и номерами записей; в дочернем процессе блок подключается
+при первом обращении и остается подключенным до завершения процесса.
+
+Блок удаляет только его владелец. Подключенный процесс не передает блок своему процессу
+учета ресурсов (resource_tracker), иначе при завершении независимого процесса блок был бы
+удален для всех остальных.
+
+Разделяемая память (multiprocessing.shared_memory) доступна начиная с Python 3.8.
+"""
+
+import atexit
+import os
+import sys
+import threading
+from collections.abc import Mapping
+from collections.abc import Sequence
+
+from ram_repr.ram_snapshot import CONSTRAINT_DETAILS
+from ram_repr.ram_snapshot import CONSTRAINTS
+from ram_repr.ram_snapshot import DOMAINS
+from ram_repr.ram_snapshot import FIELDS
+from ram_repr.ram_snapshot import INDEX_DETAILS
+from ram_repr.ram_snapshot import INDEXES
+from ram_repr.ram_snapshot import SCHEMAS
+from ram_repr.ram_snapshot import SnapshotReader
+from ram_repr.ram_snapshot import TABLES
+from ram_repr.ram_snapshot import encode
+from ram_repr.ram_snapshot import load
+from ram_repr.ram_structure import Constraint
+from ram_repr.ram_structure import Domain
+from ram_repr.ram_structure import Field
+from ram_repr.ram_structure import Table
+
+try:
+    from multiprocessing import resource_tracker
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Каталоги, подключенные в текущем процессе при десериализации: {имя блока: каталог}.
+_ATTACHED = {}
+# Блокировка подключения к блокам без учета в resource_tracker (до Python 3.13).
+_UNTRACKED_LOCK = threading.Lock()
+
+
+def available():
+    """ Проверить, поддерживается ли разделяемая память в текущей версии Python.
+
+    :return: bool
+    """
+    return shared_memory is not None
+
+
+def attach(name: str):
+    """ Получить каталог, подключенный к блоку разделяемой памяти, в текущем процессе.
+
+    Каталог подключается при первом обращении и используется повторно.
+
+    :param name: имя блока разделяемой памяти.
+    :return: объект SharedCatalog.
+    """
+    catalog = _ATTACHED.get(name)
+    if catalog is None:
+        catalog = _ATTACHED[name] = SharedCatalog(name=name)
+    return catalog
+
+
+def _open_untracked(name: str):
+    """ Подключиться к существующему блоку разделяемой памяти, не регистрируя его в процессе
+    учета ресурсов текущего процесса.
+
+    До Python 3.13 SharedMemory регистрирует и подключенные блоки, поэтому на время
+    подключения регистрация этого блока пропускается. Отменять регистрацию после
+    подключения нельзя: дочерние процессы пула используют процесс учета ресурсов владельца,
+    и отмена удалила бы регистрацию владельца.
+
+    :param name: имя блока разделяемой памяти.
+    :return: объект SharedMemory.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    if os.name != 'posix':
+        return shared_memory.SharedMemory(name)
+    with _UNTRACKED_LOCK:
+        register = resource_tracker.register
+
+        def skip(resource, kind):
+            if kind != 'shared_memory' or resource.lstrip('/') != name.lstrip('/'):
+                register(resource, kind)
+
+        resource_tracker.register = skip
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+def _detach_all():
+    """ Отключить каталоги, подключенные в текущем процессе при десериализации.
+
+    Выполняется при завершении процесса: блок нельзя закрыть, пока существуют
+    ссылки на его содержимое.
+
+    :return: None
+    """
+    for catalog in list(_ATTACHED.values()):
+        catalog.close()
+
+
+atexit.register(_detach_all)
+
+
+class SharedCatalog:
+    """ Класс, реализующий доступный только для чтения каталог схем в разделяемой памяти.
+
+    Создавший блок процесс является его владельцем и удаляет блок (unlink) по завершении
+    работы; процессы-обработчики только подключаются к нему.
+    """
+    def __init__(self, schemas: list=None, name: str=None):
+        """ Конструктор.
+
+        :param schemas: список схем, размещаемых в новом блоке.
+        :param name: имя существующего блока для подключения (если схемы не заданы).
+        """
+        if shared_memory is None:
+            raise SharedMemoryUnavailableError()
+        if schemas is not None:
+            data = encode(schemas)
+            self.memory = shared_memory.SharedMemory(create=True, size=len(data))
+            self.memory.buf[:len(data)] = data
+            self.owner = True
+        elif name is not None:
+            self.memory = _open_untracked(name)
+            self.owner = False
+        else:
+            raise ValueError('Не заданы схемы или имя блока разделяемой памяти')
+        self.name = self.memory.name
+        try:
+            self.reader = SnapshotReader(self.memory.buf)
+        except BaseException:
+            self.close()
+            raise
+        self.values = self.reader.values
+        # Номера записей элементов по именам для диапазонов записей разделов:
+        # {(раздел, номер первой записи): {имя: номер}}.
+        self._numbers = {}
+
+    def __len__(self):
+        return self.reader.count(SCHEMAS)
+
+    def __getitem__(self, number: int):
+        """ Получить представление схемы по номеру.
+
+        :param number: номер схемы в каталоге.
+        :return: объект SchemaView.
+        """
+        return SchemaView(self, number)
+
+    def schemas(self):
+        """ Получить представления всех схем каталога.
+
+        :return: список объектов SchemaView.
+        """
+        return [SchemaView(self, number) for number in range(len(self))]
+
+    def numbers(self, section: int, start: int, count: int):
+        """ Получить номера записей элементов диапазона раздела по их именам.
+
+        Словарь строится при первом обращении к диапазону и используется повторно.
+
+        :param section: номер раздела.
+        :param start: номер первой записи диапазона.
+        :param count: количество записей диапазона.
+        :return: dict {имя: номер записи}.
+        """
+        numbers = self._numbers.get((section, start))
+        if numbers is None:
+            values = self.values
+            record = self.reader.record
+            # Имя - первый атрибут доменов, таблиц и полей.
+            numbers = self._numbers[section, start] = {
+                values[record(section, number)[0]]: number for number in range(start, start + count)}
+        return numbers
+
+    def load(self):
+        """ Создать полную копию схем каталога в памяти процесса.
+
+        :return: список схем.
+        """
+        return load(self.memory.buf)
+
+    def close(self):
+        """ Отключиться от блока разделяемой памяти. Созданные представления дочерних
+        элементов становятся недоступны.
+
+        :return: None
+        """
+        if getattr(self, 'reader', None) is not None:
+            self.reader.release()
+        self.memory.close()
+        if _ATTACHED.get(self.name) is self:
+            del _ATTACHED[self.name]
+
+    def unlink(self):
+        """ Удалить блок разделяемой памяти (только для владельца). Подключенные процессы
+        сохраняют доступ к нему до отключения. Повторное удаление не выполняется.
+
+        :return: None
+        """
+        if not self.owner:
+            return
+        self.owner = False
+        try:
+            self.memory.unlink()
+        except FileNotFoundError:
+            # Блок уже удален; снимается только его регистрация в resource_tracker.
+            if os.name == 'posix':
+                resource_tracker.unregister(self.memory._name, 'shared_memory')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        self.unlink()
+
+    def __reduce__(self):
+        return attach, (self.name,)
+
+
+class _View:
+    """ Базовый класс представлений элементов схемы в разделяемой памяти.
+
+    Атрибуты элемента определяются для подклассов функцией _define по разделу снимка.
+    """
+    __slots__ = ('_catalog', '_number', '_record')
+
+    # Раздел снимка, содержащий записи элементов.
+    _SECTION = None
+    # Количество атрибутов в записи раздела (определяется функцией _define).
+    _ATTRIBUTES = 0
+
+    def __init__(self, catalog: SharedCatalog, number: int):
+        self._catalog = catalog
+        self._number = number
+        self._record = catalog.reader.record(self._SECTION, number)
+
+    def __reduce__(self):
+        return type(self), (self._catalog, self._number)
+
+    def _children(self, number: int):
+        """ Получить начало и количество вложенных элементов по полям записи.
+
+        :param number: номер вида вложенных элементов в записи раздела.
+        :return: пара (номер первой записи, количество).
+        """
+        position = self._ATTRIBUTES + 2 * number
+        return self._record[position], self._record[position + 1]
+
+
+class SchemaView(_View):
+    """ Представление схемы в разделяемой памяти.
+    """
+    __slots__ = ()
+    _SECTION = SCHEMAS
+
+    @property
+    def domains(self):
+        return _NamedViews(self._catalog, DomainView, *self._children(0))
+
+    @property
+    def tables(self):
+        return _NamedViews(self._catalog, TableView, *self._children(1))
+
+
+class DomainView(_View):
+    """ Представление домена в разделяемой памяти.
+    """
+    __slots__ = ()
+    _SECTION = DOMAINS
+
+
+class TableView(_View):
+    """ Представление таблицы в разделяемой памяти.
+    """
+    __slots__ = ()
+    _SECTION = TABLES
+
+    @property
+    def fields(self):
+        return _NamedViews(self._catalog, FieldView, *self._children(0))
+
+    @property
+    def constraints(self):
+        return _ViewList(self._catalog, ConstraintView, *self._children(1))
+
+    @property
+    def indexes(self):
+        return _ViewList(self._catalog, IndexView, *self._children(2))
+
+
+class FieldView(_View):
+    """ Представление поля в разделяемой памяти.
+    """
+    __slots__ = ()
+    _SECTION = FIELDS
+
+
+class ConstraintView(_View):
+    """ Представление ограничения в разделяемой памяти.
+    """
+    __slots__ = ()
+    _SECTION = CONSTRAINTS
+
+    @property
+    def details(self):
+        return _ViewList(self._catalog, ConstraintDetailView, *self._children(0))
+
+
+class ConstraintDetailView(_View):
+    """ Представление детали ограничения в разделяемой памяти.
+    """
+    __slots__ = ()
+    _SECTION = CONSTRAINT_DETAILS
+
+
+class IndexView(_View):
+    """ Представление индекса в разделяемой памяти.
+    """
+    __slots__ = ()
+    _SECTION = INDEXES
+
+    @property
+    def details(self):
+        return _ViewList(self._catalog, IndexDetailView, *self._children(0))
+
+
+class IndexDetailView(_View):
+    """ Представление детали индекса в разделяемой памяти.
+    """
+    __slots__ = ()
+    _SECTION = INDEX_DETAILS
+
+
+class _NamedViews(Mapping):
+    """ Словарь представлений вложенных элементов по именам, заданный диапазоном записей раздела.
+    """
+    __slots__ = ('_catalog', '_view', '_start', '_count')
+
+    def __init__(self, catalog: SharedCatalog, view, start: int, count: int):
+        self._catalog = catalog
+        self._view = view
+        self._start = start
+        self._count = count
+
+    def _names(self):
+        return self._catalog.numbers(self._view._SECTION, self._start, self._count)
+
+    def __getitem__(self, name):
+        return self._view(self._catalog, self._names()[name])
+
+    def __contains__(self, name):
+        return name in self._names()
+
+    def __iter__(self):
+        return iter(self._names())
+
+    def __len__(self):
+        return self._count
+
+    def values(self):
+        view = self._view
+        return [view(self._catalog, number) for number in range(self._start, self._start + self._count)]
+
+    def items(self):
+        return [(element.name, element) for element in self.values()]
+
+
+class _ViewList(Sequence):
+    """ Список представлений вложенных элементов, заданный диапазоном записей раздела.
+    """
+    __slots__ = ('_catalog', '_view', '_start', '_count')
+
+    def __init__(self, catalog: SharedCatalog, view, start: int, count: int):
+        self._catalog = catalog
+        self._view = view
+        self._start = start
+        self._count = count
+
+    def __getitem__(self, number):
+        if isinstance(number, slice):
+            return [self[position] for position in range(*number.indices(self._count))]
+        if number < 0:
+            number += self._count
+        if not 0 <= number < self._count:
+            raise IndexError('номер элемента вне списка')
+        return self._view(self._catalog, self._start + number)
+
+    def __len__(self):
+        return self._count
+
+
+def _attribute(position: int):
+    """ Создать свойство, возвращающее значение атрибута по полю записи.
+
+    :param position: номер поля записи.
+    :return: property
+    """
+    def get(view):
+        return view._catalog.values[view._record[position]]
+    return property(get)
+
+
+def _define(view, cls=None):
+    """ Определить в классе представления атрибуты элементов его раздела, а также
+    логические свойства класса RAM-представления.
+
+    Логические свойства вычисляются по атрибуту flags и поэтому работают и для
+    представлений; их установка невозможна.
+
+    :param view: класс представления.
+    :param cls: класс RAM-представления, хранящий логические свойства в поле flags.
+    :return: None
+    """
+    attributes = SnapshotReader.attributes(view._SECTION)
+    view._ATTRIBUTES = len(attributes)
+    for position, name in enumerate(attributes):
+        setattr(view, name, _attribute(position))
+    if cls is not None:
+        for name, value in vars(cls).items():
+            if isinstance(value, property):
+                setattr(view, name, property(value.fget, doc=value.__doc__))
+
+
+_define(SchemaView)
+_define(DomainView, Domain)
+_define(TableView, Table)
+_define(FieldView, Field)
+_define(ConstraintView, Constraint)
+_define(ConstraintDetailView)
+_define(IndexView)
+_define(IndexDetailView)
+
+
+class SharedMemoryUnavailableError(Exception):
+    """ Подкласс исключений, порождаемых при отсутствии поддержки разделяемой памяти.
+    """
+    def __str__(self):
+        return 'Разделяемая память не поддерживается (требуется Python 3.8 или новее)'
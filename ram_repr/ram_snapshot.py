@@ -0,0 +1,442 @@
+""" Модуль, содержащий методы сохранения RAM-представления схем в двоичный снимок и загрузки из него.
+
+Снимок - файл версионированного двоичного формата (все числа - little-endian):
+
+* заголовок: сигнатура SNAPSHOT_MAGIC, версия формата (uint16), резерв (uint16) и таблица
+  разделов - для каждого раздела смещение (uint64) и количество записей (uint32);
+* таблица значений: вид каждого значения (байт), смещения значений в символах (uint32),
+  размер данных в байтах (uint32) и данные - текст всех значений (UTF-8). Все различные
+  значения атрибутов хранятся в ней однократно; значение 0 - None;
+* разделы записей фиксированной длины (массивы uint32) для схем, доменов, таблиц, полей,
+  ограничений, деталей ограничений, индексов и деталей индексов. Поле записи - номер
+  значения атрибута в таблице значений, либо для вложенных элементов - номер первой
+  записи и количество записей в соответствующем разделе.
+
+При загрузке файл отображается в память, таблица значений декодируется один раз, а объекты
+создаются по записям без разбора значений атрибутов. Одинаковые значения атрибутов
+загруженных объектов - один и тот же объект строки. Класс SnapshotReader читает записи
+снимка без создания объектов схемы (см. ram_shared).
+"""
+
+import gc
+import os
+import struct
+from collections import deque
+from itertools import repeat
+from mmap import ACCESS_READ
+from mmap import mmap
+
+from ram_repr.ram_structure import Constraint
+from ram_repr.ram_structure import ConstraintDetail
+from ram_repr.ram_structure import Domain
+from ram_repr.ram_structure import Field
+from ram_repr.ram_structure import Index
+from ram_repr.ram_structure import IndexDetail
+from ram_repr.ram_structure import Schema
+from ram_repr.ram_structure import Table
+
+# Сигнатура файла снимка.
+SNAPSHOT_MAGIC = b'RMPS'
+# Версия формата снимка. Увеличивается при изменении состава атрибутов или раскладки записей.
+SNAPSHOT_VERSION = 1
+# Расширение файлов снимков.
+SNAPSHOT_EXTENSION = '.snapshot'
+
+# Атрибуты элементов в порядке следования в записях.
+_SCHEMA_ATTRIBUTES = ('fulltext_engine', 'version', 'name', 'description')
+_DOMAIN_ATTRIBUTES = ('name', 'description', 'type', 'align', 'width', 'length', 'precision', 'char_length', 'scale',
+                      'flags')
+_TABLE_ATTRIBUTES = ('name', 'description', 'temporal_mode', 'means', 'ht_table_flags', 'access_level', 'flags')
+_FIELD_ATTRIBUTES = ('name', 'rname', 'domain', 'type', 'description', 'flags')
+_CONSTRAINT_ATTRIBUTES = ('name', 'kind', 'reference', 'constraint', 'expression', 'flags')
+_CONSTRAINT_DETAIL_ATTRIBUTES = ('value',)
+_INDEX_ATTRIBUTES = ('name', 'kind', 'uniqueness', 'fulltext', 'local')
+_INDEX_DETAIL_ATTRIBUTES = ('value', 'expression', 'descend')
+
+# Разделы снимка: (атрибуты, количество пар (начало, количество) вложенных элементов).
+_SECTIONS = (
+    (_SCHEMA_ATTRIBUTES, 2),
+    (_DOMAIN_ATTRIBUTES, 0),
+    (_TABLE_ATTRIBUTES, 3),
+    (_FIELD_ATTRIBUTES, 0),
+    (_CONSTRAINT_ATTRIBUTES, 1),
+    (_CONSTRAINT_DETAIL_ATTRIBUTES, 0),
+    (_INDEX_ATTRIBUTES, 1),
+    (_INDEX_DETAIL_ATTRIBUTES, 0),
+)
+SCHEMAS, DOMAINS, TABLES, FIELDS, CONSTRAINTS, CONSTRAINT_DETAILS, INDEXES, INDEX_DETAILS = range(8)
+_RECORDS = tuple(struct.Struct('<%dI' % (len(attributes) + 2 * ranges)) for attributes, ranges in _SECTIONS)
+_HEADER = struct.Struct('<4sHH' + 'QI' * (len(_SECTIONS) + 1))
+
+# Виды значений таблицы значений.
+_NONE, _STR, _INT, _TRUE, _FALSE = range(5)
+
+
+def dump(schemas: list, target):
+    """ Сохранить схемы в двоичный снимок.
+
+    :param schemas: список схем.
+    :param target: путь к файлу, либо двоичный файловый объект.
+    :return: None
+    """
+    data = encode(schemas)
+    if not isinstance(target, str):
+        target.write(data)
+        return
+    temp_path = target + '.tmp'
+    try:
+        with open(temp_path, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def load(source):
+    """ Загрузить схемы из двоичного снимка.
+
+    Файл, заданный путем, отображается в память.
+
+    :param source: путь к файлу, двоичный файловый объект, либо содержимое снимка (bytes,
+                   memoryview).
+    :return: список схем.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            if not os.fstat(file.fileno()).st_size:
+                raise SnapshotFormatError('пустой файл')
+            with mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+                return _decode(data)
+    if hasattr(source, 'read'):
+        source = source.read()
+    return _decode(source)
+
+
+def encode(schemas: list):
+    """ Сформировать содержимое снимка.
+
+    :param schemas: список схем.
+    :return: bytes
+    """
+    values = _ValueTable()
+    sections = [[] for _ in _SECTIONS]
+
+    def append(section, obj, *ranges):
+        """ Добавить в раздел запись элемента. """
+        record = [values.index(getattr(obj, name)) for name in _SECTIONS[section][0]]
+        record.extend(ranges)
+        sections[section].append(record)
+
+    for schema in schemas:
+        domains = list(schema.domains.values())
+        tables = list(schema.tables.values())
+        append(SCHEMAS, schema, len(sections[DOMAINS]), len(domains), len(sections[TABLES]), len(tables))
+        for domain in domains:
+            append(DOMAINS, domain)
+        for table in tables:
+            append(TABLES, table, len(sections[FIELDS]), len(table.fields),
+                   len(sections[CONSTRAINTS]), len(table.constraints), len(sections[INDEXES]), len(table.indexes))
+            for field in table.fields.values():
+                append(FIELDS, field)
+            for constraint in table.constraints:
+                append(CONSTRAINTS, constraint, len(sections[CONSTRAINT_DETAILS]), len(constraint.details))
+                for detail in constraint.details:
+                    append(CONSTRAINT_DETAILS, detail)
+            for index in table.indexes:
+                append(INDEXES, index, len(sections[INDEX_DETAILS]), len(index.details))
+                for detail in index.details:
+                    append(INDEX_DETAILS, detail)
+
+    parts = [values.encode()]
+    parts.extend(struct.pack('<%dI' % (len(records) * _RECORDS[number].size // 4),
+                             *[item for record in records for item in record])
+                 for number, records in enumerate(sections))
+    header = [SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0]
+    offset = _HEADER.size
+    for part, count in zip(parts, [len(values.values)] + [len(records) for records in sections]):
+        header.extend((offset, count))
+        offset += len(part)
+    return _HEADER.pack(*header) + b''.join(parts)
+
+
+def _decode(data):
+    """ Создать схемы по содержимому снимка.
+
+    :param data: содержимое снимка (bytes, mmap или memoryview).
+    :return: список схем.
+    """
+    # Создаваемые объекты не образуют циклов ссылок; сборка мусора на время создания
+    # сотен тысяч объектов отключается, чтобы не просматривать их многократно.
+    collecting = gc.isenabled()
+    gc.disable()
+    reader = None
+    try:
+        reader = SnapshotReader(data)
+        values = reader.values
+        sections = [reader.records(number) for number in range(len(_SECTIONS))]
+
+        domains = _build(Domain, _DOMAIN_ATTRIBUTES, sections[DOMAINS], values)
+        fields = _build(Field, _FIELD_ATTRIBUTES, sections[FIELDS], values)
+        constraint_details = _build(ConstraintDetail, _CONSTRAINT_DETAIL_ATTRIBUTES, sections[CONSTRAINT_DETAILS],
+                                    values, False)
+        index_details = _build(IndexDetail, _INDEX_DETAIL_ATTRIBUTES, sections[INDEX_DETAILS], values, False)
+        constraints = _build(Constraint, _CONSTRAINT_ATTRIBUTES, sections[CONSTRAINTS], values,
+                             children=(('details', constraint_details, list),))
+        indexes = _build(Index, _INDEX_ATTRIBUTES, sections[INDEXES], values,
+                         children=(('details', index_details, list),))
+        tables = _build(Table, _TABLE_ATTRIBUTES, sections[TABLES], values,
+                        children=(('fields', fields, _by_name), ('constraints', constraints, list),
+                                  ('indexes', indexes, list)))
+        schemas = _build(Schema, _SCHEMA_ATTRIBUTES, sections[SCHEMAS], values,
+                         children=(('domains', domains, _by_name), ('tables', tables, _by_name)))
+        for schema in schemas:
+            schema._references = None
+            schema._graph = None
+    finally:
+        if reader is not None:
+            reader.release()
+        if collecting:
+            gc.enable()
+    return schemas
+
+
+def _build(cls, names: tuple, records, values: list, fingerprint: bool=True, children=()):
+    """ Создать объекты по записям раздела.
+
+    :param cls: класс RAM-представления.
+    :param names: атрибуты элемента в порядке следования в записи.
+    :param records: итератор записей раздела.
+    :param values: декодированная таблица значений.
+    :param fingerprint: класс хранит отпечаток (поле _fingerprint).
+    :param children: описания вложенных элементов - кортежи (атрибут, список созданных
+                     вложенных объектов, функция построения контейнера из среза списка).
+    :return: список объектов.
+    """
+    new = object.__new__
+    count = len(names)
+    value = values.__getitem__
+    result = []
+    try:
+        for record in records:
+            obj = new(cls)
+            # Присваивание выполняется встроенными итераторами, без цикла интерпретатора.
+            deque(map(setattr, repeat(obj), names, map(value, record)), 0)
+            position = count
+            for name, elements, container in children:
+                start = record[position]
+                setattr(obj, name, container(elements[start:start + record[position + 1]]))
+                position += 2
+            if fingerprint:
+                obj._fingerprint = None
+            result.append(obj)
+    except IndexError:
+        raise SnapshotFormatError('ссылка на отсутствующее значение')
+    return result
+
+
+def _by_name(elements: list):
+    """ Построить словарь элементов по именам.
+
+    :param elements: список элементов.
+    :return: dict
+    """
+    return {element.name: element for element in elements}
+
+
+def _decode_values(view: memoryview, offset: int, count: int):
+    """ Декодировать таблицу значений.
+
+    :param view: содержимое снимка.
+    :param offset: смещение таблицы значений.
+    :param count: количество значений.
+    :return: список значений.
+    """
+    offsets_start = offset + count
+    data_start = offsets_start + 4 * (count + 2)
+    if data_start > len(view):
+        raise SnapshotFormatError('неполная таблица значений')
+    kinds = view[offset:offsets_start]
+    offsets = struct.unpack_from('<%dI' % (count + 2), view, offsets_start)
+    size = offsets[-1]
+    if data_start + size > len(view):
+        raise SnapshotFormatError('неполная таблица значений')
+    text = str(view[data_start:data_start + size], 'utf-8')
+    values = []
+    for number in range(count):
+        kind = kinds[number]
+        if kind == _STR:
+            values.append(text[offsets[number]:offsets[number + 1]])
+        elif kind == _INT:
+            values.append(int(text[offsets[number]:offsets[number + 1]]))
+        elif kind == _NONE:
+            values.append(None)
+        else:
+            values.append(kind == _TRUE)
+    return values
+
+
+class SnapshotReader:
+    """ Класс, предоставляющий доступ к записям снимка без создания объектов схемы.
+
+    Заголовок проверяется, а таблица значений декодируется при создании объекта; записи
+    разделов читаются из содержимого снимка по запросу.
+    """
+    def __init__(self, data):
+        """ Конструктор.
+
+        :param data: содержимое снимка (bytes, mmap или memoryview).
+        """
+        if len(data) < _HEADER.size:
+            raise SnapshotFormatError('неполный заголовок')
+        header = _HEADER.unpack_from(data)
+        if header[0] != SNAPSHOT_MAGIC:
+            raise SnapshotFormatError('неверная сигнатура')
+        if header[1] != SNAPSHOT_VERSION:
+            raise SnapshotVersionError(header[1])
+        self.view = memoryview(data)
+        try:
+            # Декодированная таблица значений; номер значения - поле записи.
+            self.values = _decode_values(self.view, header[3], header[4])
+            # Пары (смещение, количество записей) разделов.
+            self.sections = []
+            for number, record in enumerate(_RECORDS):
+                offset, count = header[5 + 2 * number], header[6 + 2 * number]
+                if offset + count * record.size > len(data):
+                    raise SnapshotFormatError('неполный раздел записей')
+                self.sections.append((offset, count))
+        except BaseException:
+            self.view.release()
+            raise
+
+    @staticmethod
+    def attributes(section: int):
+        """ Получить атрибуты элементов раздела в порядке следования в записях.
+
+        За атрибутами в записи следуют пары (номер первой записи, количество записей)
+        вложенных элементов.
+
+        :param section: номер раздела (SCHEMAS, DOMAINS, ...).
+        :return: кортеж имен атрибутов.
+        """
+        return _SECTIONS[section][0]
+
+    def count(self, section: int):
+        """ Получить количество записей раздела.
+
+        :param section: номер раздела.
+        :return: int
+        """
+        return self.sections[section][1]
+
+    def record(self, section: int, number: int):
+        """ Прочитать запись раздела.
+
+        :param section: номер раздела.
+        :param number: номер записи в разделе.
+        :return: кортеж полей записи.
+        """
+        offset, count = self.sections[section]
+        if not 0 <= number < count:
+            raise IndexError('номер записи вне раздела')
+        record = _RECORDS[section]
+        return record.unpack_from(self.view, offset + number * record.size)
+
+    def records(self, section: int):
+        """ Получить итератор всех записей раздела.
+
+        :param section: номер раздела.
+        :return: итератор кортежей полей записей.
+        """
+        offset, count = self.sections[section]
+        record = _RECORDS[section]
+        return record.iter_unpack(self.view[offset:offset + count * record.size])
+
+    def release(self):
+        """ Освободить содержимое снимка. Прочитанные записи и значения остаются доступны.
+
+        :return: None
+        """
+        self.view.release()
+
+
+class _ValueTable:
+    """ Таблица значений атрибутов формируемого снимка.
+    """
+    def __init__(self):
+        self.values = [None]
+        # Ключ значения включает его тип, чтобы 1, True и '1' не совпадали.
+        self.indexes = {(type(None), None): 0}
+
+    def index(self, value):
+        """ Получить номер значения, при необходимости добавив его в таблицу.
+
+        :param value: значение атрибута (None, str, int или bool).
+        :return: int
+        """
+        key = (type(value), value)
+        number = self.indexes.get(key)
+        if number is None:
+            if not isinstance(value, (str, int)):
+                raise TypeError('Значение типа %s не может быть сохранено в снимок' % type(value).__name__)
+            number = self.indexes[key] = len(self.values)
+            self.values.append(value)
+        return number
+
+    def encode(self):
+        """ Сформировать двоичное представление таблицы.
+
+        Смещения отсчитываются в символах текста значений: при загрузке текст декодируется
+        целиком, после чего значения вырезаются из него по смещениям.
+
+        :return: bytes
+        """
+        kinds = bytearray()
+        offsets = [0]
+        texts = []
+        position = 0
+        for value in self.values:
+            if value is None:
+                kinds.append(_NONE)
+                text = ''
+            elif value is True or value is False:
+                kinds.append(_TRUE if value else _FALSE)
+                text = ''
+            elif isinstance(value, str):
+                kinds.append(_STR)
+                text = value
+            else:
+                kinds.append(_INT)
+                text = str(value)
+            texts.append(text)
+            position += len(text)
+            offsets.append(position)
+        data = ''.join(texts).encode('utf-8')
+        return bytes(kinds) + struct.pack('<%dI' % (len(offsets) + 1), *offsets, len(data)) + data
+
+
+class SnapshotError(Exception):
+    """ Подкласс исключений, порождаемых при загрузке снимка.
+    """
+    pass
+
+
+class SnapshotFormatError(SnapshotError):
+    """ Подкласс исключений, порождаемых в случае повреждения файла снимка.
+    """
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __str__(self):
+        return 'Файл не является снимком схем, либо поврежден: ' + self.reason
+
+
+class SnapshotVersionError(SnapshotError):
+    """ Подкласс исключений, порождаемых в случае несовместимой версии формата снимка.
+    """
+    def __init__(self, version):
+        self.version = version
+
+    def __str__(self):
+        return 'Неподдерживаемая версия формата снимка: %d (ожидается %d)' % (self.version, SNAPSHOT_VERSION)
@@ -1,10 +1,53 @@
 """ Модуль, содержащий реализации классов представления базы в RAM.
+
+Классы объявляют __slots__: объекты не содержат словаря атрибутов, что существенно
+сокращает расход памяти на больших схемах. Поэтому присвоить объекту атрибут, не
+перечисленный в __slots__, нельзя.
+
+Логические свойства доменов, таблиц, полей и ограничений хранятся битами единственного
+целочисленного поля flags; для совместимости они доступны как обычные атрибуты.
+
+Схема, домены, таблицы, поля, ограничения и индексы хранят вычисленные отпечатки
+(см. ram_fingerprint) в поле _fingerprint. Методы изменения схемы (add_*, remove_*)
+сбрасывают отпечатки затронутых элементов; после непосредственного изменения атрибутов
+необходимо вызвать Schema.touch.
 """
 
+from itertools import chain
+
+from ram_repr.ram_graph import ForeignKeyGraph
+
+
+def flag(mask: int, doc: str=None):
+    """ Создать свойство, отображающее бит поля flags на логическое значение.
+
+    :param mask: битовая маска свойства.
+    :param doc: описание свойства.
+    :return: property
+    """
+    def get(self):
+        return bool(self.flags & mask)
+
+    def set(self, value):
+        if value:
+            self.flags |= mask
+        else:
+            self.flags &= ~mask
+    return property(get, set, doc=doc)
+
 
 class Schema:
     """ Класс, моделирующий схему базы.
     """
+    __slots__ = ('fulltext_engine', 'version', 'name', 'description', 'domains', 'tables', '_references',
+                 '_graph', '_fingerprint')
+
+    # Поддерживаемые типы данных доменов; общие для всех схем.
+    data_types = frozenset(('STRING', 'SMALLINT', 'INTEGER', 'WORD', 'BOOLEAN', 'FLOAT', 'CURRENCY', 'BCD', 'FMTBCD',
+                            'DATE', 'TIME', 'DATETIME', 'TIMESTAMP', 'BYTES', 'VARBYTES', 'BLOB', 'MEMO', 'GRAPHIC',
+                            'FMTMEMO', 'FIXEDCHAR', 'WIDESTRING', 'LARGEINT', 'COMP', 'ARRAY', 'FIXEDWIDECHAR',
+                            'WIDEMEMO', 'CODE', 'RECORDID', 'SET', 'PERIOD', 'BYTE'))
+
     def __init__(self):
         self.fulltext_engine = None
         self.version = None
@@ -13,16 +56,217 @@ class Schema:
 
         self.domains = {}
         self.tables = {}
-        self.data_types = ('STRING', 'SMALLINT', 'INTEGER', 'WORD', 'BOOLEAN', 'FLOAT', 'CURRENCY', 'BCD', 'FMTBCD',
-                           'DATE', 'TIME', 'DATETIME', 'TIMESTAMP', 'BYTES', 'VARBYTES', 'BLOB', 'MEMO', 'GRAPHIC',
-                           'FMTMEMO', 'FIXEDCHAR', 'WIDESTRING', 'LARGEINT', 'COMP', 'ARRAY', 'FIXEDWIDECHAR',
-                           'WIDEMEMO', 'CODE', 'RECORDID', 'SET', 'PERIOD', 'BYTE'
-                           )
+
+        self._references = None
+        self._graph = None
+        self._fingerprint = None
+
+    def __getstate__(self):
+        # Индекс ссылок, граф внешних ключей и отпечаток не сохраняются: они вычисляются заново при первом обращении.
+        return {name: getattr(self, name) for name in Schema.__slots__ if not name.startswith('_')}
+
+    def __setstate__(self, state):
+        self._references = None
+        self._graph = None
+        self._fingerprint = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @property
+    def references(self):
+        """ Индекс ссылок между элементами схемы (SchemaReferences).
+
+        Строится за один проход при первом обращении и поддерживается методами изменения
+        схемы (add_*, remove_*). Если элементы схемы изменяются непосредственно, необходимо
+        вызвать touch.
+        """
+        if self._references is None:
+            self._references = SchemaReferences(self)
+        return self._references
+
+    @property
+    def graph(self):
+        """ Граф ссылок между таблицами схемы по внешним ключам (ForeignKeyGraph).
+
+        Строится при первом обращении и сбрасывается методами изменения таблиц и ограничений
+        схемы и методом touch.
+        """
+        if self._graph is None:
+            self._graph = ForeignKeyGraph(self)
+        return self._graph
+
+    def touch(self, *elements):
+        """ Сообщить схеме о непосредственном изменении ее элементов.
+
+        Сбрасываются индекс ссылок, граф внешних ключей, отпечаток схемы и отпечатки переданных доменов и таблиц
+        (для таблицы - вместе с отпечатками всех ее элементов). Если элементы не переданы,
+        сбрасываются отпечатки всех элементов схемы.
+
+        :param elements: измененные домены и таблицы схемы.
+        :return: None
+        """
+        self._references = None
+        self._graph = None
+        self._fingerprint = None
+        for element in elements or chain(self.domains.values(), self.tables.values()):
+            element._fingerprint = None
+            if isinstance(element, Table):
+                for child in chain(element.fields.values(), element.constraints, element.indexes):
+                    child._fingerprint = None
+
+    def _changed(self, table=None):
+        """ Сбросить отпечатки схемы и измененной таблицы.
+
+        :param table: измененная таблица.
+        :return: None
+        """
+        self._fingerprint = None
+        if table is not None:
+            table._fingerprint = None
+
+    def add_domain(self, domain):
+        """ Добавить домен в схему (домен с тем же именем замещается).
+
+        :param domain: объект домена.
+        :return: None
+        """
+        self.domains[domain.name] = domain
+        self._changed()
+
+    def remove_domain(self, name: str):
+        """ Удалить домен из схемы.
+
+        :param name: имя домена.
+        :return: удаленный объект домена.
+        """
+        domain = self.domains.pop(name)
+        self._changed()
+        return domain
+
+    def add_table(self, table):
+        """ Добавить таблицу в схему (таблица с тем же именем замещается).
+
+        :param table: объект таблицы.
+        :return: None
+        """
+        if table.name in self.tables:
+            self.remove_table(table.name)
+        self.tables[table.name] = table
+        self._changed()
+        self._graph = None
+        if self._references is not None:
+            self._references.add_table(table)
+
+    def remove_table(self, name: str):
+        """ Удалить таблицу из схемы.
+
+        :param name: имя таблицы.
+        :return: удаленный объект таблицы.
+        """
+        table = self.tables.pop(name)
+        self._changed()
+        self._graph = None
+        if self._references is not None:
+            self._references.remove_table(table)
+        return table
+
+    def add_field(self, table, field):
+        """ Добавить поле в таблицу схемы (поле с тем же именем замещается).
+
+        :param table: объект таблицы схемы.
+        :param field: объект поля.
+        :return: None
+        """
+        if field.name in table.fields:
+            self.remove_field(table, field.name)
+        table.fields[field.name] = field
+        self._changed(table)
+        if self._references is not None:
+            self._references.add_field(table, field)
+
+    def remove_field(self, table, name: str):
+        """ Удалить поле из таблицы схемы.
+
+        :param table: объект таблицы схемы.
+        :param name: имя поля.
+        :return: удаленный объект поля.
+        """
+        field = table.fields.pop(name)
+        self._changed(table)
+        if self._references is not None:
+            self._references.remove_field(table, field)
+        return field
+
+    def add_constraint(self, table, constraint):
+        """ Добавить ограничение в таблицу схемы.
+
+        :param table: объект таблицы схемы.
+        :param constraint: объект ограничения.
+        :return: None
+        """
+        table.constraints.append(constraint)
+        self._changed(table)
+        self._graph = None
+        if self._references is not None:
+            self._references.add_constraint(table, constraint)
+
+    def remove_constraint(self, table, constraint):
+        """ Удалить ограничение из таблицы схемы.
+
+        :param table: объект таблицы схемы.
+        :param constraint: объект ограничения.
+        :return: None
+        """
+        table.constraints.remove(constraint)
+        self._changed(table)
+        self._graph = None
+        if self._references is not None:
+            self._references.remove_constraint(table, constraint)
+
+    def add_index(self, table, index):
+        """ Добавить индекс в таблицу схемы.
+
+        :param table: объект таблицы схемы.
+        :param index: объект индекса.
+        :return: None
+        """
+        table.indexes.append(index)
+        self._changed(table)
+        if self._references is not None:
+            self._references.add_index(table, index)
+
+    def remove_index(self, table, index):
+        """ Удалить индекс из таблицы схемы.
+
+        :param table: объект таблицы схемы.
+        :param index: объект индекса.
+        :return: None
+        """
+        table.indexes.remove(index)
+        self._changed(table)
+        if self._references is not None:
+            self._references.remove_index(table, index)
 
 
 class Domain:
     """ Класс, реализующий представление домена в RAM.
     """
+    __slots__ = ('name', 'description', 'type', 'align', 'width', 'length', 'precision', 'char_length', 'scale',
+                 'flags', '_fingerprint')
+
+    # Битовые маски свойств.
+    CASE_SENSITIVE = 1
+    SHOW_NULL = 2
+    SHOW_LEAD_NULLS = 4
+    THOUSANDS_SEPARATOR = 8
+    SUMMABLE = 16
+
+    case_sensitive = flag(CASE_SENSITIVE)
+    show_null = flag(SHOW_NULL)
+    show_lead_nulls = flag(SHOW_LEAD_NULLS)
+    thousands_separator = flag(THOUSANDS_SEPARATOR)
+    summable = flag(SUMMABLE)
+
     def __init__(self):
         self.name = None
         self.description = None
@@ -34,34 +278,66 @@ class Domain:
         self.char_length = None
         self.scale = None
 
-        self.case_sensitive = False
-        self.show_null = False
-        self.show_lead_nulls = False
-        self.thousands_separator = False
-        self.summable = False
+        self.flags = 0
+
+        self._fingerprint = None
 
 
 class Table:
     """ Класс, моделирующий таблицу базы в RAM.
     """
+    __slots__ = ('name', 'description', 'temporal_mode', 'means', 'ht_table_flags', 'access_level',
+                 'flags', 'fields', 'indexes', 'constraints', '_fingerprint')
+
+    # Битовые маски свойств.
+    ADD = 1
+    EDIT = 2
+    DELETE = 4
+
+    add = flag(ADD)
+    edit = flag(EDIT)
+    delete = flag(DELETE)
+
     def __init__(self):
         self.name = None
         self.description = None
         self.temporal_mode = None
         self.means = None
+        # Заполняются при загрузке из DBD-представления.
+        self.ht_table_flags = None
+        self.access_level = None
 
-        self.add = False
-        self.edit = False
-        self.delete = False
+        self.flags = 0
 
         self.fields = {}
         self.indexes = []
         self.constraints = []
 
+        self._fingerprint = None
+
 
 class Field:
     """ Класс, моделирующий поле базы в RAM.
     """
+    __slots__ = ('name', 'rname', 'domain', 'type', 'description', 'flags', '_fingerprint')
+
+    # Битовые маски свойств.
+    INPUT = 1
+    EDIT = 2
+    SHOW_IN_GRID = 4
+    SHOW_IN_DETAILS = 8
+    IS_MEAN = 16
+    AUTOCALCULATED = 32
+    REQUIRED = 64
+
+    input = flag(INPUT)
+    edit = flag(EDIT)
+    show_in_grid = flag(SHOW_IN_GRID)
+    show_in_details = flag(SHOW_IN_DETAILS)
+    is_mean = flag(IS_MEAN)
+    autocalculated = flag(AUTOCALCULATED)
+    required = flag(REQUIRED)
+
     def __init__(self):
         self.name = None
         self.rname = None
@@ -69,34 +345,58 @@ class Field:
         self.type = None
         self.description = None
 
-        self.input = False
-        self.edit = False
-        self.show_in_grid = False
-        self.show_in_details = False
-        self.is_mean = False
-        self.autocalculated = False
-        self.required = False
+        self.flags = 0
+
+        self._fingerprint = None
 
 
 class Constraint:
     """ Класс, моделирующий ограничение базы в RAM.
     """
+    __slots__ = ('name', 'kind', 'reference', 'constraint', 'expression', 'flags', 'details', '_fingerprint')
+
+    # Битовые маски свойств. Каскадное удаление имеет три состояния (не задано, обычное,
+    # полное), поэтому занимает два бита.
+    HAS_VALUE_EDIT = 1
+    CASCADING_DELETE = 2
+    FULL_CASCADING_DELETE = 4
+
+    has_value_edit = flag(HAS_VALUE_EDIT)
+
     def __init__(self):
         self.name = None
         self.kind = None
         self.reference = None
         self.constraint = None
         self.expression = None
-        self.cascading_delete = None
 
-        self.has_value_edit = False
+        self.flags = 0
 
         self.details = []
 
+        self._fingerprint = None
+
+    @property
+    def cascading_delete(self):
+        """ Признак каскадного удаления: None - не задан, False - обычное, True - полное. """
+        if not self.flags & Constraint.CASCADING_DELETE:
+            return None
+        return bool(self.flags & Constraint.FULL_CASCADING_DELETE)
+
+    @cascading_delete.setter
+    def cascading_delete(self, value):
+        self.flags &= ~(Constraint.CASCADING_DELETE | Constraint.FULL_CASCADING_DELETE)
+        if value is not None:
+            self.flags |= Constraint.CASCADING_DELETE
+            if value:
+                self.flags |= Constraint.FULL_CASCADING_DELETE
+
 
 class ConstraintDetail:
     """ Класс, моделирующий деталь ограничения базы в RAM.
     """
+    __slots__ = ('value',)
+
     def __init__(self):
         self.value = None
 
@@ -104,19 +404,205 @@ class ConstraintDetail:
 class Index:
     """ Класс, моделирующий представление индекса базы в RAM.
     """
+    __slots__ = ('name', 'kind', 'uniqueness', 'fulltext', 'local', 'details', '_fingerprint')
+
     def __init__(self):
         self.name = None
         self.kind = None
+        # Заполняются при загрузке из DBD-представления.
+        self.uniqueness = None
+        self.fulltext = None
 
         self.local = False
 
         self.details = []
 
+        self._fingerprint = None
+
 
 class IndexDetail:
     """ Класс, моделирующий деталь индекса в базе.
     """
+    __slots__ = ('value', 'expression', 'descend')
+
     def __init__(self):
         self.value = None
         self.expression = None
         self.descend = None
+
+
+class SchemaReferences:
+    """ Класс, реализующий индекс ссылок между элементами схемы.
+
+    Элементы схемы ссылаются друг на друга по именам; индекс хранит обратные ссылки,
+    поэтому поля домена, внешние ключи, ссылающиеся на таблицу, и индексы поля находятся
+    без просмотра всех таблиц схемы. Значения индекса - словари {элемент: таблица элемента},
+    сохраняющие порядок добавления.
+    """
+    __slots__ = ('schema', 'fields_by_domain', 'incoming_foreign_keys', 'indexes_by_field', 'primary_keys')
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        # {имя домена: {поле: таблица}}
+        self.fields_by_domain = {}
+        # {имя таблицы: {ограничение, ссылающееся на таблицу: таблица ограничения}}
+        self.incoming_foreign_keys = {}
+        # {(имя таблицы, имя поля): {индекс: таблица}}
+        self.indexes_by_field = {}
+        # {имя таблицы: {первичный ключ: таблица}}
+        self.primary_keys = {}
+        for table in schema.tables.values():
+            self.add_table(table)
+
+    def domain_of(self, field: Field):
+        """ Получить домен поля.
+
+        :param field: объект поля.
+        :return: объект домена или None.
+        """
+        return self.schema.domains.get(field.domain)
+
+    def referenced_table(self, constraint: Constraint):
+        """ Получить таблицу, на которую ссылается ограничение.
+
+        :param constraint: объект ограничения.
+        :return: объект таблицы или None.
+        """
+        return self.schema.tables.get(constraint.reference)
+
+    def fields_of_domain(self, name: str):
+        """ Получить поля, определенные на домене.
+
+        :param name: имя домена.
+        :return: список пар (таблица, поле).
+        """
+        return [(table, field) for field, table in self.fields_by_domain.get(name, {}).items()]
+
+    def referencing(self, name: str):
+        """ Получить ограничения других таблиц, ссылающиеся на таблицу.
+
+        :param name: имя таблицы.
+        :return: список пар (таблица, ограничение).
+        """
+        return [(table, constraint) for constraint, table in self.incoming_foreign_keys.get(name, {}).items()]
+
+    def indexes_of_field(self, table_name: str, field_name: str):
+        """ Получить индексы, в которые входит поле.
+
+        :param table_name: имя таблицы.
+        :param field_name: имя поля.
+        :return: список индексов.
+        """
+        return list(self.indexes_by_field.get((table_name, field_name), ()))
+
+    def primary_keys_of(self, name: str):
+        """ Получить первичные ключи таблицы.
+
+        :param name: имя таблицы.
+        :return: список ограничений.
+        """
+        return list(self.primary_keys.get(name, ()))
+
+    def add_table(self, table: Table):
+        """ Добавить в индекс ссылки таблицы и ее элементов.
+
+        :param table: объект таблицы.
+        :return: None
+        """
+        for field in table.fields.values():
+            self.add_field(table, field)
+        for constraint in table.constraints:
+            self.add_constraint(table, constraint)
+        for index in table.indexes:
+            self.add_index(table, index)
+
+    def remove_table(self, table: Table):
+        """ Удалить из индекса ссылки таблицы и ее элементов.
+
+        :param table: объект таблицы.
+        :return: None
+        """
+        for field in table.fields.values():
+            self.remove_field(table, field)
+        for constraint in table.constraints:
+            self.remove_constraint(table, constraint)
+        for index in table.indexes:
+            self.remove_index(table, index)
+
+    def add_field(self, table: Table, field: Field):
+        """ Добавить в индекс ссылку поля на домен.
+
+        :param table: объект таблицы.
+        :param field: объект поля.
+        :return: None
+        """
+        if field.domain is not None:
+            self.fields_by_domain.setdefault(field.domain, {})[field] = table
+
+    def remove_field(self, table: Table, field: Field):
+        """ Удалить из индекса ссылку поля на домен.
+
+        :param table: объект таблицы.
+        :param field: объект поля.
+        :return: None
+        """
+        _discard(self.fields_by_domain, field.domain, field)
+
+    def add_constraint(self, table: Table, constraint: Constraint):
+        """ Добавить в индекс ограничение таблицы.
+
+        :param table: объект таблицы.
+        :param constraint: объект ограничения.
+        :return: None
+        """
+        if constraint.kind == 'PRIMARY':
+            self.primary_keys.setdefault(table.name, {})[constraint] = table
+        if constraint.reference is not None:
+            self.incoming_foreign_keys.setdefault(constraint.reference, {})[constraint] = table
+
+    def remove_constraint(self, table: Table, constraint: Constraint):
+        """ Удалить из индекса ограничение таблицы.
+
+        :param table: объект таблицы.
+        :param constraint: объект ограничения.
+        :return: None
+        """
+        _discard(self.primary_keys, table.name, constraint)
+        _discard(self.incoming_foreign_keys, constraint.reference, constraint)
+
+    def add_index(self, table: Table, index: Index):
+        """ Добавить в индекс ссылки индекса таблицы на поля.
+
+        :param table: объект таблицы.
+        :param index: объект индекса.
+        :return: None
+        """
+        for detail in index.details:
+            if detail.value is not None:
+                self.indexes_by_field.setdefault((table.name, detail.value), {})[index] = table
+
+    def remove_index(self, table: Table, index: Index):
+        """ Удалить из индекса ссылки индекса таблицы на поля.
+
+        :param table: объект таблицы.
+        :param index: объект индекса.
+        :return: None
+        """
+        for detail in index.details:
+            _discard(self.indexes_by_field, (table.name, detail.value), index)
+
+
+def _discard(mapping: dict, key, element):
+    """ Удалить элемент из словаря обратных ссылок, удалив опустевший ключ.
+
+    :param mapping: словарь {ключ: {элемент: таблица}}.
+    :param key: ключ.
+    :param element: удаляемый элемент.
+    :return: None
+    """
+    bucket = mapping.get(key)
+    if bucket is not None:
+        bucket.pop(element, None)
+        if not bucket:
+            del mapping[key]
+
@@ -8,6 +8,11 @@ from dbd_repr.dbd_structure import BEGIN_TRANSACTION
 from dbd_repr.dbd_structure import COMMIT
 from dbd_repr.dbd_structure import SQL_DBD_Init
 from dbd_repr.dbd_temp_structure import SQL_TMP_INIT
+from ram_repr.ram_attributes import CONSTRAINT
+from ram_repr.ram_attributes import DOMAIN
+from ram_repr.ram_attributes import FIELD
+from ram_repr.ram_attributes import TABLE
+from ram_repr.ram_attributes import compile_dbd_flags
 from ram_repr.ram_structure import Constraint
 from ram_repr.ram_structure import ConstraintDetail
 from ram_repr.ram_structure import Domain
@@ -86,25 +91,16 @@ class DbdUploadConnection:
         :param domain: объект домена
         :return: None
         """
-        query = self.config.get('UPLOADING', 'domain')
-        self.cursor.execute(query, {
-                                    'name': domain.name,
-                                    'description': domain.description,
-                                    'data_type_name': domain.type,
-                                    'length': domain.length,
-                                    'char_length': domain.char_length,
-                                    'precision': domain.precision,
-                                    'scale': domain.scale,
-                                    'width': domain.width,
-                                    'align': domain.align,
-                                    'show_null': domain.show_null,
-                                    'show_lead_nulls': domain.show_lead_nulls,
-                                    'thousands_separator': domain.thousands_separator,
-                                    'summable': domain.summable,
-                                    'case_sensitive': domain.case_sensitive,
-                                    'uuid': uuid.uuid1().hex
-                                    }
-                            )
+        self.cursor.execute(self.config.get('UPLOADING', 'domain'), self._domain_row(domain))
+
+    def upload_domains(self, schema: Schema):
+        """ Выгрузить все домены схемы во временный источник доменов одним пакетом.
+
+        :param schema: объект схемы
+        :return: None
+        """
+        self.cursor.executemany(self.config.get('UPLOADING', 'domain'),
+                                [self._domain_row(domain) for domain in schema.domains.values()])
 
     def upload_table(self, table: Table, schema: Schema):
         """ Выгрузить данные из объекта таблицы во временный источник таблиц.
@@ -113,19 +109,42 @@ class DbdUploadConnection:
         :param schema: объект схемы
         :return: None
         """
-        query = self.config.get('UPLOADING', 'table')
-        self.cursor.execute(query, {
-                                    'schema_name': schema.name,
-                                    'name': table.name,
-                                    'description': table.description,
-                                    'can_add': table.add,
-                                    'can_edit': table.edit,
-                                    'can_delete': table.delete,
-                                    'temporal_mode': table.temporal_mode,
-                                    'means': table.means,
-                                    'uuid': uuid.uuid1().hex
-                                    }
-                            )
+        self.cursor.execute(self.config.get('UPLOADING', 'table'), self._table_row(table, schema))
+
+    def upload_tables(self, schema: Schema):
+        """ Выгрузить все таблицы схемы вместе с их полями, ограничениями, индексами и деталями.
+
+        Строки каждого вида элементов накапливаются и выгружаются во временный источник
+        одним пакетом.
+
+        :param schema: объект схемы
+        :return: None
+        """
+        tables = []
+        fields = []
+        constraints = []
+        constraint_details = []
+        indexes = []
+        index_details = []
+        for table in schema.tables.values():
+            tables.append(self._table_row(table, schema))
+            for position, field in enumerate(table.fields.values()):
+                fields.append(self._field_row(field, table, position))
+            for constraint in table.constraints:
+                constraints.append(self._constraint_row(constraint, table))
+                for position, detail in enumerate(constraint.details):
+                    constraint_details.append(self._constraint_detail_row(detail, constraint, position))
+            for index in table.indexes:
+                indexes.append(self._index_row(index, table))
+                for position, detail in enumerate(index.details):
+                    index_details.append(self._index_detail_row(detail, index, position))
+
+        self.cursor.executemany(self.config.get('UPLOADING', 'table'), tables)
+        self.cursor.executemany(self.config.get('UPLOADING', 'field'), fields)
+        self.cursor.executemany(self.config.get('UPLOADING', 'constraint'), constraints)
+        self.cursor.executemany(self.config.get('UPLOADING', 'constraint_detail'), constraint_details)
+        self.cursor.executemany(self.config.get('UPLOADING', 'index'), indexes)
+        self.cursor.executemany(self.config.get('UPLOADING', 'index_detail'), index_details)
 
     def upload_field(self, field: Field, table: Table):
         """ Выгрузить данные из объекта поля во временный источник полей.
@@ -134,24 +153,8 @@ class DbdUploadConnection:
         :param table: объект таблицы
         :return: None
         """
-        query = self.config.get('UPLOADING', 'field')
-        self.cursor.execute(query, {
-                                    'table_name': table.name,
-                                    'position': list(table.fields.values()).index(field),
-                                    'name': field.name,
-                                    'russian_short_name': field.rname,
-                                    'description': field.description,
-                                    'domain_name': field.domain,
-                                    'can_input': field.input,
-                                    'can_edit': field.edit,
-                                    'show_in_grid': field.show_in_grid,
-                                    'show_in_details': field.show_in_details,
-                                    'is_mean': field.is_mean,
-                                    'autocalculated': field.autocalculated,
-                                    'required': field.required,
-                                    'uuid': uuid.uuid1().hex
-                                    }
-                            )
+        position = list(table.fields.values()).index(field)
+        self.cursor.execute(self.config.get('UPLOADING', 'field'), self._field_row(field, table, position))
 
     def upload_constraint(self, constraint: Constraint, table: Table):
         """ Выгрузить данные из объекта ограничения во временный источника ограничений.
@@ -160,20 +163,7 @@ class DbdUploadConnection:
         :param table: объект таблицы
         :return: None
         """
-        query = self.config.get('UPLOADING', 'constraint')
-        self.cursor.execute(query, {
-                                    'id': id(constraint),
-                                    'table_name': table.name,
-                                    'name': constraint.name,
-                                    'constraint_type': constraint.kind,
-                                    'reference': constraint.reference,
-                                    'unique_key_name': constraint.constraint,
-                                    'has_value_edit': constraint.has_value_edit,
-                                    'cascading_delete': constraint.cascading_delete,
-                                    'expression': constraint.expression,
-                                    'uuid': uuid.uuid1().hex
-                                    }
-                            )
+        self.cursor.execute(self.config.get('UPLOADING', 'constraint'), self._constraint_row(constraint, table))
 
     def upload_index(self, index: Index, table: Table):
         """ Выгрузить данные из объекта индекса во временный источник индексов.
@@ -182,16 +172,7 @@ class DbdUploadConnection:
         :param table: объект таблицы
         :return: None
         """
-        query = self.config.get('UPLOADING', 'index')
-        self.cursor.execute(query, {
-                                    'id': id(index),
-                                    'table_name': table.name,
-                                    'name': index.name,
-                                    'local': index.local,
-                                    'kind': index.kind,
-                                    'uuid': uuid.uuid1().hex
-                                    }
-                            )
+        self.cursor.execute(self.config.get('UPLOADING', 'index'), self._index_row(index, table))
 
     def upload_constraint_detail(self, detail: ConstraintDetail, constraint: Constraint):
         """ Выгрузить данные из объекта детали ограничения во временный источник деталей ограничений.
@@ -200,13 +181,9 @@ class DbdUploadConnection:
         :param constraint: объект ограничения.
         :return: None
         """
-        query = self.config.get('UPLOADING', 'constraint_detail')
-        self.cursor.execute(query, {
-                                    'constraint_id': id(constraint),
-                                    'position': constraint.details.index(detail),
-                                    'field_name': detail.value
-                                    }
-                            )
+        position = constraint.details.index(detail)
+        self.cursor.execute(self.config.get('UPLOADING', 'constraint_detail'),
+                            self._constraint_detail_row(detail, constraint, position))
 
     def upload_index_detail(self, detail: IndexDetail, index: Index):
         """ Выгрузить данные из объекта детали индекса во временный источник деталей индексов.
@@ -215,15 +192,141 @@ class DbdUploadConnection:
         :param index: объект индекса
         :return: None
         """
-        query = self.config.get('UPLOADING', 'index_detail')
-        self.cursor.execute(query, {
-                                    'index_id': id(index),
-                                    'position': index.details.index(detail),
-                                    'field_name': detail.value,
-                                    'expression': detail.expression,
-                                    'descend': detail.descend
-                                    }
-                            )
+        position = index.details.index(detail)
+        self.cursor.execute(self.config.get('UPLOADING', 'index_detail'), self._index_detail_row(detail, index, position))
+
+    @staticmethod
+    def _domain_row(domain: Domain):
+        """ Сформировать параметры запроса выгрузки домена.
+
+        :param domain: объект домена
+        :return: dict
+        """
+        row = {
+            'name': domain.name,
+            'description': domain.description,
+            'data_type_name': domain.type,
+            'length': domain.length,
+            'char_length': domain.char_length,
+            'precision': domain.precision,
+            'scale': domain.scale,
+            'width': domain.width,
+            'align': domain.align,
+            'uuid': uuid.uuid1().hex
+        }
+        row.update(_DOMAIN_FLAGS(domain))
+        return row
+
+    @staticmethod
+    def _table_row(table: Table, schema: Schema):
+        """ Сформировать параметры запроса выгрузки таблицы.
+
+        :param table: объект таблицы
+        :param schema: объект схемы
+        :return: dict
+        """
+        row = {
+            'schema_name': schema.name,
+            'name': table.name,
+            'description': table.description,
+            'temporal_mode': table.temporal_mode,
+            'means': table.means,
+            'uuid': uuid.uuid1().hex
+        }
+        row.update(_TABLE_FLAGS(table))
+        return row
+
+    @staticmethod
+    def _field_row(field: Field, table: Table, position: int):
+        """ Сформировать параметры запроса выгрузки поля.
+
+        :param field: объект поля
+        :param table: объект таблицы
+        :param position: порядковый номер поля в таблице
+        :return: dict
+        """
+        row = {
+            'table_name': table.name,
+            'position': position,
+            'name': field.name,
+            'russian_short_name': field.rname,
+            'description': field.description,
+            'domain_name': field.domain,
+            'uuid': uuid.uuid1().hex
+        }
+        row.update(_FIELD_FLAGS(field))
+        return row
+
+    @staticmethod
+    def _constraint_row(constraint: Constraint, table: Table):
+        """ Сформировать параметры запроса выгрузки ограничения.
+
+        :param constraint: объект ограничения
+        :param table: объект таблицы
+        :return: dict
+        """
+        row = {
+            'id': id(constraint),
+            'table_name': table.name,
+            'name': constraint.name,
+            'constraint_type': constraint.kind,
+            'reference': constraint.reference,
+            'unique_key_name': constraint.constraint,
+            'cascading_delete': constraint.cascading_delete,
+            'expression': constraint.expression,
+            'uuid': uuid.uuid1().hex
+        }
+        row.update(_CONSTRAINT_FLAGS(constraint))
+        return row
+
+    @staticmethod
+    def _index_row(index: Index, table: Table):
+        """ Сформировать параметры запроса выгрузки индекса.
+
+        :param index: объект индекса
+        :param table: объект таблицы
+        :return: dict
+        """
+        return {
+            'id': id(index),
+            'table_name': table.name,
+            'name': index.name,
+            'local': index.local,
+            'kind': index.kind,
+            'uuid': uuid.uuid1().hex
+        }
+
+    @staticmethod
+    def _constraint_detail_row(detail: ConstraintDetail, constraint: Constraint, position: int):
+        """ Сформировать параметры запроса выгрузки детали ограничения.
+
+        :param detail: объект детали ограничения
+        :param constraint: объект ограничения
+        :param position: порядковый номер детали
+        :return: dict
+        """
+        return {
+            'constraint_id': id(constraint),
+            'position': position,
+            'field_name': detail.value
+        }
+
+    @staticmethod
+    def _index_detail_row(detail: IndexDetail, index: Index, position: int):
+        """ Сформировать параметры запроса выгрузки детали индекса.
+
+        :param detail: объект детали индекса
+        :param index: объект индекса
+        :param position: порядковый номер детали
+        :return: dict
+        """
+        return {
+            'index_id': id(index),
+            'position': position,
+            'field_name': detail.value,
+            'expression': detail.expression,
+            'descend': detail.descend
+        }
 
 
 def upload(schemas: list, db_file: str):
@@ -242,22 +345,16 @@ def upload(schemas: list, db_file: str):
 
     for schema in schemas:
         conn.upload_schema(schema)
-        for domain in schema.domains.values():
-            conn.upload_domain(domain)
-        for table in schema.tables.values():
-            conn.upload_table(table, schema)
-            for field in table.fields.values():
-                conn.upload_field(field, table)
-            for constraint in table.constraints:
-                conn.upload_constraint(constraint, table)
-                for detail in constraint.details:
-                    conn.upload_constraint_detail(detail, constraint)
-            for index in table.indexes:
-                conn.upload_index(index, table)
-                for detail in index.details:
-                    conn.upload_index_detail(detail, index)
+        conn.upload_domains(schema)
+        conn.upload_tables(schema)
 
     conn.cursor.execute(COMMIT)
 
     conn.fill_main_tables()
 
+
+# Функции получения значений столбцов свойств-флагов, скомпилированные из описаний сущностей.
+_DOMAIN_FLAGS = compile_dbd_flags(DOMAIN)
+_TABLE_FLAGS = compile_dbd_flags(TABLE)
+_FIELD_FLAGS = compile_dbd_flags(FIELD)
+_CONSTRAINT_FLAGS = compile_dbd_flags(CONSTRAINT)
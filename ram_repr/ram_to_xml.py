@@ -1,293 +1,516 @@
 """
-Модуль, содержащий метод выгрузки объектного представления базы в RAM в файловое представление в виде XML.
+Модуль, содержащий методы выгрузки объектного представления базы в RAM в файловое представление в виде XML.
+
+Выгрузка производится потоково, без построения DOM-документа: элементы каждой таблицы
+формируются в виде строки и сразу записываются в выходной поток. Формат результата
+совпадает с результатом minidom_fixed.Document.writexml(writer, '', '  ', '\\n', 'utf-8'),
+включая порядок атрибутов. Несколько схем выгружаются в общий документ с корневым
+элементом dbd_schemas, либо каждая в отдельный файл. Схема также может быть выгружена
+в каталог: манифест и по одному файлу на таблицу. Повторная выгрузка в тот же файл
+может формировать заново только изменившиеся таблицы.
 """
 
-from codecs import open as _open
-
-from ram_repr.ram_structure import Constraint
-from ram_repr.ram_structure import ConstraintDetail
-from ram_repr.ram_structure import Domain
-from ram_repr.ram_structure import Field
-from ram_repr.ram_structure import Index
-from ram_repr.ram_structure import IndexDetail
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from mmap import ACCESS_READ
+from mmap import mmap
+from multiprocessing import get_start_method
+
+from ram_repr.ram_attributes import CONSTRAINT
+from ram_repr.ram_attributes import CONSTRAINT_DETAIL
+from ram_repr.ram_attributes import DOMAIN
+from ram_repr.ram_attributes import FIELD
+from ram_repr.ram_attributes import INDEX
+from ram_repr.ram_attributes import INDEX_DETAIL
+from ram_repr.ram_attributes import SCHEMA
+from ram_repr.ram_attributes import TABLE
+from ram_repr.ram_attributes import compile_xml_writer
+from ram_repr.ram_fingerprint import recompute
 from ram_repr.ram_structure import Schema
 from ram_repr.ram_structure import Table
-from xml_repr.minidom_fixed import Document
+from xml_repr.xml_streams import SPLIT_MANIFEST
+from xml_repr.xml_streams import SPLIT_TABLES
+from xml_repr.xml_streams import is_compressed
+from xml_repr.xml_streams import open_output
+
+# Кодировка выгружаемого документа.
+ENCODING = 'utf-8'
+# Строка увеличения отступа для вложенных элементов.
+INDENT = '  '
+# Версия формата служебного файла отпечатков. Увеличивается при изменении формата выгрузки,
+# чтобы диапазоны, сформированные прежней версией, не копировались.
+FINGERPRINT_VERSION = 3
+# Схемы, выгружаемые в пуле процессов; наследуются дочерними процессами (см. _map).
+_SHARED_SCHEMAS = None
+# Символы, заменяемые в именах файлов фрагментов таблиц.
+_UNSAFE_FILE_CHARS = re.compile(r'[^\w.$#-]')
+# Объявление выгружаемого документа.
+_DECLARATION = '<?xml version="1.0" encoding="%s"?>\n' % ENCODING
 
 
 def write(schema, output):
     """ Выгрузить структуру базы из RAM в XML-файл.
 
     :param schema: выгружаемая схема базы.
-    :param output: путь к файлу, в который необходимо произвести выгрузку.
+    :param output: путь к файлу (при расширении .gz, .bz2, .xz данные сжимаются),
+                   либо файловый объект, открытый для записи.
+    :return: None
+    """
+    with open_output(output, ENCODING) as writer:
+        writer.write(_DECLARATION)
+        for part in _schema_parts(schema):
+            writer.write(part)
+
+
+def write_combined(schemas, output, workers=None):
+    """ Выгрузить несколько схем в один XML-документ с корневым элементом dbd_schemas.
+
+    Схемы сериализуются параллельно в пуле процессов, результаты записываются в порядке
+    следования схем.
+
+    :param schemas: список выгружаемых схем.
+    :param output: путь к файлу (при расширении .gz, .bz2, .xz данные сжимаются),
+                   либо файловый объект, открытый для записи.
+    :param workers: количество процессов (по умолчанию - количество ядер).
+    :return: None
+    """
+    with open_output(output, ENCODING) as writer:
+        writer.write(_DECLARATION)
+        if not schemas:
+            writer.write('<dbd_schemas/>\n')
+            return
+        writer.write('<dbd_schemas>\n')
+        for text in _map(_serialize_schema, schemas, [(INDENT,)] * len(schemas), workers):
+            writer.write(text)
+        writer.write('</dbd_schemas>\n')
+
+
+def write_schemas(schemas, output, workers=None):
+    """ Выгрузить схемы в один XML-файл: единственную схему - как write, несколько - как
+    write_combined.
+
+    :param schemas: выгружаемые схемы (любая коллекция, например результат dbd_to_ram.load).
+    :param output: путь к файлу (при расширении .gz, .bz2, .xz данные сжимаются),
+                   либо файловый объект, открытый для записи.
+    :param workers: количество процессов (по умолчанию - количество ядер).
     :return: None
     """
-    # Инициализируется dom-документ.
-    doc = Document()
+    schemas = list(schemas)
+    if len(schemas) == 1:
+        write(schemas[0], output)
+    else:
+        write_combined(schemas, output, workers)
 
-    # Заполняется объект схемы.
-    dbd_schema = _create_schema_dom(schema, doc)
-    doc.appendChild(dbd_schema)
+
+def write_separate(schemas, directory, workers=None, extension='.xml'):
+    """ Выгрузить каждую схему в отдельный XML-файл с именем схемы.
+
+    Файлы формируются параллельно в пуле процессов.
+
+    :param schemas: список выгружаемых схем.
+    :param directory: каталог, в котором создаются файлы.
+    :param workers: количество процессов (по умолчанию - количество ядер).
+    :param extension: расширение файлов (.xml.gz, .xml.bz2, .xml.xz - сжатые файлы).
+    :return: список путей к созданным файлам в порядке следования схем.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, schema.name + extension) for schema in schemas]
+    if len(set(paths)) != len(paths):
+        raise ValueError('Имена схем, выгружаемых в отдельные файлы, должны быть уникальными.')
+    for _ in _map(_write_schema_file, schemas, [(path,) for path in paths], workers):
+        pass
+    return paths
+
+
+def write_incremental(schema, path: str, sidecar: str=None):
+    """ Выгрузить схему в XML-файл, повторно формируя только изменившиеся таблицы.
+
+    Рядом с файлом сохраняется служебный файл с отпечатками таблиц и диапазонами байт,
+    которые они занимают в файле. При следующей выгрузке таблица, отпечаток которой
+    не изменился, не формируется заново: ее диапазон копируется из прежнего файла.
+    Результат совпадает с результатом write. Если прежний файл изменялся после выгрузки
+    (не совпадают размер или время изменения), выполняется полная выгрузка. Сжатые файлы
+    не допускают копирования диапазонов, поэтому для них всегда выполняется write.
+    Отпечатки таблиц вычисляются заново при каждой выгрузке (см. ram_fingerprint.recompute),
+    поэтому учитываются и непосредственные изменения таблиц, о которых схеме не сообщалось.
+
+    :param schema: выгружаемая схема базы.
+    :param path: путь к файлу.
+    :param sidecar: путь к служебному файлу (по умолчанию - path + '.fp').
+    :return: количество повторно сформированных таблиц.
+    """
+    if is_compressed(path):
+        write(schema, path)
+        return len(schema.tables)
+    if sidecar is None:
+        sidecar = path + '.fp'
+    previous = _load_fingerprints(path, sidecar)
+
+    tables = {}
+    rebuilt = 0
+    temp_path = path + '.tmp'
+    try:
+        with ExitStack() as stack:
+            old_data = None
+            if previous is not None:
+                old_file = stack.enter_context(open(path, 'rb'))
+                old_data = stack.enter_context(mmap(old_file.fileno(), 0, access=ACCESS_READ))
+            output = stack.enter_context(open(temp_path, 'wb'))
+            position = output.write((_DECLARATION + _schema_head(schema)).encode(ENCODING))
+            for name, table in schema.tables.items():
+                digest = recompute(table).hex()
+                known = previous['tables'].get(name) if previous is not None else None
+                if known is not None and known[0] == digest:
+                    data = old_data[known[1]:known[2]]
+                else:
+                    data = _table_xml(table).encode(ENCODING)
+                    rebuilt += 1
+                tables[name] = (digest, position, position + len(data))
+                position += output.write(data)
+            output.write(_schema_tail(schema).encode(ENCODING))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _save_fingerprints(path, sidecar, tables)
+    return rebuilt
+
+
+def _load_fingerprints(path: str, sidecar: str):
+    """ Загрузить отпечатки таблиц, если они соответствуют текущему состоянию файла.
+
+    :param path: путь к выгруженному XML-файлу.
+    :param sidecar: путь к служебному файлу.
+    :return: словарь отпечатков или None.
+    """
+    try:
+        with open(sidecar, encoding='utf-8') as file:
+            previous = json.load(file)
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if (previous.get('version') != FINGERPRINT_VERSION or previous.get('size') != stat.st_size
+            or previous.get('mtime') != stat.st_mtime_ns or not stat.st_size):
+        return None
+    return previous
+
+
+def _save_fingerprints(path: str, sidecar: str, tables: dict):
+    """ Сохранить отпечатки таблиц и занимаемые ими диапазоны байт выгруженного файла.
+
+    :param path: путь к выгруженному XML-файлу.
+    :param sidecar: путь к служебному файлу.
+    :param tables: словарь {имя таблицы: (отпечаток, начало, конец)}.
+    :return: None
+    """
+    stat = os.stat(path)
+    content = {
+        'version': FINGERPRINT_VERSION,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'tables': tables
+    }
+    with open(sidecar + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(content, file, ensure_ascii=False)
+    os.replace(sidecar + '.tmp', sidecar)
+
+
+def write_split(schema, directory: str, tables=None):
+    """ Выгрузить схему в каталог: манифест с атрибутами схемы и доменами и по одному файлу на таблицу.
+
+    Манифест перечисляет таблицы в исходном порядке со ссылками на файлы фрагментов,
+    каждый фрагмент - самостоятельный XML-документ с единственным элементом table.
+    Если задан список таблиц, перезаписываются только их фрагменты и манифест; при полной
+    выгрузке удаляются фрагменты таблиц, отсутствующих в схеме.
+
+    :param schema: выгружаемая схема базы.
+    :param directory: каталог раздельного представления.
+    :param tables: имена таблиц, фрагменты которых необходимо перезаписать (по умолчанию - все).
+    :return: None
+    """
+    files = _fragment_files(schema.tables)
+    os.makedirs(os.path.join(directory, SPLIT_TABLES), exist_ok=True)
+    for name in (schema.tables if tables is None else tables):
+        with open_output(os.path.join(directory, *files[name].split('/')), ENCODING) as writer:
+            writer.write(_DECLARATION)
+            writer.write(_table_xml(schema.tables[name], ''))
+
+    # Манифест записывается последним и замещает прежний целиком.
+    manifest = os.path.join(directory, SPLIT_MANIFEST)
+    with open_output(manifest + '.tmp', ENCODING) as writer:
+        writer.write(_DECLARATION)
+        writer.write(_manifest_xml(schema, files))
+    os.replace(manifest + '.tmp', manifest)
+
+    if tables is None:
+        used = {os.path.normcase(files[name].split('/')[-1]) for name in schema.tables}
+        for file_name in os.listdir(os.path.join(directory, SPLIT_TABLES)):
+            if file_name.endswith('.xml') and os.path.normcase(file_name) not in used:
+                os.remove(os.path.join(directory, SPLIT_TABLES, file_name))
+
+
+def _fragment_files(tables: dict):
+    """ Сопоставить таблицам относительные пути файлов фрагментов.
+
+    Символы, недопустимые в именах файлов, заменяются подчеркиванием; имена, совпадающие
+    без учета регистра, различаются числовым суффиксом.
+
+    :param tables: словарь таблиц схемы.
+    :return: словарь {имя таблицы: путь к фрагменту относительно каталога}.
+    """
+    files = {}
+    used = set()
+    for name in tables:
+        base = _UNSAFE_FILE_CHARS.sub('_', name)
+        file_name = base + '.xml'
+        number = 1
+        while file_name.lower() in used:
+            number += 1
+            file_name = '%s~%d.xml' % (base, number)
+        used.add(file_name.lower())
+        files[name] = SPLIT_TABLES + '/' + file_name
+    return files
+
+
+def _manifest_xml(schema: Schema, files: dict):
+    """ Получить XML-представление манифеста раздельного представления схемы.
+
+    :param schema: выгружаемая схема базы.
+    :param files: словарь {имя таблицы: путь к фрагменту}.
+    :return: str
+    """
+    parts = [_start('', 'dbd_schema', _SCHEMA_WRITER.attributes(schema)) + '>\n',
+             INDENT + '<custom/>\n',
+             _domains_xml(schema, INDENT)]
+    if not schema.tables:
+        parts.append(INDENT + '<tables/>\n')
+    else:
+        parts.append(INDENT + '<tables>\n')
+        for name in schema.tables:
+            parts.append(_start(INDENT * 2, 'fragment', [('table', name), ('file', files[name])]) + '/>\n')
+        parts.append(INDENT + '</tables>\n')
+    parts.append('</dbd_schema>\n')
+    return ''.join(parts)
+
+
+def _map(function, schemas: list, arguments: list, workers=None):
+    """ Применить функцию к схемам в пуле процессов, сохраняя порядок результатов.
+
+    Передача схемы в дочерний процесс требует ее сериализации, которая по времени сопоставима
+    с самой выгрузкой. Поэтому, если процессы порождаются через fork, схемы наследуются
+    ими из памяти родителя, и в задаче передается только номер схемы. При единственной
+    схеме или единственном процессе пул не создается.
+
+    :param function: функция уровня модуля, первым аргументом получающая схему или ее номер.
+    :param schemas: список схем.
+    :param arguments: список кортежей остальных аргументов для каждой схемы.
+    :param workers: количество процессов (по умолчанию - количество ядер).
+    :return: генератор результатов.
+    """
+    global _SHARED_SCHEMAS
+    workers = min(workers or os.cpu_count() or 1, len(schemas))
+    if workers <= 1:
+        for schema, args in zip(schemas, arguments):
+            yield function(schema, *args)
+        return
+    inherit = get_start_method() == 'fork'
+    if inherit:
+        _SHARED_SCHEMAS = schemas
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(function, number if inherit else schema, *args)
+                       for number, (schema, args) in enumerate(zip(schemas, arguments))]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        _SHARED_SCHEMAS = None
+
+
+def _shared_schema(schema):
+    """ Получить схему, переданную в дочерний процесс объектом или номером (см. _map).
+
+    :param schema: схема или ее номер в списке схем, унаследованном от родительского процесса.
+    :return: Schema
+    """
+    if isinstance(schema, int):
+        return _SHARED_SCHEMAS[schema]
+    return schema
+
+
+def _serialize_schema(schema, indent: str=''):
+    """ Получить XML-представление схемы без объявления документа (выполняется в дочернем процессе).
+
+    :param schema: выгружаемая схема базы или ее номер (см. _map).
+    :param indent: отступ элемента схемы.
+    :return: str
+    """
+    return ''.join(_schema_parts(_shared_schema(schema), indent))
+
+
+def _write_schema_file(schema, path: str):
+    """ Выгрузить схему в файл (выполняется в дочернем процессе).
+
+    :param schema: выгружаемая схема базы или ее номер (см. _map).
+    :param path: путь к файлу.
+    :return: None
+    """
+    write(_shared_schema(schema), path)
+
+
+def _schema_parts(schema: Schema, indent: str=''):
+    """ Получить XML-представление схемы по частям: по одной строке на каждую таблицу.
+
+    :param schema: выгружаемая схема базы.
+    :param indent: отступ элемента схемы.
+    :return: генератор строк.
+    """
+    yield _schema_head(schema, indent)
+    table_indent = indent + INDENT * 2
+    for table in schema.tables.values():
+        yield _table_xml(table, table_indent)
+    yield _schema_tail(schema, indent)
+
+
+def _schema_head(schema: Schema, indent: str=''):
+    """ Получить начало XML-представления схемы, предшествующее первой таблице.
+
+    :param schema: выгружаемая схема базы.
+    :param indent: отступ элемента схемы.
+    :return: str
+    """
+    child_indent = indent + INDENT
+    parts = [_start(indent, 'dbd_schema', _SCHEMA_WRITER.attributes(schema)) + '>\n']
 
     # Заполнаяется непонятный тэг. Необходим для того, чтобы результаты сошлись в любом случае.
-    custom_output = doc.createElement('custom')
-    dbd_schema.appendChild(custom_output)
+    parts.append(child_indent + '<custom/>\n')
 
     # Заполняется структура доменов.
-    domains_output = doc.createElement('domains')
-    dbd_schema.appendChild(domains_output)
-    for domain in schema.domains.values():
-        domain_output = _create_domain_dom(domain, doc)
-        domains_output.appendChild(domain_output)
+    parts.append(_domains_xml(schema, child_indent))
 
-    # Заполняется структура таблиц.
-    tables_output = doc.createElement('tables')
-    dbd_schema.appendChild(tables_output)
-    for table in schema.tables.values():
-        table_output = _create_table_dom(table, doc)
-
-        for field in table.fields.values():
-            # Заполняется структура поля.
-            field_output = _create_field_dom(field, doc)
-            table_output.appendChild(field_output)
-
-        for constraint in table.constraints:
-            # Заполняется структура ограничения.
-            constraint_output = _create_constraint_dom(constraint, doc)
-            table_output.appendChild(constraint_output)
-            if len(constraint.details) < 2:
-                continue
-            for detail in constraint.details:
-                # Заполняется структура деталей ограничений.
-                detail_output = _create_constraint_detail_dom(detail, doc)
-                constraint_output.appendChild(detail_output)
-
-        # Заполняется структура индексов.
-        for index in table.indexes:
-            index_output = _create_index_dom(index, doc)
-            table_output.appendChild(index_output)
-            if len(index.details) < 2:
-                continue
-            for detail in index.details:
-                # Заполняется структура деталей индексов.
-                detail_output = _create_index_detail_dom(detail, doc)
-                index_output.appendChild(detail_output)
-
-        tables_output.appendChild(table_output)
-    # Происходит выгрузка созданной dom-схемы в файл.
-    doc.writexml(_open(output, 'w', 'utf-8'), '', '  ', '\n', 'utf-8')
-
-
-def _create_schema_dom(schema: Schema, doc: Document):
-    """ Создать DOM-элемент Схемы, определить все его атрибуты.
+    # Открывается структура таблиц.
+    parts.append(child_indent + ('<tables>\n' if schema.tables else '<tables/>\n'))
+    return ''.join(parts)
 
-    :param schema: Объект RAM-представления Схемы.
-    :param doc: DOM-документ, для которого производится создание элемента.
-    :return: DOM-элемент Схемы.
+
+def _schema_tail(schema: Schema, indent: str=''):
+    """ Получить окончание XML-представления схемы, следующее за последней таблицей.
+
+    :param schema: выгружаемая схема базы.
+    :param indent: отступ элемента схемы.
+    :return: str
     """
-    schema_dom = doc.createElement('dbd_schema')
-    if schema.fulltext_engine:
-        schema_dom.setAttribute('fulltext_engine', schema.fulltext_engine)
-    if schema.version:
-        schema_dom.setAttribute('version', schema.version)
-    if schema.name:
-        schema_dom.setAttribute('name', schema.name)
-    if schema.description:
-        schema_dom.setAttribute('description', schema.description)
-    return schema_dom
-
-
-def _create_domain_dom(domain: Domain, doc: Document):
-    """ Создать DOM-элемент Домена, определить все его атрибуты.
-
-    :param domain: Объект RAM-представления Домена.
-    :param doc: DOM-документ, для которого производится создание элемента.
-    :return: DOM-элемент Домена.
+    if schema.tables:
+        return indent + INDENT + '</tables>\n' + indent + '</dbd_schema>\n'
+    return indent + '</dbd_schema>\n'
+
+
+def _domains_xml(schema: Schema, indent: str=INDENT):
+    """ Получить XML-представление списка доменов схемы.
+
+    :param schema: Объект RAM-представления Схемы.
+    :param indent: отступ элемента domains.
+    :return: str
     """
-    domain_dom = doc.createElement('domain')
-    if domain.name:
-        domain_dom.setAttribute('name', domain.name)
-    if domain.description:
-        domain_dom.setAttribute('description', domain.description)
-    if domain.type:
-        domain_dom.setAttribute('type', domain.type)
-    if domain.align:
-        domain_dom.setAttribute('align', domain.align)
-    if domain.width:
-        domain_dom.setAttribute('width', domain.width)
-    if domain.length:
-        domain_dom.setAttribute('length', domain.length)
-    if domain.precision:
-        domain_dom.setAttribute('precision', domain.precision)
-
-    props = []
-    if domain.case_sensitive:
-        props.append('case_sensitive')
-    if domain.show_null:
-        props.append('show_null')
-    if domain.show_lead_nulls:
-        props.append('show_lead_nulls')
-    if domain.thousands_separator:
-        props.append('thousands_separator')
-    if domain.summable:
-        props.append('summable')
-    if len(props) > 0:
-        domain_dom.setAttribute('props', ', '.join(props))
-
-    if domain.scale:
-        domain_dom.setAttribute('scale', domain.scale)
-    if domain.char_length:
-        domain_dom.setAttribute('char_length', domain.char_length)
-    return domain_dom
-
-
-def _create_table_dom(table: Table, doc: Document):
-    """ Создать DOM-элемент Таблицы, определить все его атрибуты.
+    if not schema.domains:
+        return indent + '<domains/>\n'
+    parts = [indent + '<domains>\n']
+    child_indent = indent + INDENT
+    for domain in schema.domains.values():
+        parts.append(_start(child_indent, 'domain', _DOMAIN_WRITER.attributes(domain)) + '/>\n')
+    parts.append(indent + '</domains>\n')
+    return ''.join(parts)
+
+
+def _table_xml(table: Table, indent: str=INDENT * 2):
+    """ Получить XML-представление таблицы вместе с ее полями, ограничениями и индексами.
 
     :param table: Объект RAM-представления Таблицы.
-    :param doc: DOM-документ, для которого производится создание элемента.
-    :return: DOM-элемент Таблицы.
-    """
-    table_dom = doc.createElement('table')
-    if table.name:
-        table_dom.setAttribute('name', table.name)
-    if table.description:
-        table_dom.setAttribute('description', table.description)
-
-    props = []
-    if table.add:
-        props.append('add')
-    if table.edit:
-        props.append('edit')
-    if table.delete:
-        props.append('delete')
-    if len(props) > 0:
-        table_dom.setAttribute('props', ', '.join(props))
-    return table_dom
-
-
-def _create_field_dom(field: Field, doc: Document):
-    """ Создать DOM-элемент Поля, определить все его атрибуты.
-
-    :param field: Объект RAM-представления Поля.
-    :param doc: DOM-документ, для которого производится создание элемента.
-    :return: DOM-элемент Поля.
+    :param indent: отступ элемента таблицы.
+    :return: str
     """
-    field_dom = doc.createElement('field')
-    if field.name:
-        field_dom.setAttribute('name', field.name)
-    if field.rname:
-        field_dom.setAttribute('rname', field.rname)
-    if field.domain:
-        field_dom.setAttribute('domain', field.domain)
-    if field.type:
-        field_dom.setAttribute('type', field.type)
-    if field.description:
-        field_dom.setAttribute('description', field.description)
-
-    props = []
-    if field.input:
-        props.append('input')
-    if field.edit:
-        props.append('edit')
-    if field.show_in_grid:
-        props.append('show_in_grid')
-    if field.show_in_details:
-        props.append('show_in_details')
-    if field.is_mean:
-        props.append('is_mean')
-    if field.autocalculated:
-        props.append('autocalculated')
-    if field.required:
-        props.append('required')
-    if len(props) > 0:
-        field_dom.setAttribute('props', ', '.join(props))
-    return field_dom
-
-
-def _create_constraint_dom(constraint: Constraint, doc: Document):
-    """ Создать DOM-элемент Ограничения, определить все его атрибуты.
-
-    :param constraint: Объект RAM-представления Ограничения.
-    :param doc: DOM-документ, для которого производится создание элемента.
-    :return: DOM-элемент Ограничения.
-    """
-    constraint_dom = doc.createElement('constraint')
-    if constraint.name:
-        constraint_dom.setAttribute('name', constraint.name)
-    if constraint.kind:
-        constraint_dom.setAttribute('kind', constraint.kind)
-    if len(constraint.details) == 1:
-        constraint_dom.setAttribute('items', constraint.details[0].value)
-    if constraint.reference:
-        constraint_dom.setAttribute('reference', constraint.reference)
-    if constraint.constraint:
-        constraint_dom.setAttribute('constraint', constraint.constraint)
-    if constraint.expression:
-        constraint_dom.setAttribute('expression', constraint.expression)
-
-    props = []
-    if constraint.has_value_edit:
-        props.append('has_value_edit')
-    if constraint.cascading_delete == False:
-        props.append('cascading_delete')
-    if constraint.cascading_delete == True:
-        props.append('full_cascading_delete')
-    if len(props) > 0:
-        constraint_dom.setAttribute('props', ', '.join(props))
-    return constraint_dom
-
-
-def _create_index_dom(index: Index, doc: Document):
-    """ Создать DOM-элемент Индекса, определить все его атрибуты.
-
-    :param index: Объект RAM-представления Индекса.
-    :param doc: DOM-документ, для которого производится создание элемента.
-    :return: DOM-элемент Индекса.
+    start = _start(indent, 'table', _TABLE_WRITER.attributes(table))
+    if not (table.fields or table.constraints or table.indexes):
+        return start + '/>\n'
+    parts = [start, '>\n']
+    child_indent = indent + INDENT
+    item_indent = child_indent + INDENT
+
+    for field in table.fields.values():
+        # Заполняется структура поля.
+        parts.append(_start(child_indent, 'field', _FIELD_WRITER.attributes(field)) + '/>\n')
+
+    for constraint in table.constraints:
+        # Заполняется структура ограничения и, если их несколько, его деталей.
+        parts.append(_start(child_indent, 'constraint', _CONSTRAINT_WRITER.attributes(constraint)))
+        _append_details(parts, constraint.details, _CONSTRAINT_DETAIL_WRITER, child_indent, item_indent,
+                        'constraint')
+
+    for index in table.indexes:
+        # Заполняется структура индекса и, если их несколько, его деталей.
+        parts.append(_start(child_indent, 'index', _INDEX_WRITER.attributes(index)))
+        _append_details(parts, index.details, _INDEX_DETAIL_WRITER, child_indent, item_indent, 'index')
+
+    parts.append(indent + '</table>\n')
+    return ''.join(parts)
+
+
+def _append_details(parts: list, details: list, writer, indent: str, item_indent: str, tag: str):
+    """ Дописать окончание элемента ограничения или индекса вместе с деталями.
+
+    Единственная деталь записывается атрибутом самого элемента, поэтому вложенные элементы
+    item формируются, только если деталей больше одной.
+
+    :param parts: список частей XML-представления.
+    :param details: список деталей элемента.
+    :param writer: скомпилированный список функций получения значений атрибутов детали.
+    :param indent: отступ элемента.
+    :param item_indent: отступ деталей элемента.
+    :param tag: имя тэга элемента.
+    :return: None
     """
-    index_dom = doc.createElement('index')
-    if index.name:
-        index_dom.setAttribute('name', index.name)
-    if len(index.details) == 1:
-        index_dom.setAttribute('field', index.details[0].value)
-
-    props = []
-    if index.local:
-        props.append('local')
-    if index.kind == 'uniqueness':
-        props.append('uniqueness')
-    if index.kind == 'fulltext':
-        props.append('fulltext')
-    if len(props) > 0:
-        index_dom.setAttribute('props', ', '.join(props))
-    return index_dom
-
-
-def _create_constraint_detail_dom(detail: ConstraintDetail, doc: Document):
-    """ Создать DOM-элемент Детали ограничения, определить все его атрибуты.
-
-    :param detail: Объект RAM-представления Детали ограничения.
-    :param doc: DOM-документ, для которого производится создание элемента.
-    :return: DOM-элемент Детали ограничения.
+    if len(details) < 2:
+        parts.append('/>\n')
+        return
+    parts.append('>\n')
+    for detail in details:
+        parts.append(_start(item_indent, 'item', writer.attributes(detail)) + '/>\n')
+    parts.append('%s</%s>\n' % (indent, tag))
+
+
+def _start(indent: str, tag: str, attributes: list):
+    """ Получить незакрытый открывающий тэг элемента с атрибутами.
+
+    :param indent: отступ элемента.
+    :param tag: имя тэга элемента.
+    :param attributes: список пар (имя атрибута, значение).
+    :return: str
     """
-    detail_dom = doc.createElement('item')
-    if detail.value:
-        detail_dom.setAttribute('value', detail.value)
-    return detail_dom
+    return indent + '<' + tag + ''.join([' %s="%s"' % (name, _escape(value)) for name, value in attributes])
 
 
-def _create_index_detail_dom(detail: IndexDetail, doc: Document):
-    """ Создать DOM-элемент Детали индекса, определить все его атрибуты.
+def _escape(value):
+    """ Экранировать значение атрибута так же, как это делает xml.dom.minidom.
 
-    :param detail: Объект RAM-представления Детали индекса.
-    :param doc: DOM-документ, для которого производится создание элемента.
-    :return: DOM-элемент Детали индекса.
+    :param value: значение атрибута.
+    :return: str
     """
-    detail_dom = doc.createElement('item')
-    if detail.value:
-        detail_dom.setAttribute('value', detail.value)
-    if detail.expression:
-        detail_dom.setAttribute('expression', detail.expression)
-    if detail.descend:
-        detail_dom.setAttribute('descend', detail.descend)
-    return detail_dom
+    return str(value).replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;').replace('>', '&gt;')
+
+
+# Списки функций получения значений атрибутов, скомпилированные из описаний сущностей.
+_SCHEMA_WRITER = compile_xml_writer(SCHEMA)
+_DOMAIN_WRITER = compile_xml_writer(DOMAIN)
+_TABLE_WRITER = compile_xml_writer(TABLE)
+_FIELD_WRITER = compile_xml_writer(FIELD)
+_CONSTRAINT_WRITER = compile_xml_writer(CONSTRAINT)
+_INDEX_WRITER = compile_xml_writer(INDEX)
+_CONSTRAINT_DETAIL_WRITER = compile_xml_writer(CONSTRAINT_DETAIL)
+_INDEX_DETAIL_WRITER = compile_xml_writer(INDEX_DETAIL)
@@ -1,157 +1,741 @@
 """ Модуль, содержащий методы проверки корректности структуры Схема, представленной
 в RAM в виде классов.
+
+Проверки задаются правилами (Rule), зарегистрированными в реестре (RuleRegistry). Правило
+применяется к элементам одного вида (SCHEMA, DOMAIN, TABLE, FIELD, ...) и возвращает
+итерируемый набор ошибок (объектов ValidationError) либо None. Встроенные правила
+зарегистрированы в реестре RULES; собственные правила добавляются в него или в его копию
+(RuleRegistry.copy). Перед проверкой правила реестра компилируются в одну функцию на каждый
+вид элементов, поэтому количество правил не увеличивает количество проходов по схеме.
+
+Правило может объявить необходимые ему индексы - вспомогательные структуры, строящиеся
+однократно: индексы уровня схемы строятся перед проверкой по всей схеме, индексы уровня
+таблицы - при первом обращении в пределах проверяемой таблицы (см. RuleContext.index).
+
+Валидация выполняется за один проход по элементам схемы и собирает все нарушения
+(объекты Violation с путем к элементу), а не останавливается на первом из них.
+
+Таблицы проверяются независимо друг от друга: им нужны лишь имена доменов и таблиц схемы,
+поддерживаемые типы данных и индексы уровня схемы. Поэтому на больших схемах таблицы могут
+проверяться пакетами в пуле процессов; эти данные передаются процессам однократно при их
+запуске, а нарушения объединяются в порядке таблиц. Правила, проверяемые в пуле, получают
+вместо схемы объект с множествами имен (RuleContext.schema), а их функции и индексы должны
+быть сериализуемы. По той же причине IncrementalValidator при повторной проверке
+изменяемой схемы проверяет только измененные таблицы и домены и таблицы, ссылающиеся на
+добавленные или удаленные домены и таблицы.
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_start_method
+from time import perf_counter
 
+from ram_repr.ram_fingerprint import fingerprint
 from ram_repr.ram_structure import Constraint
-from ram_repr.ram_structure import ConstraintDetail
 from ram_repr.ram_structure import Domain
 from ram_repr.ram_structure import Field
-from ram_repr.ram_structure import Index
-from ram_repr.ram_structure import IndexDetail
 from ram_repr.ram_structure import Schema
 from ram_repr.ram_structure import Table
 
-
-def validate_schema(schema: Schema):
+# Виды элементов схемы, к которым применяются правила.
+SCHEMA = 'schema'
+DOMAIN = 'domain'
+TABLE = 'table'
+FIELD = 'field'
+CONSTRAINT = 'constraint'
+CONSTRAINT_DETAIL = 'constraint_detail'
+INDEX = 'index'
+INDEX_DETAIL = 'index_detail'
+KINDS = (SCHEMA, DOMAIN, TABLE, FIELD, CONSTRAINT, CONSTRAINT_DETAIL, INDEX, INDEX_DETAIL)
+
+# Минимальное количество таблиц, начиная с которого таблицы проверяются в пуле процессов:
+# проверка таблицы занимает порядка 15 мкс, и на меньших схемах запуск процессов дольше
+# самой проверки.
+PARALLEL_THRESHOLD = 5000
+# Таблицы, проверяемые в пуле процессов; наследуются дочерними процессами (см. _validate_batch).
+_SHARED_TABLES = None
+# Состояние проверки, переданное процессу пула (см. _init_worker).
+_WORKER_STATE = None
+
+
+def validate_schema(schema: Schema, workers=1, registry=None):
     """ Проверить корректность данных схемы (произвести валидацию)
 
+    Нарушения правил-предупреждений не приводят к исключению.
+
     :param schema: объект схемы к валидации.
+    :param workers: количество процессов проверки таблиц (None - количество ядер).
+    :param registry: реестр правил (по умолчанию - RULES).
     :return: None
     """
-    try:
-        # Выполняется валидация объекта схемы.
-        _validate_schema(schema)
-        # Выполняется валидация каждой из таблиц схемы.
+    violations = [violation for violation in validate(schema, workers, registry) if not violation.warning]
+    if violations:
+        raise SchemaValidationError(violations)
+
+
+def validate(schema: Schema, workers=1, registry=None, profile: bool=False):
+    """ Проверить схему целиком, собрав все нарушения.
+
+    Проверки выполняются за один проход по элементам схемы; для каждого элемента
+    выполняются все правила, поэтому один запуск сообщает обо всех нарушениях.
+    Схемы, содержащие менее PARALLEL_THRESHOLD таблиц, проверяются в текущем процессе
+    при любом количестве процессов.
+
+    :param schema: объект схемы к валидации.
+    :param workers: количество процессов проверки таблиц (None - количество ядер).
+    :param registry: реестр правил (по умолчанию - RULES).
+    :param profile: накапливать время выполнения правил (см. RuleRegistry.report).
+    :return: список нарушений (объектов Violation) в порядке следования элементов.
+    """
+    registry = registry if registry is not None else RULES
+    checks = registry.compile(profile)
+    context = RuleContext(schema, registry, registry.build_indexes(schema))
+    path = ('Схема ' + str(schema.name),)
+    violations = _schema_violations(schema, context, path, checks)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(schema.tables) < PARALLEL_THRESHOLD:
         for table in schema.tables.values():
+            violations.extend(_table_violations(table, context, path, checks))
+    else:
+        violations.extend(_parallel_table_violations(schema, context, path, workers, registry, profile))
+    return violations
+
+
+def _schema_violations(schema: Schema, context, path: tuple, checks: dict):
+    """ Проверить схему и ее домены (без таблиц).
+
+    :param schema: объект схемы.
+    :param context: контекст проверки.
+    :param path: путь к схеме.
+    :param checks: скомпилированные проверки видов элементов (см. RuleRegistry.compile).
+    :return: список нарушений.
+    """
+    violations = []
+    if checks[SCHEMA] is not None:
+        _collect(violations, path, checks[SCHEMA](schema, context))
+    if checks[DOMAIN] is not None:
+        for domain in schema.domains.values():
+            _collect(violations, path + ('Домен ' + str(domain.name),), checks[DOMAIN](domain, context))
+    return violations
+
+
+def _parallel_table_violations(schema: Schema, context, path: tuple, workers: int, registry, profile: bool):
+    """ Проверить таблицы схемы пакетами в пуле процессов.
+
+    Если процессы порождаются через fork, таблицы наследуются ими из памяти родителя,
+    и в задаче передаются только границы пакета; иначе передаются сами таблицы пакета.
+
+    :param schema: объект схемы.
+    :param context: контекст проверки (используются индексы уровня схемы).
+    :param path: путь к схеме.
+    :param workers: количество процессов.
+    :param registry: реестр правил.
+    :param profile: накапливать время выполнения правил.
+    :return: список нарушений в порядке таблиц.
+    """
+    global _SHARED_TABLES
+    tables = list(schema.tables.values())
+    size = -(-len(tables) // (workers * 4))
+    batches = [(start, min(start + size, len(tables))) for start in range(0, len(tables), size)]
+    inherit = get_start_method() == 'fork'
+    if inherit:
+        _SHARED_TABLES = tables
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(registry, _SchemaNames(schema), context.indexes, path, profile)) \
+                as executor:
+            futures = [executor.submit(_validate_batch, batch if inherit else tables[batch[0]:batch[1]])
+                       for batch in batches]
+            violations = []
             try:
-                _validate_table(table)
-                for field in table.fields.values():
-                    try:
-                        _validate_field(field, schema)
-                    except ValidationError as err:
-                        raise ValidationError('Поле.' + str(err))
-                # Выполняется валидация каждого ограничения таблицы.
-                for constraint in table.constraints:
-                    try:
-                        _validate_constraint(constraint, table, schema)
-                        # Выполняется валидация деталей ограничения.
-                        for detail in constraint.details:
-                            try:
-                                _validate_constraint_detail(detail, table)
-                            except ValidationError as ex:
-                                raise ValidationError('Деталь ограничения.' + str(ex))
-                    except ValidationError as ex:
-                        raise ValidationError('Ограничение.' + str(ex))
-                # Выполняется валидация каждого индекса таблицы.
-                for index in table.indexes:
-                    try:
-                        _validate_index(index, table)
-                        # Выполняется валидация деталей индекса.
-                        for detail in index.details:
-                            try:
-                                _validate_index_detail(detail, table)
-                            except ValidationError as ex:
-                                raise ValidationError('Деталь индекса.' + str(ex))  # Производится
-                    except ValidationError as ex:                                   # каскадный
-                        raise ValidationError('Индекс. ' + str(ex))                 # проброс
-            except ValidationError as ex:                                           # исключений.
-                raise ValidationError('Таблица ' + str(table.name) + '. ' + str(ex))
-    except ValidationError as ex:
-        raise ValidationError('Схема ' + str(schema.name) + '. ' + str(ex))
-
-
-def _validate_schema(schema: Schema):
-    """ Произвести валидацию объекта схемы.
+                for future in futures:
+                    batch_violations, timings = future.result()
+                    violations.extend(batch_violations)
+                    registry.add_timings(timings)
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        _SHARED_TABLES = None
+    return violations
+
+
+def _init_worker(registry, names, indexes: dict, path: tuple, profile: bool):
+    """ Подготовить проверку таблиц в процессе пула.
+
+    :param registry: реестр правил.
+    :param names: объект _SchemaNames.
+    :param indexes: индексы уровня схемы.
+    :param path: путь к схеме.
+    :param profile: накапливать время выполнения правил.
+    :return: None
+    """
+    global _WORKER_STATE
+    _WORKER_STATE = (registry, registry.compile(profile), RuleContext(names, registry, indexes), path)
+
 
+def _validate_batch(batch):
+    """ Проверить пакет таблиц (выполняется в дочернем процессе).
+
+    :param batch: список таблиц, либо границы пакета в списке таблиц, унаследованном
+                  от родительского процесса.
+    :return: пара (список нарушений, время выполнения правил пакета).
+    """
+    registry, checks, context, path = _WORKER_STATE
+    tables = _SHARED_TABLES[batch[0]:batch[1]] if isinstance(batch, tuple) else batch
+    registry.timings.clear()
+    violations = []
+    for table in tables:
+        violations.extend(_table_violations(table, context, path, checks))
+    return violations, registry.timings
+
+
+def _table_violations(table: Table, context, path: tuple, checks: dict):
+    """ Проверить таблицу вместе с ее полями, ограничениями и индексами.
+
+    :param table: объект таблицы.
+    :param context: контекст проверки.
+    :param path: путь к схеме.
+    :param checks: скомпилированные проверки видов элементов.
+    :return: список нарушений.
+    """
+    context.begin_table(table)
+    path = path + ('Таблица ' + str(table.name),)
+    violations = []
+    if checks[TABLE] is not None:
+        _collect(violations, path, checks[TABLE](table, context))
+    check = checks[FIELD]
+    if check is not None:
+        for field in table.fields.values():
+            found = check(field, context)
+            if found:
+                _collect(violations, path + ('Поле ' + str(field.name),), found)
+    _children_violations(violations, path, table.constraints, 'Ограничение', checks[CONSTRAINT],
+                         checks[CONSTRAINT_DETAIL], context)
+    _children_violations(violations, path, table.indexes, 'Индекс', checks[INDEX], checks[INDEX_DETAIL], context)
+    return violations
+
+
+def _children_violations(violations: list, path: tuple, elements: list, kind: str, check, detail_check, context):
+    """ Проверить ограничения или индексы таблицы вместе с их деталями.
+
+    :param violations: список, в который добавляются нарушения.
+    :param path: путь к таблице.
+    :param elements: ограничения или индексы таблицы.
+    :param kind: вид элементов в пути нарушения.
+    :param check: скомпилированная проверка элементов (или None).
+    :param detail_check: скомпилированная проверка деталей элементов (или None).
+    :param context: контекст проверки.
     :return: None
     """
+    if check is None and detail_check is None:
+        return
+    for number, element in enumerate(elements, 1):
+        found = check(element, context) if check is not None else None
+        if found:
+            _collect(violations, path + (_label(kind, element.name, number),), found)
+        if detail_check is None:
+            continue
+        for detail_number, detail in enumerate(element.details, 1):
+            found = detail_check(detail, context)
+            if found:
+                _collect(violations, path + (_label(kind, element.name, number),
+                                             _label('Деталь', detail.value, detail_number)), found)
+
+
+def _collect(violations: list, path: tuple, found: list):
+    """ Добавить найденные ошибки в список нарушений.
+
+    :param violations: список нарушений.
+    :param path: путь к элементу.
+    :param found: список пар (правило, ошибка).
+    :return: None
+    """
+    violations.extend(Violation(path, error, rule) for rule, error in found)
+
+
+def _label(kind: str, name, number: int):
+    """ Получить обозначение элемента в пути нарушения: имя, либо порядковый номер.
+
+    :param kind: вид элемента.
+    :param name: имя элемента.
+    :param number: порядковый номер элемента (с 1).
+    :return: str
+    """
+    return kind + ' ' + (str(name) if name is not None else '№' + str(number))
+
+
+def _compile_check(rules: list, timings):
+    """ Скомпилировать правила одного вида элементов в функцию проверки элемента.
+
+    :param rules: правила вида элементов в порядке регистрации.
+    :param timings: словарь накопления времени выполнения правил {имя: [вызовы, секунды]},
+                    либо None, если время не измеряется.
+    :return: функция (элемент, контекст), возвращающая список пар (правило, ошибка), либо
+             None, если правил нет.
+    """
+    if not rules:
+        return None
+    pairs = tuple((rule, rule.function) for rule in rules)
+    if len(pairs) == 1 and timings is None:
+        rule, function = pairs[0]
+
+        def check(element, context):
+            errors = function(element, context)
+            return [(rule, error) for error in errors] if errors else ()
+        return check
+
+    if timings is None:
+        def check(element, context):
+            found = []
+            for rule, function in pairs:
+                errors = function(element, context)
+                if errors:
+                    found.extend((rule, error) for error in errors)
+            return found
+        return check
+
+    def check(element, context):
+        found = []
+        for rule, function in pairs:
+            start = perf_counter()
+            errors = function(element, context)
+            if errors:
+                found.extend((rule, error) for error in errors)
+            timing = timings.get(rule.name)
+            if timing is None:
+                timing = timings[rule.name] = [0, 0.0]
+            timing[0] += 1
+            timing[1] += perf_counter() - start
+        return found
+    return check
+
+
+class Rule:
+    """ Класс, моделирующий правило проверки элементов схемы.
+    """
+    __slots__ = ('name', 'kind', 'function', 'needs', 'warning')
+
+    def __init__(self, name: str, kind: str, function, needs=(), warning: bool=False):
+        """ Конструктор.
+
+        :param name: уникальное имя правила.
+        :param kind: вид проверяемых элементов (SCHEMA, DOMAIN, TABLE, FIELD, ...).
+        :param function: функция (элемент, контекст), возвращающая итерируемый набор
+                         ошибок (объектов ValidationError) либо None.
+        :param needs: имена индексов, используемых правилом (см. RuleRegistry.add_index).
+        :param warning: нарушения правила - предупреждения, не препятствующие загрузке схемы.
+        """
+        if kind not in KINDS:
+            raise ValueError('Неизвестный вид элементов: ' + str(kind))
+        self.name = name
+        self.kind = kind
+        self.function = function
+        self.needs = tuple(needs)
+        self.warning = warning
+
+
+class RuleRegistry:
+    """ Класс, реализующий реестр правил проверки схемы и индексов, необходимых правилам.
+    """
+    def __init__(self):
+        # Правила в порядке регистрации.
+        self.rules = []
+        # Построители индексов: {имя: (функция построения, уровень - SCHEMA или TABLE)}.
+        self.indexes = {}
+        # Время выполнения правил: {имя правила: [количество вызовов, секунды]}.
+        self.timings = {}
+        # Номер версии реестра; увеличивается при каждом изменении состава правил.
+        self.version = 0
+        self._compiled = {}
+
+    def copy(self):
+        """ Создать реестр с теми же правилами и индексами.
+
+        :return: RuleRegistry
+        """
+        registry = RuleRegistry()
+        registry.rules = list(self.rules)
+        registry.indexes = dict(self.indexes)
+        return registry
+
+    def add(self, rule: Rule):
+        """ Зарегистрировать правило.
+
+        :param rule: объект правила с уникальным именем.
+        :return: rule
+        """
+        if any(existing.name == rule.name for existing in self.rules):
+            raise ValueError('Правило с именем "' + str(rule.name) + '" уже зарегистрировано')
+        self.rules.append(rule)
+        self._changed()
+        return rule
+
+    def rule(self, kind: str, name: str=None, needs=(), warning: bool=False):
+        """ Получить декоратор, регистрирующий функцию как правило.
+
+        :param kind: вид проверяемых элементов.
+        :param name: имя правила (по умолчанию - имя функции).
+        :param needs: имена индексов, используемых правилом.
+        :param warning: нарушения правила - предупреждения.
+        :return: декоратор, возвращающий функцию без изменений.
+        """
+        def register(function):
+            self.add(Rule(name or function.__name__, kind, function, needs, warning))
+            return function
+        return register
+
+    def remove(self, name: str):
+        """ Удалить правило из реестра.
+
+        :param name: имя правила.
+        :return: None
+        """
+        rules = [rule for rule in self.rules if rule.name != name]
+        if len(rules) == len(self.rules):
+            raise KeyError(name)
+        self.rules = rules
+        self._changed()
+
+    def add_index(self, name: str, builder, scope: str=SCHEMA):
+        """ Зарегистрировать индекс, используемый правилами.
+
+        :param name: имя индекса.
+        :param builder: функция построения индекса: для уровня SCHEMA получает схему,
+                        для уровня TABLE - контекст проверки (RuleContext) с текущей таблицей.
+        :param scope: уровень индекса - SCHEMA или TABLE.
+        :return: None
+        """
+        if scope not in (SCHEMA, TABLE):
+            raise ValueError('Неизвестный уровень индекса: ' + str(scope))
+        self.indexes[name] = (builder, scope)
+        self._changed()
+
+    def compile(self, profile: bool=False):
+        """ Скомпилировать правила в функции проверки элементов каждого вида.
+
+        :param profile: измерять время выполнения правил.
+        :return: dict {вид элементов: функция проверки или None}.
+        """
+        checks = self._compiled.get(profile)
+        if checks is None:
+            for rule in self.rules:
+                for name in rule.needs:
+                    if name not in self.indexes:
+                        raise ValueError('Правило "' + str(rule.name) + '" использует неизвестный индекс "'
+                                         + str(name) + '"')
+            timings = self.timings if profile else None
+            checks = {kind: _compile_check([rule for rule in self.rules if rule.kind == kind], timings)
+                      for kind in KINDS}
+            self._compiled[profile] = checks
+        return checks
+
+    def build_indexes(self, schema: Schema):
+        """ Построить индексы уровня схемы, используемые правилами реестра.
+
+        :param schema: объект схемы.
+        :return: dict {имя: индекс}.
+        """
+        needed = set(name for rule in self.rules for name in rule.needs)
+        return {name: builder(schema) for name, (builder, scope) in self.indexes.items()
+                if scope == SCHEMA and name in needed}
+
+    def add_timings(self, timings: dict):
+        """ Добавить время выполнения правил, измеренное в другом процессе.
+
+        :param timings: словарь {имя правила: [количество вызовов, секунды]}.
+        :return: None
+        """
+        for name, (calls, seconds) in timings.items():
+            timing = self.timings.setdefault(name, [0, 0.0])
+            timing[0] += calls
+            timing[1] += seconds
+
+    def reset_timings(self):
+        """ Сбросить накопленное время выполнения правил.
+
+        :return: None
+        """
+        self.timings.clear()
+
+    def report(self):
+        """ Получить время выполнения правил, накопленное при проверках с profile=True.
+
+        :return: список кортежей (имя правила, количество вызовов, секунды) по убыванию времени.
+        """
+        return sorted(((name, calls, seconds) for name, (calls, seconds) in self.timings.items()),
+                      key=lambda item: -item[2])
+
+    def _changed(self):
+        """ Сбросить скомпилированные проверки после изменения реестра.
+
+        :return: None
+        """
+        self.version += 1
+        self._compiled = {}
+
+    def __getstate__(self):
+        # Скомпилированные проверки - замыкания, не подлежащие сериализации.
+        state = dict(self.__dict__)
+        state['_compiled'] = {}
+        return state
+
+
+class RuleContext:
+    """ Класс, моделирующий контекст проверки, передаваемый правилам.
+    """
+    __slots__ = ('schema', 'table', 'indexes', '_table_indexes', '_builders')
+
+    def __init__(self, schema, registry: RuleRegistry, indexes: dict):
+        """ Конструктор.
+
+        :param schema: схема, либо (в дочернем процессе) объект с множествами имен domains,
+                       tables и data_types.
+        :param registry: реестр правил, содержащий построители индексов уровня таблицы.
+        :param indexes: индексы уровня схемы (см. RuleRegistry.build_indexes).
+        """
+        self.schema = schema
+        # Проверяемая таблица (для полей, ограничений, индексов и их деталей).
+        self.table = None
+        self.indexes = indexes
+        self._table_indexes = {}
+        self._builders = registry.indexes
+
+    def begin_table(self, table: Table):
+        """ Начать проверку таблицы: индексы уровня таблицы строятся заново.
+
+        :param table: объект таблицы.
+        :return: None
+        """
+        self.table = table
+        self._table_indexes = {}
+
+    def index(self, name: str):
+        """ Получить индекс, объявленный правилом.
+
+        :param name: имя индекса.
+        :return: индекс.
+        """
+        index = self.indexes.get(name)
+        if index is None and name not in self.indexes:
+            index = self._table_indexes.get(name)
+            if index is None and name not in self._table_indexes:
+                index = self._table_indexes[name] = self._builders[name][0](self)
+        return index
+
+
+def _schema_rule(schema: Schema, context: RuleContext):
+    """ Проверить обязательные свойства схемы.
+
+    :return: генератор ошибок (объектов ValidationError).
+    """
     if schema.name is None:
-        raise EmptyRequiredPropertyError('name')
+        yield EmptyRequiredPropertyError('name')
 
 
-def _validate_domain(domain: Domain, schema: Schema):
-    """ Произвести валидацию объекта домена базы.
+def _domain_rule(domain: Domain, context: RuleContext):
+    """ Проверить обязательные свойства и тип домена.
 
-    :return: None
+    :return: генератор ошибок.
     """
     if domain.name is None:
-        raise EmptyRequiredPropertyError('name')
+        yield EmptyRequiredPropertyError('name')
     if domain.type is None:
-        raise EmptyRequiredPropertyError('type')
-    if domain.type not in schema.data_types:
-        raise UnsupportedDataTypeError(domain.type)
+        yield EmptyRequiredPropertyError('type')
+    elif domain.type not in context.schema.data_types:
+        yield UnsupportedDataTypeError(domain.type)
 
 
-def _validate_table(table: Table):
-    """ Произвести валидацию объекта таблицы.
+def _table_rule(table: Table, context: RuleContext):
+    """ Проверить обязательные свойства таблицы.
 
-    :return: None
+    :return: генератор ошибок.
     """
     if table.name is None:
-        raise EmptyRequiredPropertyError('name')
+        yield EmptyRequiredPropertyError('name')
 
 
-def _validate_field(field: Field, schema: Schema):
-    """ Произвести валидацию объекта поля базы.
+def _field_rule(field: Field, context: RuleContext):
+    """ Проверить обязательные свойства, тип и домен поля.
 
-    :return: None
+    :return: генератор ошибок.
     """
     if field.name is None:
-        raise EmptyRequiredPropertyError('name')
+        yield EmptyRequiredPropertyError('name')
     if field.domain is None and field.type is None:
-        raise EmptyRequiredPropertyError('domain, type')
-    if field.type is not None and field.type not in schema.data_types:
-        raise UnsupportedDataTypeError(field.type)
-    if field.domain is not None and field.domain not in schema.domains:
-        raise ElementReferenceError(field.domain)
+        yield EmptyRequiredPropertyError('domain, type')
+    if field.type is not None and field.type not in context.schema.data_types:
+        yield UnsupportedDataTypeError(field.type)
+    if field.domain is not None and field.domain not in context.schema.domains:
+        yield ElementReferenceError(field.domain)
 
 
-def _validate_constraint(constraint: Constraint, table: Table, schema: Schema):
-    """ Произвести валидацию объекта ограничения базы.
+def _constraint_rule(constraint: Constraint, context: RuleContext):
+    """ Проверить вид ограничения, единственность первичного ключа и ссылку внешнего ключа.
 
-    :return: None
+    :return: генератор ошибок.
     """
     if constraint.kind is None:
-        raise EmptyRequiredPropertyError('kind')
-    elif constraint.kind == 'PRIMARY' \
-            and any([key for key in table.constraints if key.kind == 'PRIMARY' and key != constraint]):
-        raise UniqueViolationError('PRIMARY')
-    elif constraint.kind != 'FOREIGN' \
+        yield EmptyRequiredPropertyError('kind')
+        return
+    if constraint.kind == 'PRIMARY' and context.index('primary_key') is not constraint:
+        yield UniqueViolationError('PRIMARY')
+    if constraint.kind != 'FOREIGN' \
             and (constraint.reference is not None or constraint.constraint is not None):
-        raise ForeignKeyError()
-    elif constraint.reference is not None and constraint.reference not in schema.tables:
-        raise ElementReferenceError(constraint.reference)
+        yield ForeignKeyError()
+    elif constraint.reference is not None and constraint.reference not in context.schema.tables:
+        yield ElementReferenceError(constraint.reference)
 
 
-def _validate_constraint_detail(detail: ConstraintDetail, table: Table):
-    """ Произвести валидацию объекта детали ограничения.
+def _detail_rule(detail, context: RuleContext):
+    """ Проверить ссылку детали ограничения или индекса на поле таблицы.
 
-    :return: None
+    :return: генератор ошибок.
     """
     if detail.value is None:
-        raise EmptyRequiredPropertyError('value')
-    elif detail.value not in table.fields:
-        raise ElementReferenceError(detail.value)
+        yield EmptyRequiredPropertyError('value')
+    elif detail.value not in context.table.fields:
+        yield ElementReferenceError(detail.value)
 
 
-def _validate_index(index: Index, table: Table):
-    """ Произвести валидацию объекта индекса.
+def _primary_key(context: RuleContext):
+    """ Построить индекс уровня таблицы: первое ограничение PRIMARY таблицы.
 
-    :return: None
+    :return: объект ограничения или None.
     """
-    pass
+    for constraint in context.table.constraints:
+        if constraint.kind == 'PRIMARY':
+            return constraint
+    return None
+
+
+# Реестр правил по умолчанию, содержащий встроенные правила.
+RULES = RuleRegistry()
+RULES.add_index('primary_key', _primary_key, TABLE)
+RULES.add(Rule('schema', SCHEMA, _schema_rule))
+RULES.add(Rule('domain', DOMAIN, _domain_rule))
+RULES.add(Rule('table', TABLE, _table_rule))
+RULES.add(Rule('field', FIELD, _field_rule))
+RULES.add(Rule('constraint', CONSTRAINT, _constraint_rule, ('primary_key',)))
+RULES.add(Rule('constraint_detail', CONSTRAINT_DETAIL, _detail_rule))
+RULES.add(Rule('index_detail', INDEX_DETAIL, _detail_rule))
+
+
+class IncrementalValidator:
+    """ Класс, реализующий повторную валидацию изменяемой схемы.
+
+    Результаты проверки доменов и таблиц сохраняются вместе с их отпечатками (см.
+    ram_fingerprint). При повторной проверке заново проверяются только элементы, отпечаток
+    которых изменился, а также таблицы, поля или ограничения которых ссылаются на
+    добавленные или удаленные с прошлой проверки домены и таблицы (см. Schema.references).
+    Изменения схемы должны выполняться методами Schema (add_*, remove_*), либо
+    сопровождаться вызовом Schema.touch или mark. Результаты сбрасываются при изменении
+    реестра правил; правила, проверяющие таблицу по индексам уровня схемы, зависящим от
+    других таблиц, не учитываются при определении зависимых таблиц.
+    """
+    def __init__(self, schema: Schema, registry: RuleRegistry=None):
+        self.schema = schema
+        self.registry = registry if registry is not None else RULES
+        # Результаты проверки доменов и таблиц: {имя: (отпечаток, список нарушений)}.
+        self._domains = {}
+        self._tables = {}
+        # Путь к схеме и версия реестра правил при прошлой проверке.
+        self._path = None
+        self._version = None
+        # Имена таблиц, проверенных заново при последней проверке.
+        self.checked = []
+
+    def mark(self, *elements):
+        """ Сообщить о непосредственном изменении доменов и таблиц схемы.
+
+        :param elements: измененные домены и таблицы схемы.
+        :return: None
+        """
+        self.schema.touch(*elements)
+
+    def validate(self):
+        """ Проверить схему, используя результаты прошлой проверки.
+
+        :return: список нарушений (объектов Violation) в порядке следования элементов.
+        """
+        schema = self.schema
+        path = ('Схема ' + str(schema.name),)
+        if path != self._path or self.registry.version != self._version:
+            self._domains = {}
+            self._tables = {}
+            self._path = path
+            self._version = self.registry.version
+        checks = self.registry.compile()
+        context = RuleContext(schema, self.registry, self.registry.build_indexes(schema))
+        # Домены и таблицы, наличие которых изменилось, и зависящие от них таблицы.
+        dependent = set()
+        changed_domains = set(schema.domains).symmetric_difference(self._domains)
+        changed_tables = set(schema.tables).symmetric_difference(self._tables)
+        if self._tables and (changed_domains or changed_tables):
+            references = schema.references
+            for name in changed_domains:
+                dependent.update(table.name for table, _ in references.fields_of_domain(name))
+            for name in changed_tables:
+                dependent.update(table.name for table, _ in references.referencing(name))
+
+        violations = []
+        if checks[SCHEMA] is not None:
+            _collect(violations, path, checks[SCHEMA](schema, context))
+        domains = {}
+        for name, domain in schema.domains.items():
+            digest = fingerprint(domain)
+            cached = self._domains.get(name)
+            if cached is None or cached[0] != digest:
+                cached = (digest, [])
+                if checks[DOMAIN] is not None:
+                    _collect(cached[1], path + ('Домен ' + str(domain.name),), checks[DOMAIN](domain, context))
+            domains[name] = cached
+            violations.extend(cached[1])
+        tables = {}
+        self.checked = []
+        for name, table in schema.tables.items():
+            digest = fingerprint(table)
+            cached = self._tables.get(name)
+            if cached is None or cached[0] != digest or name in dependent:
+                cached = (digest, _table_violations(table, context, path, checks))
+                self.checked.append(name)
+            tables[name] = cached
+            violations.extend(cached[1])
+        self._domains = domains
+        self._tables = tables
+        return violations
+
+
+class _SchemaNames:
+    """ Класс, содержащий имена элементов схемы, необходимые для проверки ее таблиц.
+
+    Заменяет схему при проверке таблиц в дочерних процессах.
+    """
+    __slots__ = ('domains', 'tables', 'data_types')
 
+    def __init__(self, schema: Schema):
+        self.domains = frozenset(schema.domains)
+        self.tables = frozenset(schema.tables)
+        self.data_types = schema.data_types
 
-def _validate_index_detail(detail: IndexDetail, table: Table):
-    """ Произвести валидауию объекта детали индекса.
 
-    :return: None
+class Violation:
+    """ Класс, моделирующий нарушение, найденное при валидации схемы.
     """
-    if detail.value is None:
-        raise EmptyRequiredPropertyError('value')
-    if detail.value not in table.fields:
-        raise ElementReferenceError(detail.value)
+    __slots__ = ('path', 'error', 'rule', 'warning')
+
+    def __init__(self, path: tuple, error, rule: Rule=None):
+        # Обозначения элементов от схемы до элемента, содержащего нарушение.
+        self.path = path
+        # Объект ValidationError, описывающий нарушение.
+        self.error = error
+        # Имя нарушенного правила.
+        self.rule = rule.name if rule is not None else None
+        # Признак предупреждения (см. Rule).
+        self.warning = rule.warning if rule is not None else False
+
+    def __str__(self):
+        return '. '.join(self.path) + '. ' + str(self.error)
 
 
 class ValidationError(Exception):
@@ -182,7 +766,7 @@ class UnsupportedDataTypeError(ValidationError):
         return 'Задан неподдерживаемый тип данных \"' + self.type + '\"'
 
 
-class ElementReferenceError(ValueError):
+class ElementReferenceError(ValidationError, ValueError):
     """ Подкласс иключений, порождемых в случае обнаружения ссылок на неопределенные
     элементы Схемы.
     """
@@ -210,3 +794,13 @@ class ForeignKeyError(ValidationError):
     """
     def __str__(self):
         return 'Неверная структура ограничения "Внешний ключ"'
+
+
+class SchemaValidationError(ValidationError):
+    """ Подкласс исключений, порождаемых в случае обнаружения нарушений при валидации схемы.
+    """
+    def __init__(self, violations):
+        self.violations = violations
+
+    def __str__(self):
+        return '\n'.join(str(violation) for violation in self.violations)
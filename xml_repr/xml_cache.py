@@ -0,0 +1,183 @@
+""" Модуль, содержащий реализацию дискового кэша результатов разбора XML-представления базы.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from ram_repr import ram_snapshot
+
+# Версия формата записей кэша. Увеличивается при изменении классов RAM-представления,
+# чтобы записи, сохраненные прежней версией, не загружались.
+CACHE_VERSION = 6
+
+
+class ParseCache:
+    """ Дисковый кэш провалидированных RAM-представлений схем, считанных из XML-файлов.
+
+    Запись кэша идентифицируется хэшем содержимого и размером файла. Для того чтобы не
+    вычислять хэш при каждом обращении, в индексе кэша для каждого пути хранятся размер,
+    время изменения и хэш файла: пока размер и время изменения совпадают, используется
+    сохраненный хэш. Записи хранятся в виде двоичных снимков (см. ram_snapshot) и вытесняются
+    по давности последнего использования, когда суммарный размер кэша превышает заданный.
+    """
+    def __init__(self, directory: str, max_size: int=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+        self._index_file = os.path.join(directory, 'index.json')
+        self._index = self._load_index()
+
+    def get(self, path: str):
+        """ Получить схемы, ранее сохраненные для файла.
+
+        :param path: путь к XML-файлу.
+        :return: список схем или None, если запись отсутствует.
+        """
+        entry = self._entry_file(path)
+        try:
+            schemas = ram_snapshot.load(entry)
+        except FileNotFoundError:
+            return None
+        except (OSError, ram_snapshot.SnapshotError):
+            # Поврежденная или несовместимая запись удаляется и считается отсутствующей.
+            self._remove(entry)
+            return None
+        # Время изменения записи служит отметкой последнего использования для вытеснения.
+        os.utime(entry)
+        return schemas
+
+    def put(self, path: str, schemas: list):
+        """ Сохранить схемы, считанные из файла.
+
+        :param path: путь к XML-файлу.
+        :param schemas: список провалидированных схем.
+        :return: None
+        """
+        entry = self._entry_file(path)
+        descriptor, temp_file = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                ram_snapshot.dump(schemas, file)
+            os.replace(temp_file, entry)
+        except BaseException:
+            self._remove(temp_file)
+            raise
+        self._evict()
+
+    def invalidate(self, path: str=None):
+        """ Удалить из кэша запись для файла, либо все записи.
+
+        :param path: путь к XML-файлу; если не задан, кэш очищается полностью.
+        :return: None
+        """
+        if path is None:
+            for name in os.listdir(self.directory):
+                if name.endswith(ram_snapshot.SNAPSHOT_EXTENSION):
+                    self._remove(os.path.join(self.directory, name))
+            self._index = {}
+        else:
+            key = os.path.abspath(path)
+            if os.path.exists(path):
+                self._remove(self._entry_file(path))
+            elif key in self._index:
+                known = self._index[key]
+                self._remove(os.path.join(self.directory, self._entry_name(known['size'], known['hash'])))
+            self._index.pop(key, None)
+        self._save_index()
+
+    def _entry_file(self, path: str):
+        """ Получить путь к записи кэша для файла, при необходимости вычислив хэш его содержимого.
+
+        :param path: путь к XML-файлу.
+        :return: str
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+        known = self._index.get(key)
+        if known is None or known['size'] != stat.st_size or known['mtime'] != stat.st_mtime_ns:
+            known = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': _content_hash(path)}
+            self._index[key] = known
+            self._save_index()
+        return os.path.join(self.directory, self._entry_name(known['size'], known['hash']))
+
+    @staticmethod
+    def _entry_name(size: int, content_hash: str):
+        """ Получить имя файла записи кэша.
+
+        :param size: размер XML-файла.
+        :param content_hash: хэш содержимого XML-файла.
+        :return: str
+        """
+        return '%s-%d-v%d%s' % (content_hash, size, CACHE_VERSION, ram_snapshot.SNAPSHOT_EXTENSION)
+
+    def _evict(self):
+        """ Удалить давно не использовавшиеся записи, пока размер кэша превышает допустимый.
+
+        :return: None
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(ram_snapshot.SNAPSHOT_EXTENSION):
+                continue
+            file_name = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(file_name)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, file_name))
+            total += stat.st_size
+        entries.sort()
+        for _, size, file_name in entries:
+            if total <= self.max_size:
+                break
+            self._remove(file_name)
+            total -= size
+
+    def _load_index(self):
+        """ Загрузить индекс кэша.
+
+        :return: dict
+        """
+        try:
+            with open(self._index_file, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        """ Сохранить индекс кэша.
+
+        :return: None
+        """
+        descriptor, temp_file = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            json.dump(self._index, file, ensure_ascii=False)
+        os.replace(temp_file, self._index_file)
+
+    @staticmethod
+    def _remove(file_name: str):
+        """ Удалить файл, если он существует.
+
+        :param file_name: путь к удаляемому файлу.
+        :return: None
+        """
+        try:
+            os.remove(file_name)
+        except FileNotFoundError:
+            pass
+
+
+def _content_hash(path: str):
+    """ Вычислить хэш содержимого файла.
+
+    :param path: путь к файлу.
+    :return: str
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
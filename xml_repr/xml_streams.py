@@ -0,0 +1,129 @@
+""" Модуль, содержащий методы открытия потоков чтения и записи XML-представления базы,
+в том числе сжатых (gzip, bz2, xz).
+"""
+
+import bz2
+import codecs
+import gzip
+import io
+import lzma
+import os
+from contextlib import contextmanager
+
+# Имя файла манифеста и каталога фрагментов таблиц в раздельном представлении схемы.
+SPLIT_MANIFEST = 'schema.xml'
+SPLIT_TABLES = 'tables'
+
+# Методы открытия сжатых файлов по расширению.
+_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open
+}
+
+# Классы распаковки по сигнатуре начала потока.
+_SIGNATURES = (
+    (b'\x1f\x8b', lambda file: gzip.GzipFile(fileobj=file, mode='rb')),
+    (b'BZh', bz2.BZ2File),
+    (b'\xfd7zXZ\x00', lzma.LZMAFile)
+)
+
+
+def is_path(source):
+    """ Проверить, является ли источник путем к файлу (а не файловым объектом).
+
+    :param source: путь или файловый объект.
+    :return: bool
+    """
+    return isinstance(source, (str, bytes, os.PathLike))
+
+
+def is_compressed(path):
+    """ Проверить, задан ли путь к сжатому файлу.
+
+    :param path: путь к файлу.
+    :return: bool
+    """
+    return os.path.splitext(os.fsdecode(path))[1].lower() in _OPENERS
+
+
+@contextmanager
+def open_input(source):
+    """ Открыть XML-представление для чтения в двоичном режиме.
+
+    Сжатые данные распаковываются потоково, без создания временной несжатой копии.
+    Формат сжатия определяется по сигнатуре данных. Переданный файловый объект
+    по завершении не закрывается.
+
+    :param source: путь к файлу или файловый объект, открытый для чтения.
+    :return: двоичный файловый объект.
+    """
+    if is_path(source):
+        with open(source, 'rb') as file:
+            stream = _decompressed(file)
+            try:
+                yield stream
+            finally:
+                if stream is not file:
+                    stream.close()
+    else:
+        stream = _decompressed(source)
+        try:
+            yield stream
+        finally:
+            if stream is not source:
+                stream.close()
+
+
+@contextmanager
+def open_output(target, encoding: str='utf-8'):
+    """ Открыть XML-представление для записи в текстовом режиме.
+
+    Если путь оканчивается на .gz, .bz2, .xz или .lzma, данные сжимаются потоково.
+    Переданный файловый объект (текстовый или двоичный) по завершении не закрывается.
+
+    :param target: путь к файлу или файловый объект, открытый для записи.
+    :param encoding: кодировка документа.
+    :return: текстовый файловый объект.
+    """
+    if is_path(target):
+        opener = _OPENERS.get(os.path.splitext(os.fsdecode(target))[1].lower())
+        if opener is None:
+            stream = open(target, 'w', encoding=encoding, newline='')
+        else:
+            stream = opener(target, 'wt', encoding=encoding, newline='')
+        with stream:
+            yield stream
+    elif isinstance(target, io.TextIOBase):
+        yield target
+    elif isinstance(target, io.IOBase):
+        stream = io.TextIOWrapper(target, encoding=encoding, newline='')
+        try:
+            yield stream
+        finally:
+            stream.flush()
+            stream.detach()
+    else:
+        yield codecs.getwriter(encoding)(target)
+
+
+def _decompressed(file):
+    """ Получить поток распакованных данных, если данные файла сжаты.
+
+    :param file: двоичный файловый объект.
+    :return: двоичный файловый объект.
+    """
+    peek = getattr(file, 'peek', None)
+    if peek is not None:
+        head = peek(8)
+    elif getattr(file, 'seekable', lambda: False)():
+        position = file.tell()
+        head = file.read(8)
+        file.seek(position)
+    else:
+        return file
+    for signature, decompressor in _SIGNATURES:
+        if head.startswith(signature):
+            return decompressor(file)
+    return file
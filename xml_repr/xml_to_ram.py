@@ -1,5 +1,27 @@
+import json
+import os
+import re
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from mmap import ACCESS_READ
+from mmap import mmap
+from weakref import finalize
 from xml.dom.minidom import parse
+from xml.etree.ElementTree import XMLParser
+from xml.etree.ElementTree import iterparse
+from xml.etree.ElementTree import parse as parse_tree
+from xml.parsers.expat import ParserCreate
 
+from ram_repr.ram_attributes import CONSTRAINT
+from ram_repr.ram_attributes import CONSTRAINT_DETAIL
+from ram_repr.ram_attributes import DOMAIN
+from ram_repr.ram_attributes import FIELD
+from ram_repr.ram_attributes import INDEX
+from ram_repr.ram_attributes import INDEX_DETAIL
+from ram_repr.ram_attributes import SCHEMA
+from ram_repr.ram_attributes import TABLE
+from ram_repr.ram_attributes import compile_xml_reader
 from ram_repr.ram_structure import Constraint
 from ram_repr.ram_structure import ConstraintDetail
 from ram_repr.ram_structure import Domain
@@ -9,26 +31,654 @@ from ram_repr.ram_structure import IndexDetail
 from ram_repr.ram_structure import Schema
 from ram_repr.ram_structure import Table
 from ram_repr.ram_validation import validate_schema
+from xml_repr.xml_streams import SPLIT_MANIFEST
+from xml_repr.xml_streams import is_compressed
+from xml_repr.xml_streams import is_path
+from xml_repr.xml_streams import open_input
 
 
-def read(path):
+def read(path, cache=None):
     """ Считать модель базы из XML-файла.
 
-    :param path: путь к XML-файлу с текстовым представлением базы.
+    Документ может содержать одну схему (корневой элемент dbd_schema), либо несколько
+    схем, объединенных корневым элементом dbd_schemas.
+
+    :param path: путь к XML-файлу (в том числе сжатому) или файловый объект.
+    :param cache: кэш результатов разбора (xml_cache.ParseCache); при попадании в кэш
+                  разбор и валидация не выполняются. Используется только для путей к файлам.
     :return: список схем базы (на случай, если их более 1)
     """
+    if cache is not None and not is_path(path):
+        cache = None
+    if cache is not None:
+        schemas = cache.get(path)
+        if schemas is not None:
+            return schemas
     schemas = []
-    dom = parse(path)
+    with open_input(path) as file:
+        dom = parse(file)
     for child in dom.childNodes:
         if child.tagName == 'dbd_schema':
             schema = _parse_schema(child)
             validate_schema(schema)
             schemas.append(schema)
+        elif child.tagName == 'dbd_schemas':
+            # Документ, объединяющий несколько схем.
+            for node in child.childNodes:
+                if _check_node(node):
+                    continue
+                if node.tagName != 'dbd_schema':
+                    raise UnsupportedTagError(node.tagName)
+                schema = _parse_schema(node)
+                validate_schema(schema)
+                schemas.append(schema)
         else:
             raise UnsupportedTagError(child.tagName)
+    if cache is not None:
+        cache.put(path, schemas)
     return schemas
 
 
+def read_iter(path):
+    """ Потоково считать модель базы из XML-файла.
+
+    Файл разбирается по событиям iterparse, поэтому в памяти одновременно находится
+    не более одного элемента таблицы: после закрытия тэга </table> из него создается
+    объект таблицы, а сам элемент удаляется из дерева. Первым для каждой схемы выдается
+    объект схемы (с уже заполненными доменами), затем - по одному объекты ее таблиц.
+    Таблицы в схему не добавляются и валидация не производится: для этого требуется
+    схема целиком (см. read).
+
+    :param path: путь к XML-файлу (в том числе сжатому) или файловый объект.
+    :return: генератор объектов Schema и Table.
+    """
+    with open_input(path) as file:
+        yield from _iterparse_schema(file)
+
+
+def _iterparse_schema(file):
+    """ Потоково разобрать XML-представление базы (см. read_iter).
+
+    :param file: двоичный файловый объект.
+    :return: генератор объектов Schema и Table.
+    """
+    stack = []
+    # Глубина элемента схемы: 1 для документа с одной схемой, 2 для документа dbd_schemas.
+    offset = 0
+    schema = None
+    schema_yielded = False
+    table_names = set()
+    pending = None
+    for event, element in iterparse(file, events=('start', 'end')):
+        # Хвостовой текст элемента известен только к следующему событию.
+        if pending is not None:
+            _check_text(pending.tail)
+            pending = None
+
+        if event == 'start':
+            stack.append(element)
+            if len(stack) == 1 and element.tag == 'dbd_schemas':
+                offset = 1
+                continue
+            depth = len(stack) - offset
+            if depth == 1:
+                if element.tag != 'dbd_schema':
+                    raise UnsupportedTagError(element.tag)
+                if offset:
+                    _check_text(stack[0].text)
+                try:
+                    schema = _create_schema(element.attrib)
+                except UnsupportedAttributeError as ex:
+                    raise ParseError('Не удалось создать схему. ' + str(ex))
+                schema_yielded = False
+                table_names = set()
+            elif depth == 2:
+                _check_text(stack[offset].text)
+                if element.tag not in ('domains', 'tables', 'custom'):
+                    raise ParseError('Схема ' + schema.name + ': ' + str(UnsupportedTagError(element.tag)))
+                if element.tag == 'tables' and not schema_yielded:
+                    schema_yielded = True
+                    yield schema
+            continue
+
+        stack.pop()
+        depth = len(stack) + 1 - offset
+        if depth == 0:
+            _check_text(element.text)
+            element.clear()
+        elif depth == 1:
+            _check_text(element.text)
+            if not schema_yielded:
+                yield schema
+            element.clear()
+            if offset:
+                pending = element
+                stack[-1].remove(element)
+        elif depth == 2:
+            _check_text(element.text)
+            pending = element
+            element.clear()
+        elif depth == 3:
+            parent = stack[-1]
+            try:
+                if parent.tag == 'domains':
+                    _build_domain(schema, element)
+                elif parent.tag == 'tables':
+                    table = _build_table(element)
+                    if table.name in table_names:
+                        raise UniqueViolationError(table.name)
+                    table_names.add(table.name)
+                    yield table
+            except ParseError as ex:
+                raise ParseError('Схема ' + schema.name + ': ' + str(ex))
+            pending = element
+            element.clear()
+            parent.remove(element)
+
+
+def read_parallel(path, workers=None):
+    """ Считать модель базы из XML-файла, разбирая таблицы в нескольких процессах.
+
+    Содержимое секции <tables> делится на диапазоны байт, границы которых выравниваются
+    по началу элементов <table>. Каждый диапазон разбирается в отдельном процессе,
+    результаты объединяются в исходном порядке таблиц, после чего схема валидируется
+    (большие схемы - в том же количестве процессов, см. ram_validation.validate).
+    Сжатые файлы, файловые объекты и документы с несколькими схемами не делятся
+    на диапазоны и считываются методом read.
+
+    :param path: путь к XML-файлу с текстовым представлением базы.
+    :param workers: количество процессов (по умолчанию - количество ядер).
+    :return: список схем базы.
+    """
+    if not is_path(path) or is_compressed(path):
+        return read(path)
+    workers = workers or os.cpu_count() or 1
+    with open(path, 'rb') as file, mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+        opening = _TABLES_OPEN.search(data)
+        closing = data.rfind(b'</tables')
+        if opening is None or closing < opening.end() or _is_combined(data):
+            return read(path)
+        encoding = _document_encoding(data)
+        # Схема с доменами разбирается из документа, из которого вырезано содержимое <tables>.
+        header = data[:opening.end()] + data[closing:]
+        chunks = _split_tables(data, opening.end(), closing, workers * 4 if workers > 1 else 1)
+
+    schema = next(item for item in _iterparse_schema(BytesIO(header)) if isinstance(item, Schema))
+    if workers == 1 or len(chunks) == 1:
+        # Пул процессов не ускоряет разбор в одном процессе, поэтому не запускается.
+        _merge_tables(schema, (_parse_tables_chunk(path, encoding, start, end) for start, end in chunks))
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(_parse_tables_chunk, path, encoding, start, end) for start, end in chunks]
+            try:
+                _merge_tables(schema, (future.result() for future in futures))
+            except ParseError:
+                for future in futures:
+                    future.cancel()
+                raise
+    validate_schema(schema, workers)
+    return [schema]
+
+
+def _merge_tables(schema: Schema, results):
+    """ Добавить в схему таблицы, разобранные по диапазонам, в порядке диапазонов.
+
+    :param schema: объект схемы.
+    :param results: итератор списков таблиц диапазонов.
+    :return: None
+    """
+    try:
+        for tables in results:
+            for table in tables:
+                if table.name in schema.tables:
+                    raise UniqueViolationError(table.name)
+                schema.tables[table.name] = table
+    except ParseError as ex:
+        raise ParseError('Схема ' + schema.name + ': ' + str(ex))
+
+
+_ROOT = re.compile(rb'<([A-Za-z_][\w.:-]*)')
+_TABLES_OPEN = re.compile(rb'<tables\s*>')
+_TABLE_START = re.compile(rb'<table[\s/>]')
+_ENCODING = re.compile(rb'^<\?xml[^>]*encoding=["\']([A-Za-z0-9._-]+)["\']')
+# Закрывающие тэги элементов, смещения которых сохраняются в индексе read_lazy.
+_CLOSING_TAGS = {tag: re.compile(b'</' + tag.encode() + rb'\s*>') for tag in ('domains', 'table')}
+
+
+def _is_combined(data):
+    """ Проверить, объединяет ли документ несколько схем (корневой элемент dbd_schemas).
+
+    :param data: содержимое файла.
+    :return: bool
+    """
+    match = _ROOT.search(data)
+    return match is not None and match.group(1) == b'dbd_schemas'
+
+
+def _document_encoding(data):
+    """ Определить кодировку XML-документа по его объявлению.
+
+    :param data: содержимое файла.
+    :return: str
+    """
+    match = _ENCODING.match(data)
+    return match.group(1).decode('ascii') if match else 'utf-8'
+
+
+def _split_tables(data, start, end, count):
+    """ Разбить содержимое секции <tables> на диапазоны, выровненные по началу элементов <table>.
+
+    :param data: содержимое файла.
+    :param start: смещение начала содержимого секции.
+    :param end: смещение конца содержимого секции.
+    :param count: желаемое количество диапазонов.
+    :return: список пар смещений (начало, конец).
+    """
+    step = max((end - start) // count, 1)
+    bounds = [start]
+    position = start + step
+    while position < end:
+        match = _TABLE_START.search(data, position, end)
+        if match is None:
+            break
+        if match.start() > bounds[-1]:
+            bounds.append(match.start())
+        position = match.start() + step
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _parse_tables_chunk(path, encoding, start, end):
+    """ Разобрать диапазон байт секции <tables> (выполняется в дочернем процессе).
+
+    :param path: путь к XML-файлу.
+    :param encoding: кодировка документа.
+    :param start: смещение начала диапазона.
+    :param end: смещение конца диапазона.
+    :return: список объектов таблиц в порядке следования в файле.
+    """
+    with open(path, 'rb') as file:
+        file.seek(start)
+        chunk = file.read(end - start)
+    parser = XMLParser(encoding=encoding)
+    parser.feed(b'<tables>')
+    parser.feed(chunk)
+    parser.feed(b'</tables>')
+    tables = []
+    try:
+        tables_element = parser.close()
+        _check_text(tables_element.text)
+        for table_element in tables_element:
+            tables.append(_build_table(table_element))
+            _check_text(table_element.tail)
+    except ParseError as ex:
+        # Исключения с собственными аргументами конструктора не восстанавливаются
+        # при передаче из дочернего процесса, поэтому передается только сообщение.
+        raise ParseError(str(ex))
+    return tables
+
+
+def read_lazy(path, index_path=None):
+    """ Считать модель базы из XML-файла с отложенным разбором таблиц.
+
+    При первом открытии файл однократно сканируется, и для каждого элемента <table>
+    запоминается диапазон байт, который он занимает. Индекс сохраняется рядом с файлом,
+    поэтому последующие открытия сканирование не выполняют. Домены разбираются сразу,
+    а таблица - только при первом обращении к ней через Schema.tables; ее текст
+    читается из отображенного в память файла. Валидация схемы не производится.
+    Сжатые файлы и файловые объекты не допускают произвольного доступа, поэтому
+    они, как и документы с несколькими схемами, разбираются целиком.
+
+    :param path: путь к XML-файлу с текстовым представлением базы.
+    :param index_path: путь к файлу индекса (по умолчанию - path + '.idx'; пустая строка - не сохранять индекс).
+    :return: список схем базы.
+    """
+    if not is_path(path) or is_compressed(path):
+        return _read_unvalidated(path)
+    with open(path, 'rb') as file, mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+        combined = _is_combined(data)
+    if combined:
+        return _read_unvalidated(path)
+    if index_path is None:
+        index_path = path + '.idx'
+    index = _load_offsets(path, index_path) if index_path else None
+    if index is None:
+        index = _scan_offsets(path)
+        if index_path:
+            _save_offsets(index, index_path)
+
+    try:
+        schema = _create_schema(index['schema'])
+    except UnsupportedAttributeError as ex:
+        raise ParseError('Не удалось создать схему. ' + str(ex))
+    tables = LazyTables(path, index['encoding'], schema.name, index['tables'])
+    try:
+        if index['domains'] is not None:
+            domains_element = tables.parse_fragment(*index['domains'])
+            _check_text(domains_element.text)
+            for domain_element in domains_element:
+                _build_domain(schema, domain_element)
+                _check_text(domain_element.tail)
+    except ParseError as ex:
+        tables.close()
+        raise ParseError('Схема ' + schema.name + ': ' + str(ex))
+    schema.tables = tables
+    return [schema]
+
+
+def read_split(directory, tables=None, workers=None):
+    """ Считать модель базы из раздельного представления (см. ram_to_xml.write_split).
+
+    Из манифеста считываются атрибуты схемы, домены и список файлов таблиц, после чего
+    фрагменты таблиц разбираются в пуле процессов. Если задан список таблиц, считываются
+    только они; в этом случае схема неполна, и валидация не производится.
+
+    :param directory: каталог раздельного представления.
+    :param tables: имена считываемых таблиц (по умолчанию - все).
+    :param workers: количество процессов (по умолчанию - количество ядер).
+    :return: список схем базы.
+    """
+    root = parse_tree(os.path.join(directory, SPLIT_MANIFEST)).getroot()
+    if root.tag != 'dbd_schema':
+        raise UnsupportedTagError(root.tag)
+    try:
+        schema = _create_schema(root.attrib)
+    except UnsupportedAttributeError as ex:
+        raise ParseError('Не удалось создать схему. ' + str(ex))
+
+    files = {}
+    try:
+        _check_text(root.text)
+        for child in root:
+            if child.tag == 'domains':
+                _check_text(child.text)
+                for domain_element in child:
+                    _build_domain(schema, domain_element)
+                    _check_text(domain_element.tail)
+            elif child.tag == 'tables':
+                _check_text(child.text)
+                for fragment in child:
+                    if fragment.tag != 'fragment':
+                        raise UnsupportedTagError(fragment.tag)
+                    name = fragment.get('table')
+                    file_name = fragment.get('file')
+                    if name is None or file_name is None:
+                        raise ParseError('Для фрагмента таблицы должны быть заданы атрибуты table и file')
+                    if name in files:
+                        raise UniqueViolationError(name)
+                    files[name] = os.path.join(directory, *file_name.split('/'))
+                    _check_text(fragment.tail)
+            elif child.tag != 'custom':
+                raise UnsupportedTagError(child.tag)
+            _check_text(child.tail)
+
+        names = list(files) if tables is None else list(tables)
+        for name in names:
+            if name not in files:
+                raise MissingTableError(name)
+
+        workers = min(workers or os.cpu_count() or 1, len(names))
+        paths = [files[name] for name in names]
+        if workers <= 1:
+            _add_tables(schema, names, map(_parse_table_file, paths))
+        else:
+            with ProcessPoolExecutor(workers) as executor:
+                chunk_size = max(len(paths) // (workers * 4), 1)
+                _add_tables(schema, names, executor.map(_parse_table_file, paths, chunksize=chunk_size))
+    except ParseError as ex:
+        raise ParseError('Схема ' + schema.name + ': ' + str(ex))
+
+    if tables is None:
+        validate_schema(schema, workers)
+    return [schema]
+
+
+def _add_tables(schema, names, tables):
+    """ Добавить в схему таблицы, считанные из файлов фрагментов.
+
+    :param schema: схема, в которую добавляются таблицы.
+    :param names: имена таблиц в порядке, указанном в манифесте.
+    :param tables: объекты таблиц в том же порядке.
+    :return: None
+    """
+    for name, table in zip(names, tables):
+        if table.name != name:
+            raise ParseError('Фрагмент не содержит таблицу \"' + name + '\"')
+        schema.tables[name] = table
+
+
+def _parse_table_file(path):
+    """ Разобрать файл фрагмента таблицы (выполняется в дочернем процессе).
+
+    :param path: путь к файлу фрагмента.
+    :return: объект таблицы.
+    """
+    try:
+        return _build_table(parse_tree(path).getroot())
+    except ParseError as ex:
+        # Исключения с собственными аргументами конструктора не восстанавливаются
+        # при передаче из дочернего процесса, поэтому передается только сообщение.
+        raise ParseError(str(ex))
+
+
+def _read_unvalidated(path):
+    """ Считать схемы из XML-файла целиком без валидации.
+
+    :param path: путь к XML-файлу или файловый объект.
+    :return: список схем базы.
+    """
+    schemas = []
+    for item in read_iter(path):
+        if isinstance(item, Schema):
+            schemas.append(item)
+        else:
+            schemas[-1].tables[item.name] = item
+    return schemas
+
+
+def _scan_offsets(path):
+    """ Просканировать XML-файл и построить индекс смещений элементов таблиц.
+
+    :param path: путь к XML-файлу.
+    :return: словарь индекса.
+    """
+    index = {
+        'size': None,
+        'mtime': None,
+        'encoding': 'utf-8',
+        'schema': None,
+        'domains': None,
+        'tables': []
+    }
+    stack = []
+    names = set()
+    starts = {}
+    parser = ParserCreate()
+
+    with open(path, 'rb') as file, mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+        stat = os.fstat(file.fileno())
+        index['size'] = stat.st_size
+        index['mtime'] = stat.st_mtime_ns
+
+        def declaration(version, encoding, standalone):
+            if encoding:
+                index['encoding'] = encoding
+
+        def start(tag, attrs):
+            stack.append(tag)
+            depth = len(stack)
+            if depth == 1:
+                if tag != 'dbd_schema':
+                    raise UnsupportedTagError(tag)
+                index['schema'] = attrs
+            elif depth == 2 and tag == 'domains':
+                starts[depth] = (parser.CurrentByteIndex, None)
+            elif depth == 3 and stack[1] == 'tables':
+                if tag != 'table':
+                    raise UnsupportedTagError(tag)
+                starts[depth] = (parser.CurrentByteIndex, attrs.get('name'))
+
+        def end(tag):
+            depth = len(stack)
+            if depth == 2 and tag == 'domains':
+                index['domains'] = (starts[depth][0], _element_end(data, parser.CurrentByteIndex, tag))
+            elif depth == 3 and stack[1] == 'tables':
+                position, name = starts[depth]
+                if name in names:
+                    raise ParseError('Схема ' + str(index['schema'].get('name')) + ': '
+                                     + str(UniqueViolationError(name)))
+                names.add(name)
+                index['tables'].append((name, position, _element_end(data, parser.CurrentByteIndex, tag)))
+            stack.pop()
+
+        parser.XmlDeclHandler = declaration
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.ParseFile(file)
+    return index
+
+
+def _element_end(data, position, tag):
+    """ Определить смещение конца элемента по позиции события его закрытия.
+
+    Для явного закрывающего тэга expat сообщает позицию его начала, для пустого
+    элемента (<tag/>) - позицию сразу за ним.
+
+    :param data: содержимое файла.
+    :param position: значение CurrentByteIndex в обработчике закрытия элемента.
+    :param tag: имя элемента (domains или table).
+    :return: смещение байта, следующего за элементом.
+    """
+    match = _CLOSING_TAGS[tag].match(data, position)
+    if match is None:
+        return position
+    return match.end()
+
+
+def _load_offsets(path, index_path):
+    """ Загрузить сохраненный индекс смещений, если он соответствует файлу.
+
+    :param path: путь к XML-файлу.
+    :param index_path: путь к файлу индекса.
+    :return: словарь индекса или None, если индекс отсутствует или устарел.
+    """
+    try:
+        with open(index_path, encoding='utf-8') as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+    stat = os.stat(path)
+    if index.get('size') != stat.st_size or index.get('mtime') != stat.st_mtime_ns:
+        return None
+    return index
+
+
+def _save_offsets(index, index_path):
+    """ Сохранить индекс смещений рядом с XML-файлом.
+
+    :param index: словарь индекса.
+    :param index_path: путь к файлу индекса.
+    :return: None
+    """
+    try:
+        with open(index_path, 'w', encoding='utf-8') as file:
+            json.dump(index, file, ensure_ascii=False)
+    except OSError:
+        # Индекс лишь ускоряет повторные открытия, поэтому невозможность
+        # его записи (например, каталог только для чтения) не является ошибкой.
+        pass
+
+
+class LazyTables(MutableMapping):
+    """ Словарь таблиц схемы, разбирающий таблицу из XML-файла при первом обращении к ней.
+
+    Словарь держит файл открытым и отображенным в память до вызова close (или выхода из
+    блока with). Если словарь удаляется без закрытия, файл закрывается при его удалении
+    сборщиком мусора.
+    """
+    def __init__(self, path, encoding, schema_name, offsets):
+        self.encoding = encoding
+        self.schema_name = schema_name
+        self._offsets = {name: (start, end) for name, start, end in offsets}
+        self._tables = {}
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self._finalizer = finalize(self, _close_mapping, self._data, self._file)
+
+    def close(self):
+        """ Закрыть отображение файла. Не разобранные таблицы становятся недоступны.
+
+        :return: None
+        """
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def parse_fragment(self, start, end):
+        """ Разобрать фрагмент файла, содержащий один элемент.
+
+        :param start: смещение начала элемента.
+        :param end: смещение конца элемента.
+        :return: элемент ElementTree.
+        """
+        parser = XMLParser(encoding=self.encoding)
+        parser.feed(self._data[start:end])
+        return parser.close()
+
+    def __getitem__(self, name):
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+        offsets = self._offsets[name]
+        try:
+            table = _build_table(self.parse_fragment(*offsets))
+        except ParseError as ex:
+            raise ParseError('Схема ' + str(self.schema_name) + ': ' + str(ex))
+        self._tables[name] = table
+        return table
+
+    def __setitem__(self, name, table):
+        self._offsets.setdefault(name, None)
+        self._tables[name] = table
+
+    def __delitem__(self, name):
+        del self._offsets[name]
+        self._tables.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __reduce__(self):
+        # Отображение файла не переносится между процессами, поэтому
+        # сериализуется обычный словарь с уже разобранными таблицами.
+        return dict, (list(self.items()),)
+
+
+def _close_mapping(data, file):
+    """ Закрыть отображение файла и сам файл словаря LazyTables.
+
+    :param data: отображение файла в память.
+    :param file: файловый объект.
+    :return: None
+    """
+    data.close()
+    file.close()
+
+
 def _parse_schema(dom_schema):
     """ Преобразовать dom-структуру, представляющу схему базы, в объект.
 
@@ -36,7 +686,7 @@ def _parse_schema(dom_schema):
     :return: объект схемы.
     """
     try:
-        schema = _create_schema(dom_schema._attrs)
+        schema = _create_schema(_attributes(dom_schema))
     except UnsupportedAttributeError as ex:
         raise ParseError('Не удалось создать схему. ' + str(ex))
     try:
@@ -68,7 +718,7 @@ def _parse_domain(schema, dom):
                 continue
             if domain_element.tagName != 'domain':
                 raise UnsupportedTagError(domain_element.tagName)
-            domain = _create_domain(domain_element._attrs)
+            domain = _create_domain(_attributes(domain_element))
             if domain.name in schema.domains:
                 raise UniqueViolationError(domain.name)
             schema.domains[domain.name] = domain
@@ -89,7 +739,7 @@ def _parse_table(schema, dom):
             continue
         if table_element.tagName != 'table':
             raise UnsupportedTagError(table_element.tagName)
-        table = _create_table(table_element._attrs)
+        table = _create_table(_attributes(table_element))
         if table.name in schema.tables:
             raise UniqueViolationError(table.name)
         schema.tables[table.name] = table
@@ -99,31 +749,31 @@ def _parse_table(schema, dom):
                 if _check_node(child):
                     continue
                 if child.tagName == 'field':
-                    field = _create_field(child._attrs)
+                    field = _create_field(_attributes(child))
                     if field.name in table.fields:
                         raise UniqueViolationError(field.name)
                     table.fields[field.name] = field
 
                 elif child.tagName == 'index':
-                    index = _create_index(child._attrs)
+                    index = _create_index(_attributes(child))
                     table.indexes.append(index)
                     for detail_node in child.childNodes:
                         if _check_node(detail_node):
                             continue
                         if detail_node.tagName != 'item':
                             raise UnsupportedTagError(detail_node.tagName)
-                        detail = _create_index_detail(detail_node._attrs)
+                        detail = _create_index_detail(_attributes(detail_node))
                         index.details.append(detail)
 
                 elif child.tagName == 'constraint':
-                    constraint = _create_constraint(child._attrs)
+                    constraint = _create_constraint(_attributes(child))
                     table.constraints.append(constraint)
                     for detail_node in child.childNodes:
                         if _check_node(detail_node):
                             continue
                         if detail_node.tagName != 'item':
                             raise UnsupportedTagError(detail_node.tagName)
-                        detail = _create_constraint_detail(detail_node._attrs)
+                        detail = _create_constraint_detail(_attributes(detail_node))
                         constraint.details.append(detail)
 
                 else:
@@ -132,6 +782,82 @@ def _parse_table(schema, dom):
             raise ParseError('Таблица: \"' + table.name + '\". ' + str(ex))
 
 
+def _build_domain(schema, domain_element):
+    """ Преобразовать элемент ElementTree, представляющий домен, в домен схемы.
+
+    :param schema: схема, содержащая получаемый домен.
+    :param domain_element: элемент домена.
+    :return: None
+    """
+    try:
+        if domain_element.tag != 'domain':
+            raise UnsupportedTagError(domain_element.tag)
+        domain = _create_domain(domain_element.attrib)
+        if domain.name in schema.domains:
+            raise UniqueViolationError(domain.name)
+        schema.domains[domain.name] = domain
+    except ParseError as ex:
+        raise ParseError('Домен. ' + str(ex))
+
+
+def _build_table(table_element):
+    """ Преобразовать элемент ElementTree, представляющий таблицу, в объект таблицы.
+
+    :param table_element: элемент таблицы со всеми вложенными элементами.
+    :return: объект таблицы.
+    """
+    if table_element.tag != 'table':
+        raise UnsupportedTagError(table_element.tag)
+    table = _create_table(table_element.attrib)
+    try:
+        _check_text(table_element.text)
+        for child in table_element:
+            if child.tag == 'field':
+                field = _create_field(child.attrib)
+                if field.name in table.fields:
+                    raise UniqueViolationError(field.name)
+                table.fields[field.name] = field
+
+            elif child.tag == 'index':
+                index = _create_index(child.attrib)
+                table.indexes.append(index)
+                _check_text(child.text)
+                for detail_element in child:
+                    if detail_element.tag != 'item':
+                        raise UnsupportedTagError(detail_element.tag)
+                    detail = _create_index_detail(detail_element.attrib)
+                    index.details.append(detail)
+                    _check_text(detail_element.tail)
+
+            elif child.tag == 'constraint':
+                constraint = _create_constraint(child.attrib)
+                table.constraints.append(constraint)
+                _check_text(child.text)
+                for detail_element in child:
+                    if detail_element.tag != 'item':
+                        raise UnsupportedTagError(detail_element.tag)
+                    detail = _create_constraint_detail(detail_element.attrib)
+                    constraint.details.append(detail)
+                    _check_text(detail_element.tail)
+
+            else:
+                raise UnsupportedTagError(child.tag)
+            _check_text(child.tail)
+    except ParseError as ex:
+        raise ParseError('Таблица: \"' + table.name + '\". ' + str(ex))
+    return table
+
+
+def _check_text(text):
+    """ Проверить текстовое содержимое элемента ElementTree.
+
+    :param text: текст элемента (text или tail).
+    :return: исключение в случае непустого текста.
+    """
+    if text is not None and text.strip() != '':
+        raise UnsupportedTagError(text)
+
+
 def _check_node(node):
     """ Проверить узел dom-структуры.
 
@@ -145,144 +871,65 @@ def _check_node(node):
     return False
 
 
+def _attributes(node):
+    """ Получить словарь значений атрибутов узла dom-структуры.
+
+    :param node: узел dom-структуры.
+    :return: dict
+    """
+    if node._attrs is None:
+        return {}
+    return {name: attr.value for name, attr in node._attrs.items()}
+
+
 def _create_schema(attr_dict):
     """ Создать объект Схемы, опредлить его поля.
 
-    :param attr_dict: Словарь свойств из dom-элемента.
+    :param attr_dict: Словарь значений атрибутов XML-элемента.
     :return: объект Схемы.
     """
     schema = Schema()
-    for attr in attr_dict:
-        if attr == 'name':
-            schema.name = attr_dict[attr].value
-        elif attr == 'fulltext_engine':
-            schema.fulltext_engine = attr_dict[attr].value
-        elif attr == 'version':
-            schema.version = attr_dict[attr].value
-        elif attr == 'description':
-            schema.description = attr_dict[attr].value
-        else:
-            raise UnsupportedAttributeError(attr)
+    _SCHEMA_READER.read(schema, attr_dict, UnsupportedAttributeError)
     return schema
 
 
 def _create_domain(attr_dict):
     """ Создать объект Домена, опредлить его поля.
 
-    :param attr_dict: Словарь свойств из dom-элемента.
+    :param attr_dict: Словарь значений атрибутов XML-элемента.
     :return: объект Домена.
     """
     domain = Domain()
-    for attr in attr_dict:
-        if attr == 'name':
-            domain.name = attr_dict[attr].value
-        elif attr == 'type':
-            domain.type = attr_dict[attr].value
-        elif attr == 'align':
-            domain.align = attr_dict[attr].value
-        elif attr == 'width':
-            domain.width = attr_dict[attr].value
-        elif attr == 'char_length':
-            domain.char_length = attr_dict[attr].value
-        elif attr == 'description':
-            domain.description = attr_dict[attr].value
-        elif attr == 'length':
-            domain.length = attr_dict[attr].value
-        elif attr == 'scale':
-            domain.scale = attr_dict[attr].value
-        elif attr == 'precision':
-            domain.precision = attr_dict[attr].value
-        elif attr == 'props':
-            for prop in attr_dict[attr].value.split(', '):
-                if prop == 'case_sensitive':
-                    domain.case_sensitive = True
-                elif prop == 'show_null':
-                    domain.show_null = True
-                elif prop == 'show_lead_nulls':
-                    domain.show_lead_nulls = True
-                elif prop == 'thousands_separator':
-                    domain.thousands_separator = True
-                elif prop == 'summable':
-                    domain.summable = True
-                else:
-                    raise UnsupportedPropertyError(prop)
-        else:
-            raise UnsupportedAttributeError(attr)
+    _DOMAIN_READER.read(domain, attr_dict, UnsupportedAttributeError)
     return domain
 
 
 def _create_table(attr_dict):
     """ Создать объект Таблицы, опредлить его поля.
 
-    :param attr_dict: Словарь свойств из dom-элемента.
+    :param attr_dict: Словарь значений атрибутов XML-элемента.
     :return: объект Таблицы.
     """
     table = Table()
-    for attr in attr_dict:
-        if attr == 'name':
-            table.name = attr_dict[attr].value
-        elif attr == 'description':
-            table.description = attr_dict[attr].value
-        elif attr == 'props':
-            for prop in attr_dict[attr].value.split(', '):
-                if prop == 'add':
-                    table.add = True
-                elif prop == 'edit':
-                    table.edit = True
-                elif prop == 'delete':
-                    table.delete = True
-                else:
-                    raise UnsupportedPropertyError(prop)
-        else:
-            raise UnsupportedAttributeError(attr)
+    _TABLE_READER.read(table, attr_dict, UnsupportedAttributeError)
     return table
 
 
 def _create_field(attr_dict):
     """ Создать объект Поля, опредлить его поля.
 
-    :param attr_dict: Словарь свойств из dom-элемента.
+    :param attr_dict: Словарь значений атрибутов XML-элемента.
     :return: объект Поля.
     """
     field = Field()
-    for attr in attr_dict:
-        if attr == 'name':
-            field.name = attr_dict[attr].value
-        elif attr == 'rname':
-            field.rname = attr_dict[attr].value
-        elif attr == 'domain':
-            field.domain = attr_dict[attr].value
-        elif attr == 'type':
-            field.type = attr_dict[attr].value
-        elif attr == 'description':
-            field.description = attr_dict[attr].value
-        elif attr == 'props':
-            for prop in attr_dict[attr].value.split(', '):
-                if prop == 'input':
-                    field.input = True
-                elif prop == 'edit':
-                    field.edit = True
-                elif prop == 'show_in_grid':
-                    field.show_in_grid = True
-                elif prop == 'show_in_details':
-                    field.show_in_details = True
-                elif prop == 'is_mean':
-                    field.is_mean = True
-                elif prop == 'autocalculated':
-                    field.autocalculated = True
-                elif prop == 'required':
-                    field.required = True
-                else:
-                    raise UnsupportedPropertyError(prop)
-        else:
-            raise UnsupportedAttributeError(attr)
+    _FIELD_READER.read(field, attr_dict, UnsupportedAttributeError)
     return field
 
 
 def _create_constraint(attr_dict):
     """ Создать объект Ограничения, опредлить его поля.
 
-    :param attr_dict: Словарь свойств из dom-элемента.
+    :param attr_dict: Словарь значений атрибутов XML-элемента.
     :return: объект Ограничения.
     """
     constraint = Constraint()
@@ -290,40 +937,14 @@ def _create_constraint(attr_dict):
     if attr_dict is None:
         return constraint
 
-    for attr in attr_dict:
-        if attr == 'name':
-            constraint.name = attr_dict[attr].value
-        elif attr == 'kind':
-            constraint.kind = attr_dict[attr].value
-        elif attr == 'items':
-            detail = ConstraintDetail()
-            detail.value = attr_dict[attr].value
-            constraint.details.append(detail)
-        elif attr == 'reference':
-            constraint.reference = attr_dict[attr].value
-        elif attr == 'constraint':
-            constraint.constraint = attr_dict[attr].value
-        elif attr == 'expression':
-            constraint.expression = attr_dict[attr].value
-        elif attr == 'props':
-            for prop in attr_dict[attr].value.split(', '):
-                if prop == 'has_value_edit':
-                    constraint.has_value_edit = True
-                elif prop == 'cascading_delete':
-                    constraint.cascading_delete = False
-                elif prop == 'full_cascading_delete':
-                    constraint.cascading_delete = True
-                else:
-                    raise UnsupportedPropertyError(prop)
-        else:
-            raise UnsupportedAttributeError(attr)
+    _CONSTRAINT_READER.read(constraint, attr_dict, UnsupportedAttributeError)
     return constraint
 
 
 def _create_index(attr_dict):
     """ Создать объект Индекса, опредлить его поля.
 
-    :param attr_dict: Словарь свойств из dom-элемента.
+    :param attr_dict: Словарь значений атрибутов XML-элемента.
     :return: объект Индекса.
     """
     index = Index()
@@ -331,59 +952,29 @@ def _create_index(attr_dict):
     if attr_dict is None:
         return index
 
-    for attr in attr_dict:
-        if attr == 'name':
-            index.name = attr_dict[attr].value
-        elif attr == 'field':
-            detail = IndexDetail()
-            detail.value = attr_dict[attr].value
-            index.details.append(detail)
-        elif attr == 'props':
-            for prop in attr_dict[attr].value.split(', '):
-                if prop == 'local':
-                    index.local = True
-                elif prop == 'uniqueness':
-                    index.kind = 'uniqueness'
-                elif prop == 'fulltext':
-                    index.kind = 'fulltext'
-                else:
-                    raise UnsupportedPropertyError(prop)
-        else:
-            raise UnsupportedAttributeError(attr)
+    _INDEX_READER.read(index, attr_dict, UnsupportedAttributeError)
     return index
 
 
 def _create_constraint_detail(attr_dict):
     """ Создать объект Детали ограничения, опредлить его поля.
 
-    :param attr_dict: Словарь свойств из dom-элемента.
+    :param attr_dict: Словарь значений атрибутов XML-элемента.
     :return: объект Детали ограничения.
     """
     detail = ConstraintDetail()
-    for attr in attr_dict:
-        if attr == 'value':
-            detail.value = attr_dict[attr].value
-        else:
-            raise UnsupportedAttributeError(attr)
+    _CONSTRAINT_DETAIL_READER.read(detail, attr_dict, UnsupportedAttributeError)
     return detail
 
 
 def _create_index_detail(attr_dict):
     """ Создать объект Детали индекса, опредлить его поля.
 
-    :param attr_dict: Словарь свойств из dom-элемента.
+    :param attr_dict: Словарь значений атрибутов XML-элемента.
     :return: объект Детали индекса.
     """
     detail = IndexDetail()
-    for attr in attr_dict:
-        if attr == 'value':
-            detail.value = attr_dict[attr].value
-        elif attr == 'expression':
-            detail.expression = attr_dict[attr].value
-        elif attr == 'descend':
-            detail.descend = attr_dict[attr].value
-        else:
-            raise UnsupportedAttributeError(attr)
+    _INDEX_DETAIL_READER.read(detail, attr_dict, UnsupportedAttributeError)
     return detail
 
 
@@ -435,4 +1026,26 @@ class UniqueViolationError(ParseError):
         self.name = name
 
     def __str__(self):
-        return 'Элемент заданного типа с именем \"' + self.name + '\" уже определен'
\ No newline at end of file
+        return 'Элемент заданного типа с именем \"' + self.name + '\" уже определен'
+
+
+class MissingTableError(ParseError):
+    """ Подкласс исключений, порождаемых при запросе таблицы, отсутствующей
+    в манифесте раздельного представления БД.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return 'Таблица \"' + self.name + '\" отсутствует в манифесте'
+
+
+# Обработчики атрибутов, скомпилированные из описаний сущностей.
+_SCHEMA_READER = compile_xml_reader(SCHEMA, UnsupportedPropertyError)
+_DOMAIN_READER = compile_xml_reader(DOMAIN, UnsupportedPropertyError)
+_TABLE_READER = compile_xml_reader(TABLE, UnsupportedPropertyError)
+_FIELD_READER = compile_xml_reader(FIELD, UnsupportedPropertyError)
+_CONSTRAINT_READER = compile_xml_reader(CONSTRAINT, UnsupportedPropertyError)
+_INDEX_READER = compile_xml_reader(INDEX, UnsupportedPropertyError)
+_CONSTRAINT_DETAIL_READER = compile_xml_reader(CONSTRAINT_DETAIL, UnsupportedPropertyError)
+_INDEX_DETAIL_READER = compile_xml_reader(INDEX_DETAIL, UnsupportedPropertyError)